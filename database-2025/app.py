@@ -1,11 +1,19 @@
 import os
-import pymysql
 from flask import Flask
-from config import DB_CONFIG
+from config import DB_CONFIG, POOL_CONFIG, REPLICA_HOSTS, REPLICA_STICKY_SECONDS, SQL_ECHO, SQL_SLOW_REQUEST_MS, METRICS_MULTIPROC_DIR
 from models import db
+from commands import register_commands
+from utils.auth import public_endpoint, build_auth_policies
+from utils.cache import reference_cache
+from utils.search import search_index
+from utils.dispatch import dispatch_feed
+from utils.dbpool import engine_options, instrument_engine
+from utils.replicas import replica_router
+from utils.profiler import query_profiler
+from utils.metrics import metrics
 from routes import users, owners, riders, stores, customer, favorites, reviews, payments, coupons, admin
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
     
     # SECRET_KEY 설정 (세션을 위해 필요)
@@ -13,18 +21,44 @@ def create_app():
     
     # 데이터베이스 URI 구성
     db_port = os.environ.get('DB_PORT', '3306')
-    # 비밀번호가 있는 경우와 없는 경우를 처리
-    if DB_CONFIG['password']:
-        db_uri = f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{db_port}/{DB_CONFIG['database']}"
-    else:
-        db_uri = f"mysql+pymysql://{DB_CONFIG['user']}@{DB_CONFIG['host']}:{db_port}/{DB_CONFIG['database']}"
-    app.config['SQLALCHEMY_DATABASE_URI'] = db_uri
+    def mysql_uri(host):
+        # 비밀번호가 있는 경우와 없는 경우를 처리
+        if DB_CONFIG['password']:
+            return f"mysql+pymysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{host}:{db_port}/{DB_CONFIG['database']}"
+        return f"mysql+pymysql://{DB_CONFIG['user']}@{host}:{db_port}/{DB_CONFIG['database']}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = mysql_uri(DB_CONFIG['host'])
+    # 읽기 복제본 (DB_REPLICA_HOSTS, 없으면 primary만 사용)
+    app.config['SQLALCHEMY_REPLICA_URIS'] = [mysql_uri(host) for host in REPLICA_HOSTS]
+    app.config['REPLICA_STICKY_SECONDS'] = REPLICA_STICKY_SECONDS
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ECHO'] = False
+    app.config['SQLALCHEMY_ECHO'] = SQL_ECHO
+    app.config['SQL_SLOW_REQUEST_MS'] = SQL_SLOW_REQUEST_MS
+    app.config['METRICS_MULTIPROC_DIR'] = METRICS_MULTIPROC_DIR
+    
+    # 테스트/벤치마크용 설정 덮어쓰기 (예: SQLite URI)
+    if test_config:
+        app.config.update(test_config)
+    
+    # MySQL 커넥션 풀 설정 (config.POOL_CONFIG - DB_POOL_SIZE 등 환경 변수, test_config로 덮어쓸 수 있음)
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('mysql'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(POOL_CONFIG))
     
     # 데이터베이스 초기화
     db.init_app(app)
     
+    # 커넥션 풀 지표 수집 (/admin/metrics/pool)
+    with app.app_context():
+        instrument_engine(db.engine)
+    
+    # 읽기 복제본 라우팅 (GET 요청의 읽기 -> 복제본, 쓰기/쓰기 이후 읽기 -> primary)
+    replica_router.init_app(app)
+    
+    # 요청별 SQL 프로파일러 (쿼리 수/시간 -> Server-Timing 헤더, 느린 요청/N+1 로그, /admin/metrics/queries)
+    query_profiler.init_app(app)
+    
+    # Prometheus 지표 (/metrics: 엔드포인트별 요청 수/상태 코드/지연 시간 히스토그램, 처리 중 요청 수, 주문/리뷰 카운터)
+    metrics.init_app(app)
+    
     # Blueprint 등록
     app.register_blueprint(users.bp, url_prefix='/users')
     app.register_blueprint(owners.bp, url_prefix='/owners')
@@ -37,51 +71,35 @@ def create_app():
     app.register_blueprint(coupons.bp, url_prefix='/coupons')
     app.register_blueprint(admin.bp, url_prefix='/admin')
     
+    # 기준 데이터 캐시의 공유 백엔드 연결 (CacheBackend 구현체, 없으면 프로세스 내 LRU만 사용)
+    if app.config.get('CACHE_SHARED_BACKEND') is not None:
+        reference_cache.shared = app.config['CACHE_SHARED_BACKEND']
+    
+    # 검색 인덱스 설정 (SEARCH_INDEX_MAX_AGE초마다 다른 프로세스의 변경을 반영, 0이면 증분 갱신만)
+    search_index.init_app(app)
+    
+    # 라이더 배차 피드 (다른 워커의 이벤트를 DISPATCH_POLL_SECONDS마다 dispatch_event 테이블에서 읽음, 첫 구독 때 시작)
+    dispatch_feed.init_app(app)
+    
+    # CLI 명령 등록 (flask stats rebuild 등)
+    register_commands(app)
+    
     # Middleware: 세션 유효성 검사
     @app.before_request
     def validate_session():
-        """모든 요청 전에 세션의 사용자/사장 정보가 실제로 존재하는지 확인"""
+        """세션의 사용자/사장 정보가 실제로 존재하는지 확인 (@public_endpoint가 아닌 엔드포인트만)"""
         from flask import session, request
-        from models import User, Owner
-        
-        # 체크하지 않을 경로들
-        excluded_paths = [
-            '/users/login',
-            '/users/register',
-            '/users/check-id',
-            '/users/firstpage',
-            '/users/signup',
-            '/owners/login',
-            '/owners/register',
-            '/admin/page',
-            '/admin/categories/seed',
-            '/admin/users/seed',
-            '/admin/stores/seed',
-            '/admin/menus/seed',
-            '/admin/coupons/seed',
-            '/admin/categories/clear',
-            '/admin/users/clear',
-            '/admin/stores/clear',
-            '/admin/menus/clear',
-            '/admin/coupons/clear',
-            '/admin/reset',
-            '/admin/categories',
-            '/admin/stores/list',
-            '/admin/categories/create',
-            '/admin/users/create',
-            '/admin/stores/create',
-            '/admin/menus/create',
-            '/admin/coupons/create',
-        ]
+        from utils.auth import get_current_user, get_current_owner, AUTH_POLICY_SESSION
         
-        # 제외된 경로는 체크하지 않음
-        if any(request.path.startswith(path) for path in excluded_paths):
+        # 엔드포인트에 선언된 인증 정책 조회 (없는 경로/정적 파일은 검사하지 않음)
+        if auth_policies.get(request.endpoint) != AUTH_POLICY_SESSION:
             return None
         
         # 세션에 user_id가 있으면 실제 User가 존재하는지 확인
+        # (요청당 한 번만 조회해서 g에 보관 - 라우트의 get_current_user()가 재사용)
         user_id = session.get('user_id')
         if user_id:
-            user = User.query.get(user_id)
+            user = get_current_user()
             if not user:
                 # User가 삭제되었으면 세션 클리어
                 session.pop('user_id', None)
@@ -90,7 +108,7 @@ def create_app():
         # 세션에 owner_id가 있으면 실제 Owner가 존재하는지 확인
         owner_id = session.get('owner_id')
         if owner_id:
-            owner = Owner.query.get(owner_id)
+            owner = get_current_owner()
             if not owner:
                 # Owner가 삭제되었으면 세션 클리어
                 session.pop('owner_id', None)
@@ -100,79 +118,42 @@ def create_app():
     
     # 루트 경로 - 첫 페이지로 리다이렉트
     @app.route('/')
+    @public_endpoint
     def index():
         from flask import redirect
         return redirect('/users/firstpage')
     
-    # 데이터베이스가 없으면 자동 생성
-    db_name = DB_CONFIG['database']
-    try:
-        # 데이터베이스 없이 연결 (데이터베이스 생성용)
-        if DB_CONFIG['password']:
-            conn = pymysql.connect(
-                host=DB_CONFIG['host'],
-                user=DB_CONFIG['user'],
-                password=DB_CONFIG['password'],
-                port=int(db_port),
-                charset='utf8mb4'
-            )
-        else:
-            conn = pymysql.connect(
-                host=DB_CONFIG['host'],
-                user=DB_CONFIG['user'],
-                port=int(db_port),
-                charset='utf8mb4'
-            )
-        
-        with conn.cursor() as cursor:
-            # 데이터베이스가 없으면 생성
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}` DEFAULT CHARACTER SET utf8mb4 DEFAULT COLLATE utf8mb4_unicode_ci")
-            print(f"✅ 데이터베이스 '{db_name}' 확인/생성 완료")
-        conn.close()
-    except Exception as e:
-        print(f"⚠️ 데이터베이스 생성 시도 중 오류 (이미 존재할 수 있음): {e}")
+    # 모든 라우트 등록 후 엔드포인트별 인증 정책 테이블 생성
+    auth_policies = build_auth_policies(app)
     
-    # 데이터베이스 테이블 생성 (연결 실패 시 에러 메시지 표시)
-    with app.app_context():
-        try:
-            db.create_all()
-            print(f"✅ 데이터베이스 연결 성공: {DB_CONFIG['host']}:{db_port}/{DB_CONFIG['database']}")
-            
-            # 기본 데이터 삽입 (지불방식, 카테고리)
-            from models import Payment, Category
-            
-            # 지불방식 기본 데이터 확인 및 삽입
-            if Payment.query.count() == 0:
-                payment1 = Payment(payment='만나서 카드결제')
-                payment2 = Payment(payment='만나서 현금 결제')
-                db.session.add(payment1)
-                db.session.add(payment2)
-                db.session.commit()
-                print("✅ 기본 지불방식 데이터 삽입 완료 (만나서 카드결제, 만나서 현금 결제)")
-            
-            # 카테고리 기본 데이터 확인 및 삽입
-            if Category.query.count() == 0:
-                categories = ['한식', '일식', '중식', '양식', '분식', '패스트푸드']
-                for cat_name in categories:
-                    category = Category(category=cat_name)
-                    db.session.add(category)
-                db.session.commit()
-                print("✅ 기본 카테고리 데이터 삽입 완료 (한식, 일식, 중식, 양식, 분식, 패스트푸드)")
-        except Exception as e:
-            print(f"❌ 데이터베이스 연결 실패: {e}")
-            print(f"   호스트: {DB_CONFIG['host']}")
-            print(f"   사용자: {DB_CONFIG['user']}")
-            print(f"   데이터베이스: {DB_CONFIG['database']}")
-            print("\n💡 해결 방법:")
-            print("   1. MySQL 서버가 실행 중인지 확인하세요")
-            print("   2. .env 파일의 DB_HOST가 'localhost'로 설정되어 있는지 확인하세요")
-            print("   3. 데이터베이스가 생성되어 있는지 확인하세요")
-            raise
+    # DB 준비(데이터베이스/테이블 생성, 마이그레이션, 기본 데이터)는 여기서 하지 않는다 - create_app()은 DB에 접속하지 않음
+    # 배포 시: flask --app app db init && flask --app app db seed (개발 서버는 아래 __main__에서 실행)
+    # 검색 인덱스는 첫 검색 때 만든다
     
     return app
 
+# 개발 서버 (디버거 켜짐, 프로세스 1개) - 운영은 gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == '__main__':
     app = create_app()
+    # 개발 서버는 편의를 위해 시작 전에 DB 준비 (flask db init + flask db seed와 같음)
+    from utils.migrations import create_database, init_schema, seed_defaults
+    try:
+        create_database(app.config['SQLALCHEMY_DATABASE_URI'])
+        with app.app_context():
+            for version, description in init_schema():
+                print(f"✅ 마이그레이션 {version} 적용: {description}")
+            seed_defaults()
+        print(f"✅ 데이터베이스 연결 성공: {DB_CONFIG['host']}:{os.environ.get('DB_PORT', '3306')}/{DB_CONFIG['database']}")
+    except Exception as e:
+        print(f"❌ 데이터베이스 연결 실패: {e}")
+        print(f"   호스트: {DB_CONFIG['host']}")
+        print(f"   사용자: {DB_CONFIG['user']}")
+        print(f"   데이터베이스: {DB_CONFIG['database']}")
+        print("\n💡 해결 방법:")
+        print("   1. MySQL 서버가 실행 중인지 확인하세요")
+        print("   2. .env 파일의 DB_HOST가 'localhost'로 설정되어 있는지 확인하세요")
+        print("   3. 데이터베이스가 생성되어 있는지 확인하세요")
+        raise
     port = int(os.environ.get('PORT', 5001))  # 기본값을 5001로 변경
     app.run(debug=True, host='0.0.0.0', port=port)
 
@@ -0,0 +1,120 @@
+"""주문 수락 동시성 스트레스 벤치마크
+
+여러 스레드(라이더)가 같은 주문들을 동시에 수락하도록 요청을 보내고,
+주문마다 정확히 한 명만 수락에 성공했는지 확인한 뒤 수락 처리량을 출력한다.
+
+    python benchmarks/bench_accept_orders.py --threads 16 --orders 200
+    python benchmarks/bench_accept_orders.py --database-uri mysql+pymysql://root:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, default in [('DB_HOST', 'localhost'), ('DB_USER', 'root'), ('DB_PASSWORD', 'bench'), ('DB_NAME', 'bench')]:
+    os.environ.setdefault(name, default)
+
+from app import create_app
+from models import db, User, Owner, Rider, Store, Category, Order
+
+def seed(app, orders, riders):
+    """가게 1개, 고객 1명, 대기 주문 N개, 라이더 T명 생성"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        
+        category = Category(category='한식')
+        owner = Owner(owner_id='bench_owner', email='owner@bench.com')
+        owner.set_password('bench')
+        db.session.add_all([category, owner])
+        db.session.flush()
+        
+        store = Store(owner_id=owner.id, category_id=category.id, store_name='벤치 가게', category='한식',
+                      phone='02-0000-0000', minprice='10000원', operationTime='00:00 - 24:00', closedDay='없음')
+        customer = User(user_id='bench_customer', email='c@bench.com', name='고객', address='서울시')
+        customer.set_password('bench')
+        db.session.add_all([store, customer])
+        db.session.flush()
+        
+        # 비밀번호 해시는 한 번만 계산해서 재사용
+        passwd = customer.passwd
+        for i in range(riders):
+            db.session.add(User(user_id=f'bench_rider{i}', passwd=passwd, email=f'r{i}@bench.com',
+                                name=f'라이더{i}', address='서울시'))
+            db.session.add(Rider(rider_id=f'bench_rider{i}', phone='010-0000-0000', vehicle='자전거'))
+        
+        db.session.add_all([
+            Order(user_id=customer.id, store_id=store.id, order='김치찌개 x1', total_price=8000)
+            for _ in range(orders)
+        ])
+        db.session.commit()
+        return [order_id for (order_id,) in db.session.query(Order.id).all()]
+
+def run(app, order_ids, threads):
+    """모든 라이더가 모든 주문을 (순서를 섞어서) 동시에 수락 시도"""
+    results = defaultdict(list)
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+    
+    def worker(index):
+        client = app.test_client()
+        response = client.post('/users/login', json={'user_id': f'bench_rider{index}', 'passwd': 'bench'})
+        assert response.status_code == 200, response.get_json()
+        targets = list(order_ids)
+        random.Random(index).shuffle(targets)
+        local = []
+        barrier.wait()
+        for order_id in targets:
+            local.append((order_id, client.post(f'/customer/orders/{order_id}/accept').status_code))
+        with lock:
+            for order_id, status in local:
+                results[order_id].append(status)
+    
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return results, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='주문 수락 동시성 스트레스 벤치마크')
+    parser.add_argument('--database-uri', default='sqlite:////tmp/bench_accept_orders.db')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=200)
+    args = parser.parse_args()
+    
+    config = {'SQLALCHEMY_DATABASE_URI': args.database_uri}
+    if args.database_uri.startswith('sqlite'):
+        # SQLite는 쓰기가 직렬화되므로 잠금 대기 시간을 넉넉하게
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30, 'check_same_thread': False}}
+    app = create_app(config)
+    
+    order_ids = seed(app, args.orders, args.threads)
+    results, elapsed = run(app, order_ids, args.threads)
+    
+    winners = {order_id: statuses.count(200) for order_id, statuses in results.items()}
+    errors = sum(1 for statuses in results.values() for status in statuses if status not in (200, 400))
+    requests_total = sum(len(statuses) for statuses in results.values())
+    bad = [order_id for order_id in order_ids if winners.get(order_id) != 1]
+    
+    with app.app_context():
+        unassigned = Order.query.filter(Order.rider_id == None).count()
+    
+    print(f"스레드 {args.threads}개, 주문 {len(order_ids)}개, 수락 요청 {requests_total}건, {elapsed:.2f}초")
+    print(f"  요청 처리량: {requests_total / elapsed:.1f} req/s")
+    print(f"  수락 처리량: {len(order_ids) / elapsed:.1f} accepts/s")
+    print(f"  오류 응답: {errors}건, 미배정 주문: {unassigned}건")
+    if bad or errors or unassigned:
+        print(f"❌ 수락 성공이 정확히 1건이 아닌 주문: {bad[:10]}")
+        sys.exit(1)
+    print("✅ 모든 주문이 정확히 한 명의 라이더에게 배정되었습니다.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""배달 가능 가게 조회 벤치마크
+
+서울 전역에 가게를 흩어 놓고, 같은 고객 위치 목록으로 두 방식의 응답 시간과 읽은 행 수를 비교한다.
+    - geohash: (category_id, geohash) 인덱스 + 배달 반경 조건 (utils.geo.delivers_to)
+    - 전체 로드: 카테고리의 가게를 모두 읽고 파이썬에서 거리 계산 (기존 목록 API 방식)
+두 방식의 결과가 같은지도 확인한다.
+
+    python benchmarks/bench_delivery_zone.py --stores 20000 50000
+    python benchmarks/bench_delivery_zone.py --database-uri mysql+pymysql://root:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, default in [('DB_HOST', 'localhost'), ('DB_USER', 'root'), ('DB_PASSWORD', 'bench'), ('DB_NAME', 'bench')]:
+    os.environ.setdefault(name, default)
+
+from sqlalchemy import insert, select
+from app import create_app
+from models import db, Owner, Store, Category
+from utils.geo import delivers_to, distance_m, store_location, DEFAULT_DELIVERY_RADIUS
+
+CATEGORIES = 6
+# 서울시 대략적인 범위
+SOUTH, NORTH, WEST, EAST = 37.43, 37.70, 126.80, 127.18
+INSERT_CHUNK = 5000
+
+def add_stores(app, count, rng):
+    with app.app_context():
+        categories = Category.query.order_by(Category.id).all()
+        owner = Owner.query.first()
+        now = datetime.utcnow()
+        start = Store.query.count()
+        for chunk_start in range(start, start + count, INSERT_CHUNK):
+            rows = []
+            for i in range(chunk_start, min(chunk_start + INSERT_CHUNK, start + count)):
+                category = categories[i % CATEGORIES]
+                location = store_location({
+                    'latitude': rng.uniform(SOUTH, NORTH), 'longitude': rng.uniform(WEST, EAST),
+                    'delivery_radius': rng.choice([1500, 2000, 3000, 4000, 5000])
+                })
+                rows.append(dict(location, owner_id=owner.id, category_id=category.id, category=category.category,
+                                 store_name=f'가게{i}', phone='02-0000-0000', minprice='10000원', reviewCount=0,
+                                 operationTime='00:00 - 24:00', closedDay='없음', created_at=now))
+            db.session.execute(insert(Store), rows)
+        db.session.commit()
+
+def by_geohash(category_id, latitude, longitude):
+    rows = db.session.execute(select(Store).where(
+        Store.category_id == category_id, delivers_to(latitude, longitude)
+    )).scalars().all()
+    return {store.id for store in rows}, len(rows)
+
+def by_full_load(category_id, latitude, longitude):
+    rows = db.session.execute(select(Store).where(Store.category_id == category_id)).scalars().all()
+    return {
+        store.id for store in rows
+        if distance_m(latitude, longitude, store.latitude, store.longitude) <= (store.delivery_radius or DEFAULT_DELIVERY_RADIUS)
+    }, len(rows)
+
+def measure(function, points):
+    samples, loaded, results = [], 0, []
+    for category_id, latitude, longitude in points:
+        db.session.expunge_all()
+        started = time.perf_counter()
+        ids, rows = function(category_id, latitude, longitude)
+        samples.append((time.perf_counter() - started) * 1000)
+        loaded += rows
+        results.append(ids)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1], loaded / len(points), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stores', type=int, nargs='+', default=[20000, 50000], help='측정할 누적 가게 수 (오름차순)')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--database-uri', help='기본값: 임시 SQLite 파일')
+    args = parser.parse_args()
+
+    uri = args.database_uri or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri})
+    rng = random.Random(42)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([Category(category=f'카테고리{i}') for i in range(CATEGORIES)])
+        db.session.add(Owner(owner_id='bench_owner', email='owner@bench.com', owner_passwd='-'))
+        db.session.commit()
+        category_ids = [category.id for category in Category.query.all()]
+    points = [(rng.choice(category_ids), rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST)) for _ in range(args.queries)]
+
+    print(f"{'stores':>8} {'method':<10} {'p50':>9} {'p95':>9} {'rows/req':>9} {'hits/req':>9}")
+    total = 0
+    for target in sorted(args.stores):
+        add_stores(app, target - total, rng)
+        total = target
+        with app.app_context():
+            geo = measure(by_geohash, points)
+            full = measure(by_full_load, points)
+        assert geo[3] == full[3], '결과 불일치'
+        hits = sum(len(ids) for ids in geo[3]) / len(points)
+        for method, (p50, p95, rows, _) in [('geohash', geo), ('full load', full)]:
+            print(f"{total:>8} {method:<10} {p50:>7.2f}ms {p95:>7.2f}ms {rows:>9.1f} {hits:>9.1f}")
+    print("✅ 두 방식의 결과가 일치")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+"""주요 엔드포인트 부하 테스트 + 성능 회귀 검사
+
+관리자 일괄 생성 함수(routes/admin.py)로 합성 데이터(카테고리마다 가게 N개, 가게마다 메뉴 M개, 주문 K개, 리뷰 R개)를
+만들고, 여러 클라이언트(스레드)가 동시에 주요 엔드포인트를 호출해서 시나리오별 p50/p95/p99 응답 시간과
+요청당 쿼리 수(Server-Timing 헤더의 db desc)를 출력한다.
+
+--save-baseline으로 결과를 baselines.json에 저장해 두면 이후 실행은 같은 데이터/동시성 설정의 기준값과 비교해서
+--gate 분위수(기본값 p95)가 --tolerance 비율(+ --slack-ms)보다 느려지거나 요청당 쿼리 수가 늘어나면 종료 코드 1로 실패한다.
+응답 시간은 머신/DB마다 다르므로 기준값은 비교할 머신에서 저장한 것을 사용한다.
+
+    python benchmarks/bench_hot_endpoints.py
+    python benchmarks/bench_hot_endpoints.py --stores-per-category 200 --orders 50000 --clients 16 --save-baseline
+    python benchmarks/bench_hot_endpoints.py --database-uri mysql+pymysql://root:pw@localhost/bench
+    python benchmarks/bench_hot_endpoints.py --database-uri mysql+pymysql://root:pw@localhost/bench --base-url http://127.0.0.1:8000
+
+--base-url을 주면 앱을 프로세스 안에서 호출하지 않고 실행 중인 서버(개발 서버, gunicorn 등)에 HTTP로 요청한다.
+이때 서버는 --database-uri와 같은 DB를 사용해야 한다 (데이터는 이 스크립트가 --database-uri에 생성).
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, default in [('DB_HOST', 'localhost'), ('DB_USER', 'root'), ('DB_PASSWORD', 'bench'), ('DB_NAME', 'bench')]:
+    os.environ.setdefault(name, default)
+
+from sqlalchemy import select
+from app import create_app
+from models import db, Category, Payment, User, Rider, Store, Menu, Order, OrderItem, Review
+from routes.admin import (
+    bulk_create_categories, bulk_create_users, bulk_create_stores, bulk_create_menus, get_or_create_owner
+)
+from utils.bulk import bulk_insert, hash_passwords
+from utils.cache import reference_cache
+from utils.geo import SEOUL_DISTRICTS, seed_geocodes
+from utils.search import search_index
+from utils.stats import rebuild_store_stats, rebuild_sales_rollups
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+PASSWORD = 'bench123'
+CATEGORIES = ['한식', '중식', '일식', '양식', '분식', '패스트푸드']
+DISTRICTS = ['강남구', '서초구', '송파구']
+MENU_NAMES = ['김치찌개', '짜장면', '초밥', '파스타', '떡볶이', '햄버거', '치킨', '돈까스', '냉면', '비빔밥', '우동', '피자']
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+def seed(app, args, rng):
+    """합성 데이터 생성, 반환값: 시나리오에서 사용할 id 목록"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_geocodes()
+        if not Payment.query.first():
+            db.session.add_all([Payment(payment='만나서 카드결제'), Payment(payment='만나서 현금 결제')])
+            db.session.flush()
+        payment_id = Payment.query.order_by(Payment.id).first().id
+        bulk_create_categories(CATEGORIES)
+        categories = Category.query.order_by(Category.id).all()
+        owner = get_or_create_owner('bench_owner', 'owner@bench.com', PASSWORD)
+        
+        # 비밀번호 해시는 한 번만 계산해서 모든 사용자/라이더가 공유
+        passwd = hash_passwords([PASSWORD])[0]
+        bulk_create_users([{
+            'user_id': f'bench_user{i}', 'passwd': passwd, 'email': f'user{i}@bench.com',
+            'name': f'사용자{i}', 'address': f'서울시 {DISTRICTS[i % len(DISTRICTS)]}'
+        } for i in range(args.users)], hashed=True)
+        bulk_create_users([{
+            'user_id': f'bench_rider{i}', 'passwd': passwd, 'email': f'rider{i}@bench.com',
+            'name': f'라이더{i}', 'address': '서울시 강남구'
+        } for i in range(args.riders)], hashed=True)
+        bulk_insert(Rider, [
+            {'rider_id': f'bench_rider{i}', 'phone': '010-0000-0000', 'vehicle': '오토바이'} for i in range(args.riders)
+        ])
+        
+        # 가게는 사용자 주소(강남/서초/송파) 주변에 배치해서 배달 가능 지역 조회가 실제처럼 동작하게 함
+        districts = {name: (latitude, longitude) for name, latitude, longitude in SEOUL_DISTRICTS}
+        stores = []
+        for category in categories:
+            for i in range(args.stores_per_category):
+                latitude, longitude = districts[DISTRICTS[i % len(DISTRICTS)]]
+                stores.append({
+                    'store_name': f'{category.category} 벤치가게 {i}', 'category_id': category.id,
+                    'payment_id': payment_id, 'phone': '02-0000-0000', 'minprice': '10000원',
+                    'operationTime': '00:00 - 24:00', 'closedDay': '없음',
+                    'information': f'{category.category} 전문점입니다.',
+                    'latitude': latitude + rng.uniform(-0.02, 0.02), 'longitude': longitude + rng.uniform(-0.02, 0.02)
+                })
+        bulk_create_stores(stores, owner)
+        store_ids = db.session.execute(select(Store.id).order_by(Store.id)).scalars().all()
+        bulk_create_menus([{
+            'store_id': store_id, 'menu': f'{MENU_NAMES[j % len(MENU_NAMES)]} {j}', 'price': rng.randrange(5000, 20000, 500)
+        } for store_id in store_ids for j in range(args.menus_per_store)])
+        menus = {}
+        for menu_id, store_id, price in db.session.execute(select(Menu.id, Menu.store_id, Menu.price)):
+            menus.setdefault(store_id, []).append((menu_id, price))
+        
+        user_ids = db.session.execute(
+            select(User.id).where(User.user_id.like('bench_user%')).order_by(User.id)
+        ).scalars().all()
+        rider_ids = db.session.execute(select(Rider.id)).scalars().all()
+        
+        # 주문: 최근 90일에 고르게 분포, 20%는 라이더 대기 중
+        now = datetime.utcnow()
+        orders, lines = [], []
+        for _ in range(args.orders):
+            store_id = rng.choice(store_ids)
+            picked = rng.sample(menus[store_id], min(2, len(menus[store_id])))
+            qty = [rng.randint(1, 3) for _ in picked]
+            orders.append({
+                'user_id': rng.choice(user_ids), 'store_id': store_id, 'payment_id': payment_id,
+                'rider_id': None if rng.random() < 0.2 else rng.choice(rider_ids),
+                'order': ', '.join(f'메뉴{menu_id} x{n}' for (menu_id, _), n in zip(picked, qty)),
+                'total_price': sum(price * n for (_, price), n in zip(picked, qty)),
+                'order_time': now - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+            })
+            lines.append([(menu_id, n, price) for (menu_id, price), n in zip(picked, qty)])
+        bulk_insert(Order, orders)
+        order_rows = db.session.execute(
+            select(Order.id, Order.user_id, Order.store_id, Order.order_time).order_by(Order.id)
+        ).all()
+        bulk_insert(OrderItem, [
+            {'order_id': order_id, 'menu_id': menu_id, 'qty': qty, 'unit_price': price}
+            for (order_id, _, _, _), order_lines in zip(order_rows, lines)
+            for menu_id, qty, price in order_lines
+        ])
+        
+        reviewed = rng.sample(range(len(order_rows)), min(args.reviews, len(order_rows)))
+        bulk_insert(Review, [{
+            'user_id': order_rows[i].user_id, 'store_id': order_rows[i].store_id, 'order_id': order_rows[i].id,
+            'rating': rng.randint(1, 5), 'content': '잘 먹었습니다.',
+            'created_at': order_rows[i].order_time + timedelta(hours=1)
+        } for i in reviewed])
+        
+        rebuild_store_stats()
+        rebuild_sales_rollups()
+        db.session.commit()
+        reference_cache.clear()
+        search_index.rebuild()
+        
+        # 리뷰 작성 시나리오용: 사용자별로 아직 리뷰가 없는 주문
+        reviewed_ids = {order_rows[i].id for i in reviewed}
+        unreviewed = {}
+        for order_id, user_id, store_id, _ in order_rows:
+            if order_id not in reviewed_ids:
+                unreviewed.setdefault(user_id, []).append((order_id, store_id))
+        return {
+            'category_ids': [category.id for category in categories],
+            'store_ids': store_ids,
+            'menus': menus,
+            'payment_id': payment_id,
+            'user_ids': user_ids,
+            'unreviewed': unreviewed
+        }
+
+class InProcessClient:
+    """앱을 프로세스 안에서 호출하는 클라이언트 (Flask test client)"""
+    
+    def __init__(self, app):
+        self.client = app.test_client()
+    
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.headers.getlist('Server-Timing')
+
+class HttpClient:
+    """실행 중인 서버에 HTTP로 요청하는 클라이언트 (연결 유지, 세션 쿠키 저장)"""
+    
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        self.cookies = SimpleCookie()
+    
+    def request(self, method, path, body=None):
+        headers = {}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={morsel.value}' for key, morsel in self.cookies.items())
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            # 서버가 연결을 닫은 경우 한 번 다시 연결
+            self.connection.close()
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+        response.read()
+        for cookie in response.headers.get_all('Set-Cookie') or []:
+            self.cookies.load(cookie)
+        return response.status, response.headers.get_all('Server-Timing') or []
+
+def query_count(server_timing):
+    """Server-Timing 헤더에서 요청당 쿼리 수 (SQL 프로파일러가 꺼져 있으면 None)"""
+    for value in server_timing:
+        match = SERVER_TIMING_QUERIES.search(value)
+        if match:
+            return int(match.group(1))
+    return None
+
+# 시나리오: 클라이언트 상태(dict)를 받아 (메서드, 경로, 본문)을 돌려주는 함수, 필요하면 측정하지 않는 준비 요청을 직접 보냄
+
+def category_stores(client, state, data, rng):
+    return 'GET', f"/customer/categories/{rng.choice(data['category_ids'])}/stores?sort={rng.choice(['name', 'rating', 'orders'])}&limit=20", None
+
+def store_detail(client, state, data, rng):
+    return 'GET', f"/stores/{rng.choice(data['store_ids'])}", None
+
+def order_history(client, state, data, rng):
+    return 'GET', '/customer/orders?limit=20', None
+
+def waiting_orders(client, state, data, rng):
+    return 'GET', '/customer/orders/waiting?limit=50', None
+
+def checkout(client, state, data, rng):
+    # 장바구니 담기는 측정하지 않는 준비 요청 (주문 후 장바구니는 비워지므로 매번 한 메뉴만 담김)
+    store_id = rng.choice(data['store_ids'])
+    menu_id, _ = rng.choice(data['menus'][store_id])
+    client.request('POST', '/customer/cart/items', {'menu_id': menu_id, 'qty': 5, 'replace': True})
+    return 'POST', '/customer/checkout', {'payment_id': data['payment_id']}
+
+def create_review(client, state, data, rng):
+    pending = data['unreviewed'].get(state['user_id'])
+    if pending:
+        order_id, store_id = pending.pop()
+        return 'POST', '/reviews', {'store_id': store_id, 'order_id': order_id, 'rating': rng.randint(1, 5), 'content': '벤치마크 리뷰'}
+    return 'POST', '/reviews', {'store_id': rng.choice(data['store_ids']), 'rating': rng.randint(1, 5), 'content': '벤치마크 리뷰'}
+
+SCENARIOS = {
+    'category_stores': category_stores,
+    'store_detail': store_detail,
+    'order_history': order_history,
+    'waiting_orders': waiting_orders,
+    'checkout': checkout,
+    'create_review': create_review
+}
+
+def percentile(samples, q):
+    """정렬된 표본의 q 분위수 (nearest-rank)"""
+    return samples[max(0, min(len(samples) - 1, math.ceil(q * len(samples)) - 1))]
+
+def run_scenario(name, clients, data, requests, warmup):
+    """모든 클라이언트가 동시에 시작해서 합계 requests번 호출, 반환값: 결과 요약 dict"""
+    scenario = SCENARIOS[name]
+    latencies, queries, errors = [], [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(clients) + 1)
+    
+    def worker(index, client, state):
+        rng = random.Random(f'{name}-{index}')
+        count = requests // len(clients) + (1 if index < requests % len(clients) else 0)
+        for _ in range(warmup):
+            client.request(*scenario(client, state, data, rng))
+        barrier.wait()
+        local_latencies, local_queries, local_errors = [], [], []
+        for _ in range(count):
+            method, path, body = scenario(client, state, data, rng)
+            started = time.perf_counter()
+            status, server_timing = client.request(method, path, body)
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            if not 200 <= status < 300:
+                local_errors.append(f'{method} {path} -> {status}')
+            count_queries = query_count(server_timing)
+            if count_queries is not None:
+                local_queries.append(count_queries)
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors.extend(local_errors)
+    
+    threads = [threading.Thread(target=worker, args=(i, client, state)) for i, (client, state) in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:3],
+        'rps': round(len(latencies) / elapsed, 1) if elapsed > 0 else None,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None
+    }
+
+def baseline_key(args, uri):
+    """기준값은 DB 종류 + 데이터 크기 + 동시성 설정 + 실행한 시나리오가 같을 때만 비교
+
+    앞 시나리오가 만든 데이터(주문, 집계 행)에 따라 뒤 시나리오의 쿼리 수가 달라지므로 일부만 실행하면 다른 기준값을 쓴다.
+    """
+    dialect = uri.split(':', 1)[0].split('+', 1)[0]
+    key = (f'{dialect} stores={args.stores_per_category}x{len(CATEGORIES)} menus={args.menus_per_store} '
+           f'orders={args.orders} reviews={args.reviews} users={args.users} clients={args.clients}')
+    if args.scenario:
+        key += f" scenarios={','.join(args.scenario)}"
+    if args.base_url:
+        key += ' http'
+    return key
+
+def compare(results, baseline, gate, tolerance, slack_ms):
+    """기준값 대비 회귀 목록 (gate: 비교할 분위수 필드, 예: 'p95_ms')"""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        limit = expected[gate] * (1 + tolerance) + slack_ms
+        if result[gate] > limit:
+            regressions.append(f"{name}: {gate[:3]} {result[gate]}ms > 기준 {expected[gate]}ms (허용 {limit:.2f}ms)")
+        if expected.get('queries_per_request') is not None and result['queries_per_request'] is not None \
+                and result['queries_per_request'] > expected['queries_per_request'] + 0.5:
+            regressions.append(f"{name}: 요청당 쿼리 {result['queries_per_request']} > 기준 {expected['queries_per_request']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stores-per-category', type=int, default=50)
+    parser.add_argument('--menus-per-store', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--reviews', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--riders', type=int, default=20)
+    parser.add_argument('--clients', type=int, default=8, help='동시 클라이언트(스레드) 수')
+    parser.add_argument('--requests', type=int, default=400, help='시나리오별 측정 요청 수')
+    parser.add_argument('--warmup', type=int, default=3, help='클라이언트별 측정 전 요청 수')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='실행할 시나리오 (여러 번 지정 가능, 기본값: 전체)')
+    parser.add_argument('--database-uri', help='기본값: 임시 SQLite 파일')
+    parser.add_argument('--base-url', help='실행 중인 서버 주소 (기본값: 프로세스 안에서 앱 호출)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준값으로 저장')
+    parser.add_argument('--gate', choices=['p50', 'p95', 'p99'], default='p95', help='기준값과 비교할 분위수')
+    parser.add_argument('--tolerance', type=float, default=1.0, help='허용 증가 비율 (기본값 1.0 = 기준값의 2배까지)')
+    parser.add_argument('--slack-ms', type=float, default=2.0, help='허용 증가 절대값 (짧은 요청의 측정 오차 흡수)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if args.clients > args.users:
+        parser.error('--clients는 --users보다 클 수 없습니다 (클라이언트마다 다른 사용자로 로그인).')
+    
+    uri = args.database_uri or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    # 느린 요청/N+1 경고 로그는 벤치마크 출력에 섞이지 않도록 끔 (쿼리 수는 Server-Timing으로 계속 수집)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'SQL_SLOW_REQUEST_MS': 10 ** 9, 'SQL_N_PLUS_ONE_THRESHOLD': 10 ** 9})
+    started = time.perf_counter()
+    data = seed(app, args, random.Random(args.seed))
+    print(f"데이터 생성 {time.perf_counter() - started:.1f}s: 가게 {len(data['store_ids'])}개, "
+          f"메뉴 {sum(len(m) for m in data['menus'].values())}개, 주문 {args.orders}개, 리뷰 {args.reviews}개")
+    
+    clients = []
+    for i in range(args.clients):
+        client = HttpClient(args.base_url) if args.base_url else InProcessClient(app)
+        status, _ = client.request('POST', '/users/login', {'user_id': f'bench_user{i}', 'passwd': PASSWORD})
+        assert status == 200, f'로그인 실패: bench_user{i} ({status})'
+        clients.append((client, {'user_id': data['user_ids'][i]}))
+    
+    results = {}
+    print(f"{'scenario':<16} {'reqs':>5} {'err':>4} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}")
+    for name in args.scenario or list(SCENARIOS):
+        result = results[name] = run_scenario(name, clients, data, args.requests, args.warmup)
+        queries = '-' if result['queries_per_request'] is None else result['queries_per_request']
+        print(f"{name:<16} {result['requests']:>5} {result['errors']:>4} {result['rps']:>8} "
+              f"{result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms {queries:>8}")
+        for sample in result['error_samples']:
+            print(f"    ⚠️ {sample}")
+    
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+    key = baseline_key(args, uri)
+    failed = any(result['errors'] for result in results.values())
+    
+    if args.save_baseline:
+        if failed:
+            print("❌ 오류 응답이 있어서 기준값을 저장하지 않았습니다.")
+            return 1
+        baselines.setdefault(key, {}).update({
+            name: {field: result[field] for field in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')}
+            for name, result in results.items()
+        })
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 기준값 저장: {args.baseline} [{key}]")
+        return 0
+    
+    if key not in baselines:
+        print(f"ℹ️ 이 설정의 기준값이 없습니다 ({key}) - --save-baseline으로 저장하세요.")
+    else:
+        regressions = compare(results, baselines[key], f'{args.gate}_ms', args.tolerance, args.slack_ms)
+        for regression in regressions:
+            print(f"❌ 회귀: {regression}")
+        failed = failed or bool(regressions)
+        if not regressions:
+            print(f"✅ 기준값 대비 회귀 없음 [{key}]")
+    if failed:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
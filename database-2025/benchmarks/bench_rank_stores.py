@@ -0,0 +1,125 @@
+"""가게 순위 일괄 계산(flask stats rank) 벤치마크
+
+리뷰/주문 수를 늘려가며 utils.ranking.rebuild_rankings의 처리 시간과 최대 메모리(tracemalloc)를 측정한다.
+리뷰가 10배로 늘어도 최대 메모리가 거의 그대로면 chunk 단위 스트리밍이 제대로 동작하는 것이다.
+마지막에 SQL GROUP BY 결과와 가게별 리뷰 수/주문 수를 비교해서 계산이 맞는지도 확인한다.
+
+    python benchmarks/bench_rank_stores.py --stores 2000 --reviews 100000 1000000
+    python benchmarks/bench_rank_stores.py --database-uri mysql+pymysql://root:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, default in [('DB_HOST', 'localhost'), ('DB_USER', 'root'), ('DB_PASSWORD', 'bench'), ('DB_NAME', 'bench')]:
+    os.environ.setdefault(name, default)
+
+from sqlalchemy import func, insert
+from app import create_app
+from models import db, User, Owner, Store, Category, Order, Review, StoreRanking
+from utils.ranking import rebuild_rankings
+
+INSERT_CHUNK = 20000
+
+def seed_stores(app, stores):
+    """가게 N개, 고객 1명 생성 (반환값: store id 목록, 고객 id)"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        category = Category(category='한식')
+        owner = Owner(owner_id='bench_owner', email='owner@bench.com', owner_passwd='-')
+        customer = User(user_id='bench_customer', passwd='-', email='c@bench.com', name='고객', address='서울시')
+        db.session.add_all([category, owner, customer])
+        db.session.flush()
+        db.session.execute(insert(Store), [{
+            'owner_id': owner.id, 'category_id': category.id, 'store_name': f'가게{i}', 'category': '한식',
+            'phone': '02-0000-0000', 'minprice': '10000원', 'reviewCount': 0,
+            'operationTime': '00:00 - 24:00', 'closedDay': '없음', 'created_at': datetime.utcnow()
+        } for i in range(stores)])
+        db.session.commit()
+        return [store_id for (store_id,) in db.session.query(Store.id).all()], customer.id
+
+def add_rows(app, store_ids, user_id, reviews, orders, rng):
+    """리뷰/주문을 INSERT_CHUNK개씩 추가 (인기 가게에 몰리도록 가중치 부여)"""
+    weights = [1.0 / (rank + 1) for rank in range(len(store_ids))]
+    now = datetime.utcnow()
+    with app.app_context():
+        for model, count in [(Review, reviews), (Order, orders)]:
+            for start in range(0, count, INSERT_CHUNK):
+                size = min(INSERT_CHUNK, count - start)
+                picked = rng.choices(store_ids, weights=weights, k=size)
+                if model is Review:
+                    rows = [{'user_id': user_id, 'store_id': store_id, 'rating': rng.randint(1, 5),
+                             'content': '', 'created_at': now} for store_id in picked]
+                else:
+                    rows = [{'user_id': user_id, 'store_id': store_id, 'order': '벤치 x1', 'total_price': 10000,
+                             'order_time': now - timedelta(minutes=rng.randrange(60 * 24 * 60))} for store_id in picked]
+                db.session.connection().execute(insert(model.__table__), rows)
+                db.session.commit()
+
+def measure(app, chunk_size):
+    """순위 계산 실행 (반환값: 경과 시간, 최대 메모리 바이트)
+
+    tracemalloc은 실행을 크게 느리게 하므로 시간과 메모리는 따로 한 번씩 측정한다.
+    """
+    with app.app_context():
+        started = time.perf_counter()
+        rebuild_rankings(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - started
+        
+        tracemalloc.start()
+        rebuild_rankings(chunk_size=chunk_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak
+
+def verify(app):
+    """store_ranking의 리뷰/주문 수가 SQL 집계와 같은지 확인"""
+    with app.app_context():
+        reviews = dict(db.session.query(Review.store_id, func.count(Review.id)).group_by(Review.store_id).all())
+        orders = dict(db.session.query(Order.store_id, func.count(Order.id)).group_by(Order.store_id).all())
+        for ranking in StoreRanking.query.all():
+            assert ranking.review_count == reviews.get(ranking.store_id, 0), ranking.store_id
+            assert ranking.order_count == orders.get(ranking.store_id, 0), ranking.store_id
+            assert 1 <= ranking.bayes_rating <= 5 or ranking.review_count == 0
+        top = StoreRanking.query.order_by(StoreRanking.bayes_rating.desc()).first()
+        return top.store_id, top.bayes_rating, top.review_count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stores', type=int, default=2000)
+    parser.add_argument('--reviews', type=int, nargs='+', default=[100000, 1000000],
+                        help='측정할 누적 리뷰 수 (오름차순, 주문은 같은 수만큼 생성)')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--database-uri', help='기본값: 임시 SQLite 파일')
+    args = parser.parse_args()
+
+    tmpdir = None
+    uri = args.database_uri
+    if not uri:
+        tmpdir = tempfile.mkdtemp()
+        uri = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri})
+    rng = random.Random(42)
+
+    store_ids, user_id = seed_stores(app, args.stores)
+    print(f"가게 {len(store_ids)}개, chunk {args.chunk_size}행")
+    print(f"{'reviews':>10} {'orders':>10} {'elapsed':>9} {'rows/s':>11} {'peak MiB':>9}")
+    total = 0
+    for target in sorted(args.reviews):
+        add_rows(app, store_ids, user_id, target - total, target - total, rng)
+        total = target
+        elapsed, peak = measure(app, args.chunk_size)
+        print(f"{total:>10} {total:>10} {elapsed:>8.2f}s {2 * total / elapsed:>11,.0f} {peak / 2 ** 20:>9.1f}")
+
+    store_id, rating, count = verify(app)
+    print(f"✅ SQL 집계와 일치 (최고 베이지안 별점: 가게 {store_id} {rating} / 리뷰 {count}개)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""요청당 인증 정책 판별 비용 마이크로 벤치마크
+
+기존 방식(제외 경로 목록을 startswith로 선형 탐색)과
+엔드포인트 이름 -> 정책 테이블 조회 방식을 비교하고,
+공개 엔드포인트 요청에서 before_request 전체에 걸리는 시간을 측정한다.
+
+    python benchmarks/bench_route_policy.py --number 200000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, default in [('DB_HOST', 'localhost'), ('DB_USER', 'root'), ('DB_PASSWORD', 'bench'), ('DB_NAME', 'bench')]:
+    os.environ.setdefault(name, default)
+
+from app import create_app
+
+# 변경 전 app.validate_session의 제외 경로 목록
+LEGACY_EXCLUDED_PATHS = [
+    '/users/login', '/users/register', '/users/check-id', '/users/firstpage', '/users/signup',
+    '/owners/login', '/owners/register', '/admin/page',
+    '/admin/categories/seed', '/admin/users/seed', '/admin/stores/seed', '/admin/menus/seed', '/admin/coupons/seed',
+    '/admin/categories/clear', '/admin/users/clear', '/admin/stores/clear', '/admin/menus/clear', '/admin/coupons/clear',
+    '/admin/reset', '/admin/categories', '/admin/stores/list',
+    '/admin/categories/create', '/admin/users/create', '/admin/stores/create', '/admin/menus/create', '/admin/coupons/create',
+]
+
+# (경로, 엔드포인트) - 제외 목록에 없는 경로는 목록 끝까지 탐색하게 된다
+SAMPLE_REQUESTS = [
+    ('/customer/categories/1/stores', 'customer.get_stores_by_category'),
+    ('/stores/1', 'stores.get_store'),
+    ('/customer/orders', 'customer.get_orders'),
+    ('/static/app.css', 'static'),
+    ('/admin/coupons/create', 'admin.create_coupons'),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='인증 정책 판별 마이크로 벤치마크')
+    parser.add_argument('--database-uri', default='sqlite:////tmp/bench_route_policy.db')
+    parser.add_argument('--number', type=int, default=200000)
+    args = parser.parse_args()
+    
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_uri})
+    policies = app.extensions['auth_policies']
+    
+    def legacy():
+        for path, _ in SAMPLE_REQUESTS:
+            any(path.startswith(excluded) for excluded in LEGACY_EXCLUDED_PATHS)
+    
+    def table():
+        for _, endpoint in SAMPLE_REQUESTS:
+            policies.get(endpoint)
+    
+    per_request = args.number * len(SAMPLE_REQUESTS)
+    legacy_ns = timeit.timeit(legacy, number=args.number) / per_request * 1e9
+    table_ns = timeit.timeit(table, number=args.number) / per_request * 1e9
+    print(f"선형 startswith 탐색: {legacy_ns:8.1f} ns/요청")
+    print(f"정책 테이블 조회:     {table_ns:8.1f} ns/요청 ({legacy_ns / table_ns:.1f}배)")
+    
+    # 공개 엔드포인트 요청의 before_request 전체 비용 (URL 매칭 포함)
+    number = max(args.number // 20, 1)
+    with app.test_request_context('/customer/main'):
+        preprocess = app.preprocess_request
+        full_us = timeit.timeit(preprocess, number=number) / number * 1e6
+    print(f"공개 엔드포인트 before_request: {full_us:.2f} us/요청")
+
+if __name__ == '__main__':
+    main()
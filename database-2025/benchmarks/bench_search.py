@@ -0,0 +1,104 @@
+"""가게/메뉴 검색(/customer/search) 벤치마크
+
+같은 검색어 목록으로 프로세스 내 역색인(utils.search)과 LIKE '%q%' 조회의 응답 시간을 비교한다.
+역색인 결과의 가게 집합이 LIKE 결과와 같은지도 확인한다 (공백 무시, 초성/입력 중 검색어 제외).
+
+    python benchmarks/bench_search.py --stores 5000 --menus-per-store 10
+    python benchmarks/bench_search.py --database-uri mysql+pymysql://root:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, default in [('DB_HOST', 'localhost'), ('DB_USER', 'root'), ('DB_PASSWORD', 'bench'), ('DB_NAME', 'bench')]:
+    os.environ.setdefault(name, default)
+
+from sqlalchemy import insert, or_, select
+from app import create_app
+from models import db, Owner, Store, Menu, Category
+from utils.search import search_index
+
+PREFIXES = ['맛있는', '행복한', '고향', '원조', '대박', '우리동네', '명품', '24시', '할머니', '옛날']
+FOODS = ['김치찌개', '된장찌개', '부대찌개', '닭갈비', '불고기', '비빔밥', '떡볶이', '순대', '짜장면', '짬뽕',
+         '탕수육', '마라탕', '초밥', '돈까스', '우동', '피자', '파스타', '햄버거', '치킨', '족발', '보쌈', '냉면']
+SUFFIXES = ['', '세트', '정식', '곱빼기', '(대)', '(소)']
+QUERIES = ['김치찌개', '닭갈비', '마라', '족발', '원조', '치킨', '짬뽕', '냉면', '할머니', '돈까스']
+EXTRA_QUERIES = ['ㄱㅊㅉㄱ', 'ㄷㄱㅂ', '김치ㅉ', '닭']  # LIKE로는 찾을 수 없는 검색어 (초성, 입력 중)
+
+def seed(app, stores, menus_per_store, rng):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        category = Category(category='한식')
+        owner = Owner(owner_id='bench_owner', email='owner@bench.com', owner_passwd='-')
+        db.session.add_all([category, owner])
+        db.session.flush()
+        now = datetime.utcnow()
+        db.session.execute(insert(Store), [{
+            'owner_id': owner.id, 'category_id': category.id, 'category': '한식',
+            'store_name': f'{rng.choice(PREFIXES)} {rng.choice(FOODS)} {i}호점',
+            'information': f'{rng.choice(FOODS)}와 {rng.choice(FOODS)} 전문점입니다.',
+            'phone': '02-0000-0000', 'minprice': '10000원', 'reviewCount': 0,
+            'operationTime': '00:00 - 24:00', 'closedDay': '없음', 'created_at': now
+        } for i in range(stores)])
+        store_ids = db.session.execute(select(Store.id)).scalars().all()
+        db.session.execute(insert(Menu), [{
+            'store_id': store_id, 'menu': rng.choice(FOODS) + rng.choice(SUFFIXES),
+            'price': rng.randrange(5000, 30000, 500), 'created_at': now
+        } for store_id in store_ids for _ in range(menus_per_store)])
+        db.session.commit()
+
+def like_search(query):
+    """비교 대상: 가게 이름/소개/메뉴 이름에 LIKE '%q%' (인덱스를 쓸 수 없는 전체 스캔)"""
+    pattern = f'%{query}%'
+    statement = select(Store.id).outerjoin(Menu, Menu.store_id == Store.id).where(or_(
+        Store.store_name.like(pattern), Store.information.like(pattern), Menu.menu.like(pattern)
+    )).distinct()
+    return set(db.session.execute(statement).scalars().all())
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return result, statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stores', type=int, default=5000)
+    parser.add_argument('--menus-per-store', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-uri', help='기본값: 임시 SQLite 파일')
+    args = parser.parse_args()
+
+    uri = args.database_uri or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri})
+    seed(app, args.stores, args.menus_per_store, random.Random(42))
+
+    with app.app_context():
+        started = time.perf_counter()
+        documents = search_index.rebuild()
+        print(f"가게 {args.stores}개, 메뉴 {args.stores * args.menus_per_store}개 -> "
+              f"문서 {documents}개, 인덱스 생성 {time.perf_counter() - started:.2f}s")
+        print(f"{'query':<12} {'hits':>6} {'index p50':>10} {'p95':>8} {'LIKE p50':>10} {'p95':>8}")
+        for query in QUERIES + EXTRA_QUERIES:
+            (total, _), index_p50, index_p95 = timed(lambda: search_index.search(query, limit=20), args.repeat)
+            line = f"{query:<12} {total:>6} {index_p50:>8.2f}ms {index_p95:>6.2f}ms"
+            if query in QUERIES:
+                expected, like_p50, like_p95 = timed(lambda: like_search(query), max(1, args.repeat // 4))
+                _, hits = search_index.search(query, limit=args.stores)
+                assert total == len(expected) and {hit['store_id'] for hit in hits} == expected, query
+                line += f" {like_p50:>8.2f}ms {like_p95:>6.2f}ms"
+            print(line)
+    print("✅ 역색인 결과가 LIKE 결과와 일치")
+
+if __name__ == '__main__':
+    main()
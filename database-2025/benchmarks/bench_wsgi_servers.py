@@ -0,0 +1,144 @@
+"""개발 서버(app.py) vs gunicorn(wsgi.py) 처리량 비교
+
+같은 합성 데이터(bench_hot_endpoints.py의 seed)를 만들고 두 서버를 차례로 띄워서, 동시 클라이언트가
+읽기 엔드포인트(카테고리별 가게 목록, 가게 상세, 주문 내역, 대기 주문)를 호출할 때의 처리량과 응답 시간을 비교한다.
+gunicorn은 gunicorn.conf.py 설정(preload, fork 후 엔진 정리, graceful shutdown)을 그대로 사용하며,
+종료 신호 후 워커가 모두 끝날 때까지 걸린 시간도 출력한다.
+
+    python benchmarks/bench_wsgi_servers.py
+    python benchmarks/bench_wsgi_servers.py --workers 4 --threads 4 --clients 32
+    python benchmarks/bench_wsgi_servers.py --database-uri mysql+pymysql://root:pw@localhost/bench
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import bench_hot_endpoints as hot
+
+READ_SCENARIOS = ['category_stores', 'store_detail', 'order_history', 'waiting_orders']
+
+def make_app():
+    """벤치마크 서버용 앱 (BENCH_DATABASE_URI 환경 변수의 DB 사용, gunicorn 'bench_wsgi_servers:make_app()')"""
+    return hot.create_app({
+        'SQLALCHEMY_DATABASE_URI': os.environ['BENCH_DATABASE_URI'],
+        'SQL_SLOW_REQUEST_MS': 10 ** 9,
+        'SQL_N_PLUS_ONE_THRESHOLD': 10 ** 9
+    })
+
+def serve_dev(port):
+    """app.py의 __main__과 같은 개발 서버 (디버거 켜짐, 리로더만 끔)"""
+    make_app().run(debug=True, use_reloader=False, host='127.0.0.1', port=port)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'서버가 시작하지 못했습니다 (종료 코드 {process.returncode})')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'{timeout}초 안에 서버가 시작하지 않았습니다.')
+
+def start_server(kind, port, uri, args, log):
+    env = dict(os.environ, BENCH_DATABASE_URI=uri, PORT=str(port))
+    if kind == 'dev':
+        command = [sys.executable, os.path.abspath(__file__), '--serve-dev', str(port)]
+    else:
+        env.update(WEB_CONCURRENCY=str(args.workers), GUNICORN_THREADS=str(args.threads))
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pythonpath', BENCH_DIR,
+                   '--bind', f'127.0.0.1:{port}', 'bench_wsgi_servers:make_app()']
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    started = time.perf_counter()
+    wait_for_port(port, process)
+    return process, time.perf_counter() - started
+
+def stop_server(process):
+    """SIGTERM 후 종료까지 걸린 시간 (graceful shutdown)"""
+    started = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stores-per-category', type=int, default=50)
+    parser.add_argument('--menus-per-store', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--reviews', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--riders', type=int, default=20)
+    parser.add_argument('--clients', type=int, default=16, help='동시 클라이언트 수')
+    parser.add_argument('--requests', type=int, default=800, help='시나리오별 측정 요청 수')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=(os.cpu_count() or 1) * 2 + 1, help='gunicorn 워커 수')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn 워커당 스레드 수')
+    parser.add_argument('--scenario', action='append', choices=list(hot.SCENARIOS), help='기본값: 읽기 시나리오 전체')
+    parser.add_argument('--database-uri', help='기본값: 임시 SQLite 파일')
+    parser.add_argument('--serve-dev', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve_dev:
+        serve_dev(args.serve_dev)
+        return 0
+    if args.clients > args.users:
+        parser.error('--clients는 --users보다 클 수 없습니다.')
+    
+    workdir = tempfile.mkdtemp()
+    uri = args.database_uri or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['BENCH_DATABASE_URI'] = uri
+    data = hot.seed(make_app(), args, random.Random(42))
+    scenarios = args.scenario or READ_SCENARIOS
+    print(f"가게 {len(data['store_ids'])}개, 주문 {args.orders}개, 클라이언트 {args.clients}개, "
+          f"gunicorn 워커 {args.workers}개 x 스레드 {args.threads}개, CPU {os.cpu_count()}개")
+    
+    results = {}
+    for kind in ['dev', 'gunicorn']:
+        with open(os.path.join(workdir, f'{kind}.log'), 'w') as log:
+            port = free_port()
+            process, startup = start_server(kind, port, uri, args, log)
+            try:
+                clients = []
+                for i in range(args.clients):
+                    client = hot.HttpClient(f'http://127.0.0.1:{port}')
+                    status, _ = client.request('POST', '/users/login', {'user_id': f'bench_user{i}', 'passwd': hot.PASSWORD})
+                    assert status == 200, f'로그인 실패: bench_user{i} ({status})'
+                    clients.append((client, {'user_id': data['user_ids'][i]}))
+                results[kind] = {name: hot.run_scenario(name, clients, data, args.requests, args.warmup) for name in scenarios}
+                for client, _ in clients:
+                    client.connection.close()
+            finally:
+                shutdown = stop_server(process)
+        print(f"{kind}: 시작 {startup:.2f}s, 종료(SIGTERM) {shutdown:.2f}s, 로그 {log.name}")
+    
+    print(f"{'scenario':<16} {'dev rps':>9} {'p95':>9} {'gunicorn rps':>13} {'p95':>9} {'speedup':>8}")
+    for name in scenarios:
+        dev, prod = results['dev'][name], results['gunicorn'][name]
+        speedup = prod['rps'] / dev['rps'] if dev['rps'] else float('nan')
+        print(f"{name:<16} {dev['rps']:>9} {dev['p95_ms']:>7.2f}ms {prod['rps']:>13} {prod['p95_ms']:>7.2f}ms {speedup:>7.2f}x")
+        for kind in ['dev', 'gunicorn']:
+            if results[kind][name]['errors']:
+                print(f"    ⚠️ {kind}: 오류 {results[kind][name]['errors']}개 {results[kind][name]['error_samples']}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
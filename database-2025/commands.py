@@ -0,0 +1,171 @@
+import os
+import click
+from flask.cli import AppGroup
+
+stats_cli = AppGroup('stats', help='가게 통계(store_stats) 관리 명령')
+
+@stats_cli.command('rebuild')
+def rebuild_stats():
+    """order/review 테이블에서 store_stats를 다시 계산"""
+    from utils.stats import rebuild_store_stats
+    count = rebuild_store_stats()
+    click.echo(f"✅ {count}개 가게의 통계를 다시 계산했습니다.")
+
+@stats_cli.command('rank')
+@click.option('--every', type=int, default=0, help='N초마다 반복 실행 (0이면 한 번만 실행)')
+@click.option('--chunk-size', default=50000, show_default=True, help='한 번에 읽어서 배열로 변환할 행 수')
+def rank_stores(every, chunk_size):
+    """review/order를 스트리밍으로 읽어서 가게 순위 지표(store_ranking) 재계산 (NumPy 필요)"""
+    import time
+    from utils.ranking import rebuild_rankings
+    while True:
+        started = time.perf_counter()
+        count = rebuild_rankings(chunk_size=chunk_size)
+        click.echo(f"✅ {count}개 가게의 순위 지표를 계산했습니다. ({time.perf_counter() - started:.2f}s)")
+        if not every:
+            return
+        time.sleep(every)
+
+catalog_cli = AppGroup('catalog', help='카탈로그(사용자/가게/메뉴/쿠폰) CSV/JSONL 가져오기/내보내기')
+
+CATALOG_KINDS = click.Choice(['users', 'stores', 'menus', 'coupons'])
+CATALOG_FORMATS = click.Choice(['csv', 'jsonl'])
+
+@catalog_cli.command('export')
+@click.argument('kind', type=CATALOG_KINDS)
+@click.argument('path')
+@click.option('--format', 'fmt', type=CATALOG_FORMATS, help='파일 형식 (기본: 확장자로 판단, .csv 외에는 jsonl)')
+@click.option('--chunk-size', default=1000, show_default=True, help='한 번에 조회/기록할 행 수')
+@click.option('--resume', is_flag=True, help='체크포인트가 있으면 이어서 내보내기')
+def export_catalog(kind, path, fmt, chunk_size, resume):
+    """KIND 테이블을 PATH로 내보내기 (PATH가 '-'이면 표준 출력)
+
+    사용자 passwd는 해시값 그대로 내보내므로 가져올 때 --hashed를 사용한다.
+    """
+    from utils import catalog
+    fmt = catalog.detect_format(path, fmt)
+    fields = catalog.EXPORT_FIELDS[kind]
+    if path == '-':
+        writer = catalog.RowWriter(click.get_text_stream('stdout'), fmt, fields)
+        for rows in catalog.iter_export_chunks(kind, chunk_size=chunk_size):
+            writer.write_rows(rows)
+        return
+
+    checkpoint = catalog.load_checkpoint(path, kind, 'export') if resume else None
+    if checkpoint and os.path.exists(path):
+        # 체크포인트 이후에 쓰다 만 부분은 잘라내고 이어서 기록
+        os.truncate(path, checkpoint['offset'])
+        stream = open(path, 'a', encoding='utf-8', newline='')
+        writer = catalog.RowWriter(stream, fmt, fields, write_header=False)
+        click.echo(f"↪️ {checkpoint['rows']}행 이후부터 이어서 내보냅니다.")
+    else:
+        checkpoint = {'kind': kind, 'mode': 'export', 'last_id': 0, 'rows': 0}
+        stream = open(path, 'w', encoding='utf-8', newline='')
+        writer = catalog.RowWriter(stream, fmt, fields)
+
+    with stream:
+        for rows in catalog.iter_export_chunks(kind, checkpoint['last_id'], chunk_size):
+            writer.write_rows(rows)
+            stream.flush()
+            os.fsync(stream.fileno())
+            checkpoint.update(last_id=rows[-1]['id'], rows=checkpoint['rows'] + len(rows), offset=stream.tell())
+            catalog.save_checkpoint(path, checkpoint)
+    catalog.clear_checkpoint(path)
+    click.echo(f"✅ {kind} {checkpoint['rows']}행을 {path}로 내보냈습니다.")
+
+@catalog_cli.command('import')
+@click.argument('kind', type=CATALOG_KINDS)
+@click.argument('path')
+@click.option('--format', 'fmt', type=CATALOG_FORMATS, help='파일 형식 (기본: 확장자로 판단, .csv 외에는 jsonl)')
+@click.option('--chunk-size', default=1000, show_default=True, help='한 트랜잭션에 가져올 행 수')
+@click.option('--resume', is_flag=True, help='체크포인트가 있으면 마지막으로 커밋한 행 이후부터 가져오기')
+@click.option('--hashed', is_flag=True, help='users: passwd가 이미 해싱된 값 (export한 파일 복원용)')
+@click.option('--owner', 'owner_login', help='stores: owner 컬럼이 없거나 없는 Owner일 때 연결할 Owner 아이디')
+def import_catalog(kind, path, fmt, chunk_size, resume, hashed, owner_login):
+    """PATH의 KIND 데이터를 가져오기 (PATH가 '-'이면 표준 입력)
+
+    관리자 일괄 생성 API와 같은 검증 규칙을 사용하며, 잘못된 행이나 이미 있는 행은 스킵한다.
+    """
+    from utils import catalog
+    from utils.cache import reference_cache
+    fmt = catalog.detect_format(path, fmt)
+    use_checkpoint = path != '-'
+    checkpoint = catalog.load_checkpoint(path, kind, 'import') if resume and use_checkpoint else None
+    if checkpoint:
+        click.echo(f"↪️ {checkpoint['rows']}행 이후부터 이어서 가져옵니다.")
+    else:
+        checkpoint = {'kind': kind, 'mode': 'import', 'rows': 0, 'added': 0}
+
+    try:
+        stream = click.get_text_stream('stdin') if path == '-' else open(path, encoding='utf-8', newline='')
+        with stream:
+            chunks = catalog.import_chunks(
+                kind, catalog.read_rows(stream, fmt), skip=checkpoint['rows'], chunk_size=chunk_size,
+                hashed=hashed, owner_login=owner_login
+            )
+            for rows, added in chunks:
+                checkpoint.update(rows=rows, added=checkpoint['added'] + added)
+                if use_checkpoint:
+                    catalog.save_checkpoint(path, checkpoint)
+                click.echo(f"  {rows}행 처리 ({checkpoint['added']}개 추가)")
+    except (ValueError, OSError) as e:
+        raise click.ClickException(str(e))
+    finally:
+        # 메뉴 등 참조 데이터 캐시 무효화
+        reference_cache.clear()
+    if use_checkpoint:
+        catalog.clear_checkpoint(path)
+    click.echo(f"✅ {kind} {checkpoint['rows']}행 중 {checkpoint['added']}개를 가져왔습니다.")
+
+db_cli = AppGroup('db', help='데이터베이스 준비/스키마 관리 명령 (create_app()은 DB에 접속하지 않으므로 배포 시 init, seed 실행)')
+
+@db_cli.command('init')
+def init_db():
+    """데이터베이스(MySQL)와 테이블이 없으면 생성하고 대기 중인 마이그레이션 적용"""
+    from flask import current_app
+    from utils.migrations import create_database, init_schema
+    database = create_database(current_app.config['SQLALCHEMY_DATABASE_URI'])
+    if database:
+        click.echo(f"✅ 데이터베이스 '{database}' 확인/생성 완료")
+    for version, description in init_schema():
+        click.echo(f"✅ 마이그레이션 {version} 적용: {description}")
+    click.echo("✅ 테이블 생성/확인 완료")
+
+@db_cli.command('seed')
+def seed_db():
+    """기본 데이터(지불방식, 카테고리, 주소 좌표) 중 없는 것만 삽입"""
+    from utils.migrations import seed_defaults
+    added = seed_defaults()
+    click.echo(f"✅ 기본 데이터 삽입 완료 (지불방식 {added['payments']}개, 카테고리 {added['categories']}개, 주소 좌표 {added['geocodes']}개)")
+
+@db_cli.command('migrate')
+def migrate_db():
+    """적용되지 않은 스키마 마이그레이션(utils/migrations.py) 적용"""
+    from utils.migrations import upgrade
+    done = upgrade()
+    for version, description in done:
+        click.echo(f"✅ 마이그레이션 {version} 적용: {description}")
+    if not done:
+        click.echo("이미 최신 스키마입니다.")
+
+@db_cli.command('explain')
+def explain_routes():
+    """GET 라우트가 실행하는 쿼리에 EXPLAIN을 실행해서 풀 스캔을 찾기 (발견 시 종료 코드 1)
+
+    실제 크기에 가까운 데이터가 들어있는 DB에서 실행해야 옵티마이저 판단이 의미가 있다.
+    """
+    from flask import current_app
+    from utils.explain import check_routes
+    findings = check_routes(current_app)
+    for finding in findings:
+        click.echo(f"⚠️ {finding['endpoint']} ({finding['path']}) - {finding['table']} 풀 스캔: {finding['detail']}")
+        click.echo(f"    {finding['sql']}")
+    if findings:
+        raise click.ClickException(f"{len(findings)}개의 쿼리가 인덱스 없이 테이블 전체를 읽습니다.")
+    click.echo("✅ 풀 스캔하는 쿼리가 없습니다.")
+
+def register_commands(app):
+    """Flask CLI 명령 등록"""
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(db_cli)
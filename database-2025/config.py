@@ -23,4 +23,55 @@ DB_CONFIG = {
     'user': get_env_variable('DB_USER'),
     'password': get_env_variable('DB_PASSWORD', allow_empty=True),  # 비밀번호는 빈 문자열 허용, DB_ROOT_PASSWD로 대체 가능
     'database': get_env_variable('DB_NAME')
-}
\ No newline at end of file
+}
+
+def get_int_env(name, default):
+    value = os.getenv(name, '')
+    if value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"환경 변수 '{name}'는 정수여야 합니다. (현재 값: {value})")
+
+def get_bool_env(name, default):
+    value = os.getenv(name, '')
+    if value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+# MySQL 커넥션 풀 설정 (app.py에서 SQLALCHEMY_ENGINE_OPTIONS로 변환, utils/dbpool.py)
+POOL_CONFIG = {
+    'pool_size': get_int_env('DB_POOL_SIZE', 10),              # 유지하는 연결 수
+    'max_overflow': get_int_env('DB_MAX_OVERFLOW', 20),        # 몰릴 때 pool_size를 넘어서 추가로 여는 연결 수
+    'pool_timeout': get_int_env('DB_POOL_TIMEOUT', 10),        # 빈 연결을 기다리는 최대 시간 (초)
+    'pool_recycle': get_int_env('DB_POOL_RECYCLE', 280),       # 이 시간(초)보다 오래된 연결은 다시 연결 (MySQL wait_timeout보다 짧게)
+    'pool_pre_ping': get_bool_env('DB_POOL_PRE_PING', True),   # 체크아웃 시 연결이 살아있는지 확인
+    'connect_timeout': get_int_env('DB_CONNECT_TIMEOUT', 5),   # PyMySQL 연결/읽기/쓰기 타임아웃 (초)
+    'read_timeout': get_int_env('DB_READ_TIMEOUT', 30),
+    'write_timeout': get_int_env('DB_WRITE_TIMEOUT', 30)
+}
+
+# 읽기 복제본 호스트 (쉼표로 구분, primary와 같은 사용자/비밀번호/DB 이름/포트 사용, 비어 있으면 primary만 사용)
+REPLICA_HOSTS = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+REPLICA_STICKY_SECONDS = get_int_env('DB_REPLICA_STICKY_SECONDS', 5)  # 쓰기 후 같은 클라이언트가 primary에서 읽는 시간 (초)
+
+# SQL 로그/프로파일러 (utils/profiler.py)
+SQL_ECHO = get_bool_env('SQLALCHEMY_ECHO', False)                # 실행하는 SQL 전체를 로그로 출력
+SQL_SLOW_REQUEST_MS = get_int_env('SQL_SLOW_REQUEST_MS', 500)     # 이보다 오래 걸린 요청은 경고 로그
+
+# Prometheus 지표 (/metrics) - 여러 워커 프로세스로 실행할 때 프로세스별 값을 저장할 디렉토리 (비우면 프로세스 단위)
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR') or os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+# 운영 서버 설정 (gunicorn -c gunicorn.conf.py wsgi:app)
+# 워커 프로세스마다 커넥션 풀(DB_POOL_SIZE + DB_MAX_OVERFLOW)을 따로 가지므로 threads는 그 이하로 두는 것이 좋다.
+SERVER_CONFIG = {
+    'bind': f"0.0.0.0:{get_int_env('PORT', 5001)}",
+    'workers': get_int_env('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1),  # 워커 프로세스 수
+    'threads': get_int_env('GUNICORN_THREADS', 4),                 # 워커당 요청 처리 스레드 수
+    'timeout': get_int_env('GUNICORN_TIMEOUT', 30),                # 요청 하나가 이보다 오래 걸리면 워커 재시작
+    'graceful_timeout': get_int_env('GUNICORN_GRACEFUL_TIMEOUT', 30),  # 종료 신호 후 처리 중 요청을 기다리는 시간
+    'keepalive': get_int_env('GUNICORN_KEEPALIVE', 5),
+    'max_requests': get_int_env('GUNICORN_MAX_REQUESTS', 0),       # 워커당 이만큼 처리하면 재시작 (0이면 안 함)
+    'preload_app': get_bool_env('GUNICORN_PRELOAD', True)          # 마스터에서 앱을 한 번 로드한 뒤 fork
+}
@@ -0,0 +1,84 @@
+# gunicorn 설정 (gunicorn -c gunicorn.conf.py wsgi:app)
+# 값은 config.SERVER_CONFIG (WEB_CONCURRENCY, GUNICORN_THREADS 등 환경 변수)에서 가져온다.
+import glob
+import os
+import signal
+import tempfile
+import config as app_config
+from config import SERVER_CONFIG, POOL_CONFIG
+
+bind = SERVER_CONFIG['bind']
+workers = SERVER_CONFIG['workers']
+# 라이더 대기 주문 SSE 스트림/롱폴링은 연결마다 스레드 하나를 계속 차지한다.
+# 워커당 동시에 붙는 라이더 수 + 일반 요청용 스레드만큼 GUNICORN_THREADS를 잡아야 한다 (README 참고).
+threads = SERVER_CONFIG['threads']
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = SERVER_CONFIG['timeout']
+graceful_timeout = SERVER_CONFIG['graceful_timeout']
+keepalive = SERVER_CONFIG['keepalive']
+max_requests = SERVER_CONFIG['max_requests']
+max_requests_jitter = max_requests // 10  # 워커들이 한꺼번에 재시작하지 않도록
+preload_app = SERVER_CONFIG['preload_app']
+accesslog = '-'
+
+# 워커가 여러 개면 /metrics가 모든 워커의 합계를 돌려주도록 프로세스별 지표 디렉토리 사용 (앱 로드 전에 설정)
+if workers > 1 and not app_config.METRICS_MULTIPROC_DIR:
+    app_config.METRICS_MULTIPROC_DIR = os.environ['METRICS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='delivery-metrics-')
+
+def _flask_app(server_or_worker):
+    """preload된 Flask 앱 (preload_app=False면 아직 로드 전이므로 None)"""
+    return getattr(server_or_worker.app, 'callable', None)
+
+def on_starting(server):
+    # 이전 실행에서 남은 워커별 지표 파일 삭제 (종료된 워커의 카운터가 계속 합산되지 않도록)
+    if app_config.METRICS_MULTIPROC_DIR:
+        for path in glob.glob(os.path.join(app_config.METRICS_MULTIPROC_DIR, 'metrics-*.json')):
+            os.remove(path)
+    if threads > POOL_CONFIG['pool_size'] + POOL_CONFIG['max_overflow']:
+        server.log.warning(
+            f"GUNICORN_THREADS({threads})가 워커당 DB 연결 수(DB_POOL_SIZE + DB_MAX_OVERFLOW = "
+            f"{POOL_CONFIG['pool_size'] + POOL_CONFIG['max_overflow']})보다 많아서 스레드가 연결을 기다릴 수 있습니다."
+        )
+
+def when_ready(server):
+    # preload 중에 마스터가 DB 연결을 열었다면(create_app은 접속하지 않지만 확장 등에서) 닫아서 워커가 물려받지 않게 함
+    app = _flask_app(server)
+    if app is not None:
+        from utils.dbpool import dispose_engines
+        dispose_engines(app)
+    server.log.info(f"워커 {workers}개 x 스레드 {threads}개 ({worker_class}), preload={preload_app}")
+
+def post_fork(server, worker):
+    # 혹시 남은 부모의 연결은 닫지 않고 버림 (부모/다른 워커와 같은 소켓을 쓰지 않도록), 부모의 누적 지표도 초기화
+    app = _flask_app(worker)
+    if app is not None:
+        from utils.dbpool import dispose_engines, reset_pool_metrics
+        from utils.profiler import query_profiler
+        dispose_engines(app, close=False)
+        reset_pool_metrics()
+        query_profiler.reset()
+
+def post_worker_init(worker):
+    # 검색 인덱스를 워커마다 미리 만들기 시작 (첫 검색 요청이 인덱스 생성을 기다리지 않도록, 앱은 이 시점에 로드되어 있음)
+    from utils.search import search_index
+    search_index.warm()
+    
+    # 종료 신호(SIGTERM)를 받으면 SSE/롱폴링 대기를 깨워서 처리 중 요청이 graceful_timeout 안에 끝나게 함
+    from utils.dispatch import dispatch_feed
+    previous = signal.getsignal(signal.SIGTERM)
+    
+    def handle_term(signum, frame):
+        dispatch_feed.close()
+        if callable(previous):
+            previous(signum, frame)
+    
+    signal.signal(signal.SIGTERM, handle_term)
+
+def worker_exit(server, worker):
+    # 마지막 지표를 저장하고 DB 연결을 정상적으로 닫음
+    app = _flask_app(worker)
+    from utils.metrics import metrics
+    metrics.flush()
+    if app is not None:
+        from utils.dbpool import dispose_engines
+        dispose_engines(app)
@@ -1,8 +1,11 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import declared_attr
 from werkzeug.security import generate_password_hash, check_password_hash
+from utils.replicas import RoutingSession
 
-db = SQLAlchemy()
+# 세션은 읽기 복제본이 설정되어 있으면 요청의 읽기 쿼리를 복제본으로 보냄 (utils/replicas.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'user'
@@ -13,6 +16,9 @@ class User(db.Model):
     email = db.Column(db.String(30), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     address = db.Column(db.String(100), nullable=False)
+    # 주소를 address_geocode로 변환한 좌표 (찾지 못하면 NULL - 배달 가능 지역 필터를 쓰지 않음)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     update_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -79,9 +85,19 @@ class Store(db.Model):
     operationTime = db.Column(db.String(250), nullable=False)
     closedDay = db.Column(db.String(250), nullable=False)
     information = db.Column(db.String(500), nullable=True)  # 가게 정보
+    # 가게 좌표 / 배달 반경(m) / 좌표의 geohash (배달 가능 지역 조회용, utils/geo.py에서 계산)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    delivery_radius = db.Column(db.Integer, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     update_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
     
+    __table_args__ = (
+        db.Index('ix_store_category_id', 'category_id'),
+        db.Index('ix_store_category_id_geohash', 'category_id', 'geohash'),
+    )
+    
     # Relationships
     menus = db.relationship('Menu', backref='store', lazy=True)
     orders = db.relationship('Order', backref='store', lazy=True)
@@ -99,6 +115,10 @@ class Menu(db.Model):
     price = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     update_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_menu_store_id', 'store_id'),
+    )
 
 class Order(db.Model):
     __tablename__ = 'order'
@@ -107,9 +127,53 @@ class Order(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     store_id = db.Column(db.Integer, db.ForeignKey('store.id'), nullable=False)
     rider_id = db.Column(db.Integer, db.ForeignKey('rider.id'), nullable=True)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'), nullable=True)  # 주문 시 선택한 지불방식
     order = db.Column(db.String(100), nullable=False)
     total_price = db.Column(db.Integer, nullable=False)
     order_time = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_order_store_id_order_time', 'store_id', 'order_time'),
+        db.Index('ix_order_user_id_order_time', 'user_id', 'order_time'),
+        # 대기 주문(rider_id IS NULL) 조회용 (MySQL은 부분 인덱스가 없어서 rider_id를 앞에 둔 복합 인덱스 사용)
+        db.Index('ix_order_rider_id_order_time', 'rider_id', 'order_time'),
+    )
+    
+    # Relationships
+    items = db.relationship('OrderItem', backref='order', lazy=True)
+
+class OrderItem(db.Model):
+    __tablename__ = 'order_item'
+    
+    # 주문 항목 (주문 시점의 단가를 함께 저장해서 메뉴 가격이 바뀌어도 매출 집계가 유지됨)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    menu_id = db.Column(db.Integer, db.ForeignKey('menu.id', ondelete='SET NULL'), nullable=True)  # 메뉴가 삭제되어도 주문 기록은 유지
+    qty = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Integer, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_order_item_order_id', 'order_id'),
+        db.Index('ix_order_item_menu_id', 'menu_id'),
+    )
+
+class CartItem(db.Model):
+    __tablename__ = 'cart_item'
+    
+    # 서버 측 장바구니 (사용자당 한 가게의 메뉴만 담음, 가격은 담을 때가 아니라 주문할 때 계산)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    store_id = db.Column(db.Integer, db.ForeignKey('store.id'), nullable=False)
+    menu_id = db.Column(db.Integer, db.ForeignKey('menu.id', ondelete='CASCADE'), nullable=False)
+    qty = db.Column(db.Integer, default=1, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    update_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'menu_id', name='uq_cart_item_user_id_menu_id'),
+        db.Index('ix_cart_item_menu_id', 'menu_id'),
+        db.Index('ix_cart_item_store_id', 'store_id'),
+    )
 
 class Review(db.Model):
     __tablename__ = 'review'
@@ -122,6 +186,11 @@ class Review(db.Model):
     content = db.Column(db.String(200), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     update_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_review_store_id_created_at', 'store_id', 'created_at'),
+        db.Index('ix_review_user_id_order_id', 'user_id', 'order_id'),
+    )
 
 class FavoriteStore(db.Model):
     __tablename__ = 'favorite_store'
@@ -131,6 +200,10 @@ class FavoriteStore(db.Model):
     store_id = db.Column(db.Integer, db.ForeignKey('store.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_favorite_store_user_id_is_deleted', 'user_id', 'is_deleted'),
+    )
 
 class Payment(db.Model):
     __tablename__ = 'payment'
@@ -146,6 +219,10 @@ class Coupon(db.Model):
     period = db.Column(db.Integer, nullable=True)  # 유효기간 (일 단위)
     discount = db.Column(db.Integer, nullable=True)  # 할인 금액 또는 할인율
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_coupon_store_id_is_deleted', 'store_id', 'is_deleted'),
+    )
 
 class StorePayment(db.Model):
     __tablename__ = 'store_payment'
@@ -155,7 +232,120 @@ class StorePayment(db.Model):
     payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
+    __table_args__ = (
+        db.Index('ix_store_payment_store_id', 'store_id'),
+    )
+    
     # Relationships
     store = db.relationship('Store', backref='store_payments', lazy=True)
     payment = db.relationship('Payment', backref='store_payments', lazy=True)
 
+
+class StoreStats(db.Model):
+    __tablename__ = 'store_stats'
+    
+    # 가게별 집계 값 (주문/리뷰 작성 시 같은 트랜잭션에서 증분 갱신)
+    store_id = db.Column(db.Integer, db.ForeignKey('store.id'), primary_key=True)
+    order_count = db.Column(db.Integer, default=0, nullable=False)
+    review_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    last_order_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationships
+    store = db.relationship('Store', backref=db.backref('stats', uselist=False), lazy=True)
+    
+    @property
+    def avg_rating(self):
+        if not self.review_count:
+            return 0.0
+        return round(self.rating_sum / self.review_count, 1)
+
+
+class StoreRanking(db.Model):
+    __tablename__ = 'store_ranking'
+    
+    # 가게 순위 지표 (주기적인 일괄 계산 작업 결과, utils/ranking.py)
+    store_id = db.Column(db.Integer, db.ForeignKey('store.id'), primary_key=True)
+    review_count = db.Column(db.Integer, default=0, nullable=False)
+    order_count = db.Column(db.Integer, default=0, nullable=False)
+    bayes_rating = db.Column(db.Float, nullable=False)  # 리뷰 수를 반영한 베이지안 평균 별점
+    rating_percentile = db.Column(db.Float, nullable=False)  # 0~100, 높을수록 상위
+    popularity_percentile = db.Column(db.Float, nullable=False)  # 주문 수 기준 0~100
+    trending_score = db.Column(db.Float, nullable=False)  # 최근 7일 주문 / 이전 4주 주간 평균 (1보다 크면 상승세)
+    computed_at = db.Column(db.DateTime, nullable=False)
+
+
+class SalesRollupMixin:
+    # 가게별 시간 구간(bucket) 집계 값 (주문/리뷰 작성 시 같은 트랜잭션에서 증분 갱신)
+    @declared_attr
+    def store_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('store.id'), primary_key=True)
+    
+    bucket = db.Column(db.DateTime, primary_key=True)  # 구간 시작 시각 (UTC)
+    order_count = db.Column(db.Integer, default=0, nullable=False)
+    revenue = db.Column(db.BigInteger, default=0, nullable=False)
+    review_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    # 별점 분포 (1~5점 리뷰 수)
+    rating_1 = db.Column(db.Integer, default=0, nullable=False)
+    rating_2 = db.Column(db.Integer, default=0, nullable=False)
+    rating_3 = db.Column(db.Integer, default=0, nullable=False)
+    rating_4 = db.Column(db.Integer, default=0, nullable=False)
+    rating_5 = db.Column(db.Integer, default=0, nullable=False)
+
+class StoreSalesHourly(SalesRollupMixin, db.Model):
+    __tablename__ = 'store_sales_hourly'
+
+class StoreSalesDaily(SalesRollupMixin, db.Model):
+    __tablename__ = 'store_sales_daily'
+
+class AddressGeocode(db.Model):
+    __tablename__ = 'address_geocode'
+    
+    # 로컬 지오코딩 테이블: 정규화된 주소(앞부분) -> 좌표 (utils/geo.py)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    address = db.Column(db.String(100), unique=True, nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_key'
+    
+    # Idempotency-Key 헤더로 받은 요청의 결과 (utils/idempotency.py) - 같은 키로 재시도하면 저장된 응답을 재전송
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    scope = db.Column(db.String(100), nullable=False)  # 엔드포인트 이름 (예: customer.create_order)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # 메서드 + 경로 + 본문의 SHA-256
+    status_code = db.Column(db.Integer, nullable=True)  # 처리 중이면 None
+    locked_until = db.Column(db.DateTime, nullable=True)  # 처리 중인 요청의 lease (지나면 같은 키로 다시 실행 가능)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'scope', 'key', name='uq_idempotency_key_user_id_scope_key'),
+        db.Index('ix_idempotency_key_expires_at', 'expires_at'),
+    )
+
+class DispatchEvent(db.Model):
+    __tablename__ = 'dispatch_event'
+    
+    # 라이더 배차 피드 이벤트 (utils/dispatch.py) - 주문 생성/수락과 같은 트랜잭션에서 기록, 워커마다 폴링해서 구독자에게 전달
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_type = db.Column(db.String(20), nullable=False)  # created, accepted
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_dispatch_event_created_at', 'created_at'),
+    )
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migration'
+    
+    # 적용된 스키마 마이그레이션 버전 기록 (utils/migrations.py)
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
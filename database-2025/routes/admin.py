@@ -1,18 +1,199 @@
 from flask import Blueprint, request, jsonify, render_template
-from models import db, Category, User, Store, Menu, Coupon, Owner, Rider, Order, Review, FavoriteStore, Payment
+from models import db, Category, User, Store, Menu, Coupon, Owner, Rider, Order, OrderItem, CartItem, Review, IdempotencyKey, FavoriteStore, Payment, StoreStats, StoreRanking
+from utils.auth import public_endpoint
+from utils.stats import reset_store_stats, clear_sales_rollups
+from utils.cache import reference_cache, categories_key, payment_methods_key, store_menus_key
+from utils.search import search_index
+from utils.geo import geocode_many, store_location, SEOUL_DISTRICTS
+from utils.bulk import existing_values, bulk_insert, hash_passwords
+from utils.dbpool import pool_snapshot
+from utils.profiler import query_profiler
 from datetime import datetime
+import time
 
 bp = Blueprint('admin', __name__)
 
+# 일괄 생성 헬퍼 (관리자 API와 카탈로그 CLI가 같은 검증 규칙을 사용)
+USER_FIELDS = ['user_id', 'passwd', 'email', 'name', 'address']
+STORE_FIELDS = ['store_name', 'category_id', 'phone', 'minprice', 'operationTime', 'closedDay', 'payment_id']
+STORE_TEXT_FIELDS = ['store_name', 'phone', 'minprice', 'operationTime', 'closedDay']
+MENU_FIELDS = ['store_id', 'menu', 'price']
+COUPON_FIELDS = ['store_id', 'discount']
+# 테스트 가게를 배치할 서울시 구 (utils.geo.SEOUL_DISTRICTS 이름)
+SEED_STORE_DISTRICTS = ['강남구', '서초구', '송파구']
+
+def _bulk_result(message, added, started):
+    """일괄 생성 결과 응답 (처리 시간, 초당 행 수 포함)"""
+    elapsed = time.perf_counter() - started
+    return jsonify({
+        'message': message,
+        'added': added,
+        'elapsed': round(elapsed, 3),
+        'rows_per_sec': round(added / elapsed, 1) if elapsed > 0 else None
+    }), 200
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _all_store_menu_keys():
+    """모든 가게의 메뉴 캐시 키 (가게/메뉴를 지우기 전에 구해둔다)"""
+    return [store_menus_key(store_id) for (store_id,) in db.session.query(Store.id).all()]
+
+def _menu_keys(menus):
+    """메뉴 데이터가 속한 가게들의 메뉴 캐시 키"""
+    store_ids = {_to_int(menu_data.get('store_id')) for menu_data in menus}
+    return [store_menus_key(store_id) for store_id in store_ids if store_id is not None]
+
+def get_or_create_owner(owner_id, email, password):
+    """가게를 붙일 Owner (아무 Owner도 없으면 새로 생성)"""
+    owner = Owner.query.first()
+    if not owner:
+        owner = Owner(owner_id=owner_id, email=email)
+        owner.set_password(password)
+        db.session.add(owner)
+        db.session.flush()
+    return owner
+
+def bulk_create_categories(names):
+    """카테고리 일괄 생성 (빈 이름/이미 있는 이름은 스킵), 반환값: 추가된 개수"""
+    names = [name.strip() for name in names if name and name.strip()]
+    existing = existing_values(Category.category, names)
+    return bulk_insert(Category, [
+        {'category': name} for name in dict.fromkeys(names) if name not in existing
+    ])
+
+def bulk_create_users(users, hashed=False):
+    """사용자 일괄 생성 (필드 누락/이미 있는 아이디는 스킵), 반환값: 추가된 개수
+    
+    hashed=True면 passwd를 이미 해싱된 값으로 보고 그대로 저장한다 (카탈로그 백업 복원용).
+    """
+    candidates = {}
+    for user_data in users:
+        if all(k in user_data for k in USER_FIELDS):
+            candidates.setdefault(user_data['user_id'], user_data)
+    
+    existing = existing_values(User.user_id, list(candidates))
+    new_users = [user_data for user_id, user_data in candidates.items() if user_id not in existing]
+    passwords = [user_data['passwd'] for user_data in new_users]
+    hashes = passwords if hashed else hash_passwords(passwords)
+    # 주소 좌표는 한 번의 IN 조회로 변환 (못 찾은 주소는 NULL)
+    coordinates = geocode_many(user_data['address'] for user_data in new_users)
+    return bulk_insert(User, [{
+        'user_id': user_data['user_id'],
+        'passwd': passwd_hash,
+        'email': user_data['email'],
+        'name': user_data['name'],
+        'address': user_data['address'],
+        'latitude': coordinates.get(user_data['address'], (None, None))[0],
+        'longitude': coordinates.get(user_data['address'], (None, None))[1]
+    } for user_data, passwd_hash in zip(new_users, hashes)])
+
+def is_valid_store_row(store_data):
+    """가게 필수 필드/값 검증 (지불방식/카테고리 존재 여부는 제외)"""
+    if not all(k in store_data for k in STORE_FIELDS):
+        return False
+    for field in STORE_TEXT_FIELDS:
+        if not store_data[field] or not store_data[field].strip():
+            return False
+    return _to_int(store_data.get('payment_id')) is not None and _to_int(store_data['category_id']) is not None
+
+def bulk_create_stores(stores, owner):
+    """가게 일괄 생성 (검증 실패/없는 지불방식·카테고리/이미 있는 이름은 스킵), 반환값: 추가된 개수"""
+    candidates = [store_data for store_data in stores if is_valid_store_row(store_data)]
+    payment_ids = existing_values(Payment.id, [_to_int(s['payment_id']) for s in candidates])
+    category_ids = {_to_int(s['category_id']) for s in candidates}
+    categories = {
+        category.id: category.category
+        for category in Category.query.filter(Category.id.in_(category_ids)).all()
+    } if category_ids else {}
+    seen = existing_values(Store.store_name, [s['store_name'] for s in candidates])
+    
+    rows = []
+    for store_data in candidates:
+        payment_id = _to_int(store_data['payment_id'])
+        category_id = _to_int(store_data['category_id'])
+        if payment_id not in payment_ids or category_id not in categories:
+            continue
+        if store_data['store_name'] in seen:
+            continue
+        try:
+            location = store_location(store_data)
+        except ValueError:
+            continue
+        seen.add(store_data['store_name'])
+        rows.append({
+            'owner_id': owner.id,
+            'category_id': category_id,
+            'payment_id': payment_id,
+            'store_name': store_data['store_name'],
+            'category': categories[category_id],  # Category 테이블에서 가져온 카테고리 이름
+            'phone': store_data['phone'],
+            'minprice': store_data['minprice'],
+            'reviewCount': 0,
+            'operationTime': store_data['operationTime'],
+            'closedDay': store_data['closedDay'],
+            'information': store_data.get('information'),
+            # 좌표가 없는 가게는 위치 컬럼을 NULL로 (배달 가능 지역 조회에서 제외)
+            'latitude': location.get('latitude'),
+            'longitude': location.get('longitude'),
+            'delivery_radius': location.get('delivery_radius'),
+            'geohash': location.get('geohash')
+        })
+    return bulk_insert(Store, rows)
+
+def bulk_create_menus(menus):
+    """메뉴 일괄 생성 (필드 누락/없는 가게/같은 가게의 같은 메뉴는 스킵), 반환값: 추가된 개수"""
+    candidates = [
+        dict(menu_data, store_id=_to_int(menu_data['store_id']), price=_to_int(menu_data['price']))
+        for menu_data in menus if all(k in menu_data for k in MENU_FIELDS)
+    ]
+    candidates = [m for m in candidates if m['price'] is not None]
+    store_ids = existing_values(Store.id, [m['store_id'] for m in candidates if m['store_id'] is not None])
+    candidates = [m for m in candidates if m['store_id'] in store_ids]
+    seen = existing_values((Menu.store_id, Menu.menu), [(m['store_id'], m['menu']) for m in candidates])
+    
+    rows = []
+    for menu_data in candidates:
+        key = (menu_data['store_id'], menu_data['menu'])
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({'store_id': menu_data['store_id'], 'menu': menu_data['menu'], 'price': menu_data['price']})
+    return bulk_insert(Menu, rows)
+
+def bulk_create_coupons(coupons):
+    """쿠폰 일괄 생성 (필드 누락/숫자가 아닌 값/없는 가게는 스킵), 반환값: 추가된 개수"""
+    candidates = [
+        dict(coupon_data,
+             store_id=_to_int(coupon_data['store_id']),
+             discount=_to_int(coupon_data['discount']),
+             period=_to_int(coupon_data.get('period', 30)))
+        for coupon_data in coupons if all(k in coupon_data for k in COUPON_FIELDS)
+    ]
+    candidates = [c for c in candidates if c['discount'] is not None and c['period'] is not None]
+    store_ids = existing_values(Store.id, [c['store_id'] for c in candidates if c['store_id'] is not None])
+    return bulk_insert(Coupon, [{
+        'store_id': coupon_data['store_id'],
+        'discount': coupon_data['discount'],
+        'period': coupon_data['period'],
+        'is_deleted': False
+    } for coupon_data in candidates if coupon_data['store_id'] in store_ids])
+
 @bp.route('/page')
+@public_endpoint
 def admin_page():
     """관리자 페이지"""
     return render_template('admin.html')
 
 @bp.route('/categories/seed', methods=['POST'])
+@public_endpoint
 def seed_categories():
     """카테고리 기본 데이터 추가"""
     try:
+        started = time.perf_counter()
         categories = [
             '한식',
             '중식',
@@ -22,73 +203,79 @@ def seed_categories():
             '패스트푸드'
         ]
         
-        added = 0
-        for cat_name in categories:
-            existing = Category.query.filter_by(category=cat_name).first()
-            if not existing:
-                category = Category(category=cat_name)
-                db.session.add(category)
-                added += 1
+        added = bulk_create_categories(categories)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 카테고리가 추가되었습니다.'}), 200
+        reference_cache.invalidate(categories_key())
+        return _bulk_result(f'{added}개의 카테고리가 추가되었습니다.', added, started)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/categories/clear', methods=['DELETE'])
+@public_endpoint
 def clear_categories():
     """카테고리 전체 삭제"""
     try:
+        menu_keys = _all_store_menu_keys()
         # Category를 참조하는 Store 먼저 삭제 (Store의 자식들도 함께)
+        OrderItem.query.delete()
+        CartItem.query.delete()
         Menu.query.delete()
         Coupon.query.delete()
         Payment.query.delete()
         Review.query.delete()
         FavoriteStore.query.delete()
         Order.query.delete()
+        StoreStats.query.delete()
+        StoreRanking.query.delete()
+        clear_sales_rollups()
         Store.query.delete()
         # 이제 Category 삭제 가능
         Category.query.delete()
         db.session.commit()
-        return jsonify({'message': '모든 카테고리가 삭제되었습니다.'}), 200
+        reference_cache.invalidate(categories_key(), payment_methods_key(), *menu_keys)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return jsonify({'message': '모든 카테고리가 삭제되었습니다.'}), 200
 
 @bp.route('/users/seed', methods=['POST'])
+@public_endpoint
 def seed_users():
     """테스트 사용자 추가"""
     try:
+        started = time.perf_counter()
         users_data = [
             {'user_id': 'testuser1', 'passwd': 'test123', 'email': 'test1@test.com', 'name': '테스트 사용자1', 'address': '서울시 강남구'},
             {'user_id': 'testuser2', 'passwd': 'test123', 'email': 'test2@test.com', 'name': '테스트 사용자2', 'address': '서울시 서초구'},
             {'user_id': 'testuser3', 'passwd': 'test123', 'email': 'test3@test.com', 'name': '테스트 사용자3', 'address': '서울시 송파구'},
         ]
         
-        added = 0
-        for user_data in users_data:
-            existing = User.query.filter_by(user_id=user_data['user_id']).first()
-            if not existing:
-                user = User(**user_data)
-                user.set_password(user_data['passwd'])
-                db.session.add(user)
-                added += 1
+        added = bulk_create_users(users_data)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 테스트 사용자가 추가되었습니다.'}), 200
+        return _bulk_result(f'{added}개의 테스트 사용자가 추가되었습니다.', added, started)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/users/clear', methods=['DELETE'])
+@public_endpoint
 def clear_users():
     """사용자 전체 삭제"""
     try:
         # User를 참조하는 테이블들 먼저 삭제
+        OrderItem.query.delete()
         Order.query.delete()
         Review.query.delete()
         FavoriteStore.query.delete()
+        CartItem.query.delete()
+        IdempotencyKey.query.delete()
+        # 주문/리뷰가 모두 삭제되었으므로 가게 통계 초기화
+        reset_store_stats()
         # 이제 User 삭제 가능
         User.query.delete()
         db.session.commit()
@@ -98,21 +285,13 @@ def clear_users():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/stores/seed', methods=['POST'])
+@public_endpoint
 def seed_stores():
     """테스트 가게 추가 - 카테고리별로 3개씩"""
     try:
-        # Owner가 있는지 확인하고 없으면 생성
-        owner = Owner.query.first()
-        if not owner:
-            # 테스트 Owner 생성
-            owner = Owner(
-                owner_id='testowner',
-                email='owner@test.com',
-                owner_passwd='test123'
-            )
-            owner.set_password('test123')
-            db.session.add(owner)
-            db.session.flush()
+        started = time.perf_counter()
+        # Owner가 있는지 확인하고 없으면 테스트 Owner 생성
+        owner = get_or_create_owner('testowner', 'owner@test.com', 'test123')
         
         # 모든 카테고리 가져오기
         categories = Category.query.all()
@@ -153,72 +332,73 @@ def seed_stores():
             ]
         }
         
-        added = 0
-        for category in categories:
-            category_name = category.category
-            # 카테고리에 해당하는 가게 템플릿 가져오기
-            templates = store_templates.get(category_name, [])
-            
-            # 각 카테고리당 3개씩 가게 생성
-            for i, template in enumerate(templates[:3]):
-                store_name = template['store_name']
-                # 이미 존재하는 가게인지 확인 (같은 이름이 있으면 스킵)
-                existing = Store.query.filter_by(store_name=store_name).first()
-                if existing:
-                    continue
-                
-                # category_id로 Category 테이블에서 확인하고 category 필드에 자동으로 채우기
-                store = Store(
-                    owner_id=owner.id,
-                    category_id=category.id,
-                    category=category.category,  # Category 테이블에서 가져온 카테고리 이름
-                    store_name=store_name,
-                    phone=template['phone'],
-                    minprice=template['minprice'],
-                    operationTime=template['operationTime'],
-                    closedDay=template['closedDay']
-                )
-                # 기본 지불방식 추가 (첫 번째 지불방식 사용)
-                default_payment = Payment.query.filter_by(payment='만나서 카드결제').first()
-                if not default_payment:
-                    # 지불방식이 없으면 생성
-                    default_payment = Payment(payment='만나서 카드결제')
-                    db.session.add(default_payment)
-                    db.session.flush()
-                
-                store.payment_id = default_payment.id
-                db.session.add(store)
-                added += 1
+        # 기본 지불방식 (첫 번째 지불방식 사용, 없으면 생성)
+        default_payment = Payment.query.filter_by(payment='만나서 카드결제').first()
+        payment_added = default_payment is None
+        if payment_added:
+            default_payment = Payment(payment='만나서 카드결제')
+            db.session.add(default_payment)
+            db.session.flush()
+        
+        # 카테고리별 가게 템플릿을 모아서 한 번에 생성 (같은 이름이 있으면 스킵)
+        stores = [
+            dict(template, category_id=category.id, payment_id=default_payment.id)
+            for category in categories
+            for template in store_templates.get(category.category, [])[:3]
+        ]
+        # 테스트 사용자 주소(강남/서초/송파)에 번갈아 배치 (구청 좌표에서 조금씩 떨어뜨림)
+        districts = {name: (latitude, longitude) for name, latitude, longitude in SEOUL_DISTRICTS}
+        for i, store_data in enumerate(stores):
+            latitude, longitude = districts[SEED_STORE_DISTRICTS[i % len(SEED_STORE_DISTRICTS)]]
+            store_data['latitude'] = latitude + (i % 3 - 1) * 0.004
+            store_data['longitude'] = longitude + (i % 5 - 2) * 0.004
+        added = bulk_create_stores(stores, owner)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 테스트 가게가 추가되었습니다.'}), 200
+        if payment_added:
+            reference_cache.invalidate(payment_methods_key())
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return _bulk_result(f'{added}개의 테스트 가게가 추가되었습니다.', added, started)
 
 @bp.route('/stores/clear', methods=['DELETE'])
+@public_endpoint
 def clear_stores():
     """가게 전체 삭제"""
     try:
+        menu_keys = _all_store_menu_keys()
         # Store를 참조하는 모든 테이블 먼저 삭제
+        OrderItem.query.delete()
+        CartItem.query.delete()
         Menu.query.delete()
         Coupon.query.delete()
         Payment.query.delete()
         Review.query.delete()
         FavoriteStore.query.delete()
         Order.query.delete()
+        StoreStats.query.delete()
+        StoreRanking.query.delete()
+        clear_sales_rollups()
         # 이제 Store 삭제 가능
         Store.query.delete()
         db.session.commit()
-        return jsonify({'message': '모든 가게가 삭제되었습니다.'}), 200
+        reference_cache.invalidate(payment_methods_key(), *menu_keys)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return jsonify({'message': '모든 가게가 삭제되었습니다.'}), 200
 
 @bp.route('/menus/seed', methods=['POST'])
+@public_endpoint
 def seed_menus():
     """테스트 메뉴 추가 - 각 가게마다 카테고리에 맞는 메뉴 3개씩"""
     try:
+        started = time.perf_counter()
         stores = Store.query.all()
         if not stores:
             return jsonify({'error': '먼저 가게를 추가해주세요.'}), 400
@@ -269,72 +449,80 @@ def seed_menus():
             ]
         }
         
-        added = 0
-        for store in stores:
-            # 가게의 카테고리 가져오기
-            category = db.session.get(Category, store.category_id)
-            if not category:
-                continue
-            
-            category_name = category.category
-            # 카테고리에 맞는 메뉴 목록 가져오기
-            category_menus = menus_by_category.get(category_name, [])
-            
-            # 각 가게당 최소 3개씩 메뉴 추가
-            for menu_data in category_menus[:3]:
-                existing = Menu.query.filter_by(store_id=store.id, menu=menu_data['menu']).first()
-                if not existing:
-                    menu = Menu(store_id=store.id, **menu_data)
-                    db.session.add(menu)
-                    added += 1
+        # 가게 카테고리 이름을 한 번에 조회
+        category_names = {category.id: category.category for category in Category.query.all()}
+        
+        # 각 가게당 카테고리에 맞는 메뉴 3개씩 (이미 있는 메뉴는 bulk_create_menus에서 스킵)
+        menus = [
+            dict(menu_data, store_id=store.id)
+            for store in stores
+            if store.category_id in category_names
+            for menu_data in menus_by_category.get(category_names[store.category_id], [])[:3]
+        ]
+        added = bulk_create_menus(menus)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 테스트 메뉴가 추가되었습니다.'}), 200
+        reference_cache.invalidate(*_menu_keys(menus))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return _bulk_result(f'{added}개의 테스트 메뉴가 추가되었습니다.', added, started)
 
 @bp.route('/menus/clear', methods=['DELETE'])
+@public_endpoint
 def clear_menus():
     """메뉴 전체 삭제"""
     try:
+        menu_keys = _all_store_menu_keys()
+        CartItem.query.delete()
         Menu.query.delete()
         db.session.commit()
-        return jsonify({'message': '모든 메뉴가 삭제되었습니다.'}), 200
+        reference_cache.invalidate(*menu_keys)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return jsonify({'message': '모든 메뉴가 삭제되었습니다.'}), 200
 
 @bp.route('/coupons/seed', methods=['POST'])
+@public_endpoint
 def seed_coupons():
     """테스트 쿠폰 추가"""
     try:
-        stores = Store.query.all()
-        if not stores:
+        started = time.perf_counter()
+        store_ids = [store_id for (store_id,) in db.session.query(Store.id).all()]
+        if not store_ids:
             return jsonify({'error': '먼저 가게를 추가해주세요.'}), 400
         
-        added = 0
-        for store in stores:
-            coupons_data = [
-                {'discount': 1000, 'period': 30},
-                {'discount': 2000, 'period': 60},
-                {'discount': 3000, 'period': 90},
-            ]
-            
-            for coupon_data in coupons_data:
-                existing = Coupon.query.filter_by(store_id=store.id, discount=coupon_data['discount']).first()
-                if not existing:
-                    coupon = Coupon(store_id=store.id, is_deleted=False, **coupon_data)
-                    db.session.add(coupon)
-                    added += 1
+        coupons_data = [
+            {'discount': 1000, 'period': 30},
+            {'discount': 2000, 'period': 60},
+            {'discount': 3000, 'period': 90},
+        ]
+        
+        # 가게별로 같은 할인 금액의 쿠폰이 이미 있으면 건너뜀 (한 번의 IN 조회로 확인)
+        existing = existing_values(
+            (Coupon.store_id, Coupon.discount),
+            [(store_id, coupon_data['discount']) for store_id in store_ids for coupon_data in coupons_data]
+        )
+        added = bulk_create_coupons([
+            {'store_id': store_id, **coupon_data}
+            for store_id in store_ids
+            for coupon_data in coupons_data
+            if (store_id, coupon_data['discount']) not in existing
+        ])
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 테스트 쿠폰이 추가되었습니다.'}), 200
+        return _bulk_result(f'{added}개의 테스트 쿠폰이 추가되었습니다.', added, started)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/coupons/clear', methods=['DELETE'])
+@public_endpoint
 def clear_coupons():
     """쿠폰 전체 삭제"""
     try:
@@ -346,17 +534,24 @@ def clear_coupons():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/reset', methods=['POST'])
+@public_endpoint
 def reset_all():
     """모든 데이터 초기화"""
     try:
+        menu_keys = _all_store_menu_keys()
         # 외래키 제약 때문에 순서 중요
         # Store를 참조하는 테이블들 먼저 삭제
+        OrderItem.query.delete()
+        CartItem.query.delete()
         Menu.query.delete()
         Coupon.query.delete()
         Payment.query.delete()
         Review.query.delete()
         FavoriteStore.query.delete()
         Order.query.delete()
+        StoreStats.query.delete()
+        StoreRanking.query.delete()
+        clear_sales_rollups()
         
         # 이제 Store 삭제 가능
         Store.query.delete()
@@ -365,6 +560,7 @@ def reset_all():
         Category.query.delete()
         
         # User 삭제 (Order, Review, FavoriteStore가 이미 삭제되었으므로 가능)
+        IdempotencyKey.query.delete()
         User.query.delete()
         
         # Owner 삭제 (Store가 이미 삭제되었으므로 가능)
@@ -374,16 +570,21 @@ def reset_all():
         Rider.query.delete()
         
         db.session.commit()
-        return jsonify({'message': '모든 데이터가 초기화되었습니다.'}), 200
+        reference_cache.invalidate(categories_key(), payment_methods_key(), *menu_keys)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return jsonify({'message': '모든 데이터가 초기화되었습니다.'}), 200
 
 # 직접 입력 생성 API
 @bp.route('/categories/create', methods=['POST'])
+@public_endpoint
 def create_categories():
     """카테고리 직접 생성"""
     try:
+        started = time.perf_counter()
         data = request.get_json()
         if not data or 'categories' not in data:
             return jsonify({'error': '카테고리 데이터가 필요합니다.'}), 400
@@ -392,26 +593,21 @@ def create_categories():
         if not isinstance(categories, list) or len(categories) < 1:
             return jsonify({'error': '최소 1개 이상의 카테고리가 필요합니다.'}), 400
         
-        added = 0
-        for cat_name in categories:
-            if not cat_name or not cat_name.strip():
-                continue
-            existing = Category.query.filter_by(category=cat_name.strip()).first()
-            if not existing:
-                category = Category(category=cat_name.strip())
-                db.session.add(category)
-                added += 1
+        added = bulk_create_categories(categories)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 카테고리가 추가되었습니다.'}), 200
+        reference_cache.invalidate(categories_key())
+        return _bulk_result(f'{added}개의 카테고리가 추가되었습니다.', added, started)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/users/create', methods=['POST'])
+@public_endpoint
 def create_users():
     """사용자 직접 생성"""
     try:
+        started = time.perf_counter()
         data = request.get_json()
         if not data or 'users' not in data:
             return jsonify({'error': '사용자 데이터가 필요합니다.'}), 400
@@ -420,33 +616,20 @@ def create_users():
         if not isinstance(users, list) or len(users) < 1:
             return jsonify({'error': '최소 1개 이상의 사용자가 필요합니다.'}), 400
         
-        added = 0
-        for user_data in users:
-            if not all(k in user_data for k in ['user_id', 'passwd', 'email', 'name', 'address']):
-                continue
-            
-            existing = User.query.filter_by(user_id=user_data['user_id']).first()
-            if not existing:
-                user = User(
-                    user_id=user_data['user_id'],
-                    email=user_data['email'],
-                    name=user_data['name'],
-                    address=user_data['address']
-                )
-                user.set_password(user_data['passwd'])
-                db.session.add(user)
-                added += 1
+        added = bulk_create_users(users)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 사용자가 추가되었습니다.'}), 200
+        return _bulk_result(f'{added}개의 사용자가 추가되었습니다.', added, started)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/stores/create', methods=['POST'])
+@public_endpoint
 def create_stores():
     """가게 직접 생성"""
     try:
+        started = time.perf_counter()
         data = request.get_json()
         if not data or 'stores' not in data:
             return jsonify({'error': '가게 데이터가 필요합니다.'}), 400
@@ -456,82 +639,24 @@ def create_stores():
             return jsonify({'error': '최소 1개 이상의 가게가 필요합니다.'}), 400
         
         # Owner 확인/생성
-        owner = Owner.query.first()
-        if not owner:
-            owner = Owner(
-                owner_id='admin_owner',
-                email='admin@admin.com',
-                owner_passwd='admin123'
-            )
-            owner.set_password('admin123')
-            db.session.add(owner)
-            db.session.flush()
+        owner = get_or_create_owner('admin_owner', 'admin@admin.com', 'admin123')
         
-        from models import Payment
-        
-        added = 0
-        for store_data in stores:
-            # 필수 필드 검증 (모든 필드가 있어야 함)
-            required_fields = ['store_name', 'category_id', 'phone', 'minprice', 'operationTime', 'closedDay', 'payment_id']
-            if not all(k in store_data for k in required_fields):
-                continue
-            
-            # 각 필드 값 검증
-            if not store_data['store_name'] or not store_data['store_name'].strip():
-                continue
-            if not store_data['phone'] or not store_data['phone'].strip():
-                continue
-            if not store_data['minprice'] or not store_data['minprice'].strip():
-                continue
-            if not store_data['operationTime'] or not store_data['operationTime'].strip():
-                continue
-            if not store_data['closedDay'] or not store_data['closedDay'].strip():
-                continue
-            
-            # 지불방식 검증
-            payment_id = store_data.get('payment_id')
-            if not payment_id:
-                continue
-            
-            # 지불방식 ID가 유효한지 확인
-            payment = db.session.get(Payment, payment_id)
-            if not payment:
-                # 존재하지 않는 지불방식 ID가 있으면 스킵
-                continue
-            
-            # category_id로 Category 테이블에서 확인
-            category = db.session.get(Category, store_data['category_id'])
-            if not category:
-                # 카테고리가 없으면 스킵
-                continue
-            
-            existing = Store.query.filter_by(store_name=store_data['store_name']).first()
-            if not existing:
-                # category_id로 Category 테이블에서 확인하고 category 필드에 자동으로 채우기
-                store = Store(
-                    owner_id=owner.id,
-                    category_id=store_data['category_id'],
-                    payment_id=payment_id,
-                    store_name=store_data['store_name'],
-                    category=category.category,  # Category 테이블에서 가져온 카테고리 이름
-                    phone=store_data['phone'],
-                    minprice=store_data['minprice'],
-                    operationTime=store_data['operationTime'],
-                    closedDay=store_data['closedDay']
-                )
-                db.session.add(store)
-                added += 1
+        added = bulk_create_stores(stores, owner)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 가게가 추가되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return _bulk_result(f'{added}개의 가게가 추가되었습니다.', added, started)
 
 @bp.route('/menus/create', methods=['POST'])
+@public_endpoint
 def create_menus():
     """메뉴 직접 생성"""
     try:
+        started = time.perf_counter()
         data = request.get_json()
         if not data or 'menus' not in data:
             return jsonify({'error': '메뉴 데이터가 필요합니다.'}), 400
@@ -540,36 +665,23 @@ def create_menus():
         if not isinstance(menus, list) or len(menus) < 1:
             return jsonify({'error': '최소 1개 이상의 메뉴가 필요합니다.'}), 400
         
-        added = 0
-        for menu_data in menus:
-            if not all(k in menu_data for k in ['store_id', 'menu', 'price']):
-                continue
-            
-            # 가게 확인
-            store = Store.query.get(menu_data['store_id'])
-            if not store:
-                continue
-            
-            existing = Menu.query.filter_by(store_id=menu_data['store_id'], menu=menu_data['menu']).first()
-            if not existing:
-                menu = Menu(
-                    store_id=menu_data['store_id'],
-                    menu=menu_data['menu'],
-                    price=int(menu_data['price'])
-                )
-                db.session.add(menu)
-                added += 1
+        added = bulk_create_menus(menus)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 메뉴가 추가되었습니다.'}), 200
+        reference_cache.invalidate(*_menu_keys(menus))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    search_index.refresh()
+    return _bulk_result(f'{added}개의 메뉴가 추가되었습니다.', added, started)
 
 @bp.route('/coupons/create', methods=['POST'])
+@public_endpoint
 def create_coupons():
     """쿠폰 직접 생성"""
     try:
+        started = time.perf_counter()
         data = request.get_json()
         if not data or 'coupons' not in data:
             return jsonify({'error': '쿠폰 데이터가 필요합니다.'}), 400
@@ -578,32 +690,16 @@ def create_coupons():
         if not isinstance(coupons, list) or len(coupons) < 1:
             return jsonify({'error': '최소 1개 이상의 쿠폰이 필요합니다.'}), 400
         
-        added = 0
-        for coupon_data in coupons:
-            if not all(k in coupon_data for k in ['store_id', 'discount']):
-                continue
-            
-            # 가게 확인
-            store = Store.query.get(coupon_data['store_id'])
-            if not store:
-                continue
-            
-            coupon = Coupon(
-                store_id=coupon_data['store_id'],
-                discount=int(coupon_data['discount']),
-                period=int(coupon_data.get('period', 30)),
-                is_deleted=False
-            )
-            db.session.add(coupon)
-            added += 1
+        added = bulk_create_coupons(coupons)
         
         db.session.commit()
-        return jsonify({'message': f'{added}개의 쿠폰이 추가되었습니다.'}), 200
+        return _bulk_result(f'{added}개의 쿠폰이 추가되었습니다.', added, started)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/categories', methods=['GET'])
+@public_endpoint
 def get_categories():
     """카테고리 목록 조회 (직접 입력 시 선택용)"""
     try:
@@ -616,6 +712,7 @@ def get_categories():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/stores/list', methods=['GET'])
+@public_endpoint
 def get_stores_list():
     """가게 목록 조회 (직접 입력 시 선택용)"""
     try:
@@ -628,3 +725,20 @@ def get_stores_list():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/metrics/pool', methods=['GET'])
+@public_endpoint
+def get_pool_metrics():
+    """DB 커넥션 풀 지표 (이 워커 프로세스 기준 - 체크아웃 수, 대기 시간 분포, overflow, 무효화 등)"""
+    return jsonify(pool_snapshot()), 200
+
+@bp.route('/metrics/queries', methods=['GET'])
+@public_endpoint
+def get_query_metrics():
+    """엔드포인트별 SQL 쿼리 요약 (이 워커 프로세스 기준 - 평균/최대 쿼리 수, DB 시간, 느린 요청 수, N+1 의심 문장)
+    
+    ?reset=1 이면 조회 후 초기화
+    """
+    report = query_profiler.report()
+    if request.args.get('reset') == '1':
+        query_profiler.reset()
+    return jsonify(report), 200
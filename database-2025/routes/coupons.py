@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models import db, Coupon, Store, Owner
-from utils.auth import login_required, get_current_user
+from utils.auth import login_required, get_current_user, get_user_owner
 
 bp = Blueprint('coupons', __name__)
 
@@ -18,7 +18,7 @@ def create_coupon(store_id):
         return jsonify({'error': '가게를 찾을 수 없습니다.'}), 404
     
     # User의 user_id로 Owner 찾기
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         return jsonify({'error': '사장님 정보를 찾을 수 없습니다.'}), 404
     
@@ -71,7 +71,7 @@ def delete_coupon(store_id, coupon_id):
         return jsonify({'error': '가게를 찾을 수 없습니다.'}), 404
     
     # User의 user_id로 Owner 찾기
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         return jsonify({'error': '사장님 정보를 찾을 수 없습니다.'}), 404
     
@@ -1,107 +1,213 @@
+import math
+from datetime import datetime
 from flask import Blueprint, request, jsonify, render_template
-from models import db, Category, Store, Menu, Payment, Coupon, Order, Rider, Owner, StorePayment
-from utils.auth import login_required, get_current_user
+from models import db, Category, Store, Menu, Payment, Coupon, Order, Rider, Owner, StorePayment, CartItem
+from utils.auth import login_required, get_current_user, get_user_owner, get_user_rider, public_endpoint
+from utils.stats import record_order
+from utils.bulk import upsert
+from utils.pricing import price_cart, save_order_items, min_order_price, PricingError
+from utils.dispatch import dispatch_feed
+from utils.search import search_index, index_menu
+from utils.geo import geocode, parse_coordinates, delivers_to, store_distance_sq
+from utils.idempotency import idempotent, idempotent_commit
+from utils.metrics import metrics
+from utils.cache import reference_cache, cached_json_response, categories_key, payment_methods_key, store_menus_key
 
 bp = Blueprint('customer', __name__)
 
 @bp.route('/categories', methods=['GET'])
 def get_categories():
-    """모든 카테고리 조회"""
-    categories = Category.query.all()
-    return jsonify([{
+    """모든 카테고리 조회 (기준 데이터 캐시 + ETag)"""
+    return cached_json_response(categories_key(), lambda: [{
         'id': cat.id,
         'category': cat.category
-    } for cat in categories]), 200
+    } for cat in Category.query.all()])
 
 @bp.route('/payment-methods', methods=['GET'])
 def get_payment_methods():
-    """모든 지불방식 조회"""
-    payments = Payment.query.all()
-    return jsonify([{
+    """모든 지불방식 조회 (기준 데이터 캐시 + ETag)"""
+    return cached_json_response(payment_methods_key(), lambda: [{
         'id': p.id,
         'method_name': p.payment
-    } for p in payments]), 200
+    } for p in Payment.query.all()])
+
+def _delivery_point():
+    """배달 받을 위치 (lat/lng 파라미터 > address 파라미터 > 로그인 사용자 주소 좌표 순)
+    
+    반환값: ((위도, 경도) 또는 None, 오류 메시지)
+    """
+    if request.args.get('lat') is not None or request.args.get('lng') is not None:
+        try:
+            return parse_coordinates(request.args.get('lat'), request.args.get('lng')), None
+        except ValueError as e:
+            return None, str(e)
+    if request.args.get('address'):
+        latitude, longitude = geocode(request.args['address'])
+        if latitude is None:
+            return None, '주소의 좌표를 찾을 수 없습니다.'
+        return (latitude, longitude), None
+    user = get_current_user()
+    if user and user.latitude is not None and user.longitude is not None:
+        return (user.latitude, user.longitude), None
+    return None, None
 
 @bp.route('/categories/<int:category_id>/stores', methods=['GET'])
 def get_stores_by_category(category_id):
-    """카테고리별 가게 목록 (주문 수, 평균 별점 포함, 정렬 옵션 지원)"""
+    """카테고리별 가게 목록 (주문 수, 평균 별점 포함, 정렬 옵션 지원)
+    
+    배달 받을 위치를 알면 그 위치로 배달 가능한 가게만 조회한다 (geohash 인덱스 + 배달 반경, 좌표가 없는 가게는 포함).
+    """
     from sqlalchemy import func
-    from models import Review
+    from models import StoreStats, StoreRanking
+    from utils.stats import avg_rating_expr
     
     # 정렬 옵션 파라미터 받기 (기본값: name - 가나다 순)
     sort_by = request.args.get('sort', 'name')
-    
-    # 카테고리별 가게 조회 (category_id로만 필터링)
-    stores_query = Store.query.filter_by(category_id=category_id)
-    
-    # 정렬 적용
+    # 페이지네이션 파라미터 (limit이 없으면 전체 반환 - 기존 프론트 호환)
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', 0, type=int)
+    
+    point, error = _delivery_point()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # store_stats(쓰기 시 증분 갱신되는 집계 테이블)를 조인해서 한 번의 쿼리로 조회
+    order_count = func.coalesce(StoreStats.order_count, 0)
+    review_count = func.coalesce(StoreStats.review_count, 0)
+    avg_rating = avg_rating_expr()
+    
+    stores_query = db.session.query(
+        Store,
+        order_count.label('order_count'),
+        review_count.label('review_count'),
+        avg_rating.label('avg_rating')
+    ).outerjoin(
+        StoreStats, StoreStats.store_id == Store.id
+    ).outerjoin(
+        StoreRanking, StoreRanking.store_id == Store.id  # 주기적으로 계산되는 순위 지표 (flask stats rank)
+    ).filter(Store.category_id == category_id)
+    
+    distance_sq = None
+    if point:
+        # 배달 불가능한 가게는 DB에서 걸러서 아예 읽지 않음
+        distance_sq = store_distance_sq(*point)
+        stores_query = stores_query.filter(delivers_to(*point)).add_columns(distance_sq.label('distance_sq'))
+    
+    # 정렬 적용 (DB에서 정렬, 동일 값은 이름순 + id순으로 고정)
     if sort_by == 'review':
-        # 리뷰 많은 순 (reviewCount 내림차순)
-        stores_query = stores_query.order_by(Store.reviewCount.desc())
+        # 리뷰 많은 순
+        stores_query = stores_query.order_by(review_count.desc())
     elif sort_by == 'rating':
-        # 별점 높은 순은 평균 별점을 계산해야 하므로 일단 reviewCount로 정렬 후 프론트에서 처리
-        stores_query = stores_query.order_by(Store.store_name.asc())  # 임시로 이름순
+        # 별점 높은 순 (리뷰 수를 반영한 베이지안 평균, 아직 계산되지 않은 가게는 뒤로)
+        stores_query = stores_query.order_by(func.coalesce(StoreRanking.bayes_rating, 0).desc(), avg_rating.desc())
     elif sort_by == 'order':
-        # 주문 많은 순은 주문 수를 계산해야 하므로 일단 이름순 후 프론트에서 처리
-        stores_query = stores_query.order_by(Store.store_name.asc())  # 임시로 이름순
-    else:
-        # 기본: 가나다 순 (store_name 오름차순)
-        stores_query = stores_query.order_by(Store.store_name.asc())
+        # 주문 많은 순
+        stores_query = stores_query.order_by(order_count.desc())
+    elif sort_by == 'trending':
+        # 최근 주문이 늘어나는 순
+        stores_query = stores_query.order_by(func.coalesce(StoreRanking.trending_score, 0).desc(), order_count.desc())
+    elif sort_by == 'distance' and point:
+        # 가까운 순 (배달 받을 위치를 알 때만, 좌표가 없는 가게는 뒤로)
+        stores_query = stores_query.order_by(distance_sq.is_(None), distance_sq.asc())
+    # 기본: 가나다 순 (store_name 오름차순)
+    stores_query = stores_query.order_by(Store.store_name.asc(), Store.id.asc())
+    
+    if offset:
+        stores_query = stores_query.offset(offset)
+    if limit:
+        stores_query = stores_query.limit(limit)
     
-    stores = stores_query.all()
     result = []
-    
-    for store in stores:
-        # 주문 수 계산
-        order_count = Order.query.filter_by(store_id=store.id).count()
-        
-        # 평균 별점 계산
-        avg_rating_result = db.session.query(func.avg(Review.rating)).filter_by(store_id=store.id).scalar()
-        avg_rating = round(avg_rating_result, 1) if avg_rating_result else 0.0
-        
-        # 리뷰 수 계산 (실제 Review 테이블에서)
-        review_count = Review.query.filter_by(store_id=store.id).count()
-        
+    for row in stores_query.all():
+        store, store_order_count, store_review_count, store_avg_rating = row[:4]
         result.append({
             'id': store.id,
             'store_name': store.store_name,
             'category': store.category,
             'phone': store.phone,
             'minprice': store.minprice,
-            'reviewCount': review_count,  # 실제 리뷰 수
-            'orderCount': order_count,
-            'avgRating': avg_rating,
+            'reviewCount': int(store_review_count),  # 실제 리뷰 수
+            'orderCount': int(store_order_count),
+            'avgRating': round(float(store_avg_rating), 1) if store_avg_rating else 0.0,
             'operationTime': store.operationTime,
             'closedDay': store.closedDay
         })
-    
-    # 별점이나 주문 수로 정렬해야 하는 경우 프론트에서 정렬하도록 데이터만 제공
-    # (DB에서 JOIN으로 정렬하는 것이 더 효율적이지만, 현재 구조상 이렇게 처리)
+        if point:
+            # 좌표가 없는 가게는 거리를 알 수 없음
+            result[-1]['distance'] = round(math.sqrt(row.distance_sq)) if row.distance_sq is not None else None  # m
     
     return jsonify(result), 200
 
+@bp.route('/search', methods=['GET'])
+def search_stores():
+    """가게 이름/소개/메뉴 검색 (프로세스 내 역색인, 초성 검색 지원)"""
+    from sqlalchemy import func
+    from models import StoreStats
+    from utils.stats import avg_rating_expr
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': '검색어(q)를 입력해주세요.'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    total, hits = search_index.search(query, limit=limit, offset=offset)
+    
+    # 상위 결과의 가게 정보/집계만 기본키 IN 조회 한 번으로 가져옴
+    rows = {}
+    if hits:
+        stores_query = db.session.query(
+            Store,
+            func.coalesce(StoreStats.order_count, 0),
+            func.coalesce(StoreStats.review_count, 0),
+            avg_rating_expr()
+        ).outerjoin(
+            StoreStats, StoreStats.store_id == Store.id
+        ).filter(Store.id.in_([hit['store_id'] for hit in hits]))
+        rows = {row[0].id: row for row in stores_query.all()}
+    
+    result = []
+    for hit in hits:
+        if hit['store_id'] not in rows:
+            # 다른 프로세스에서 삭제되어 인덱스에만 남아 있는 가게
+            continue
+        store, store_order_count, store_review_count, store_avg_rating = rows[hit['store_id']]
+        result.append({
+            'id': store.id,
+            'store_name': store.store_name,
+            'category': store.category,
+            'phone': store.phone,
+            'minprice': store.minprice,
+            'reviewCount': int(store_review_count),
+            'orderCount': int(store_order_count),
+            'avgRating': round(float(store_avg_rating), 1) if store_avg_rating else 0.0,
+            'operationTime': store.operationTime,
+            'closedDay': store.closedDay,
+            'matchedMenus': hit['menus'],
+            'score': hit['score']
+        })
+    
+    return jsonify({'query': query, 'total': total, 'stores': result}), 200
+
 @bp.route('/stores/<int:store_id>/menus', methods=['GET'])
 def get_store_menus(store_id):
-    """가게 메뉴 목록"""
-    menus = Menu.query.filter_by(store_id=store_id).all()
-    return jsonify([{
+    """가게 메뉴 목록 (가게별 캐시 + ETag)"""
+    return cached_json_response(store_menus_key(store_id), lambda: [{
         'id': menu.id,
         'menu': menu.menu,
         'price': menu.price
-    } for menu in menus]), 200
+    } for menu in Menu.query.filter_by(store_id=store_id).all()])
 
 @bp.route('/stores/<int:store_id>/menus', methods=['POST'])
 @login_required
 def add_store_menu(store_id):
     """가게 메뉴 추가 (User 로그인 필요 - User가 Owner 역할)"""
-    from models import Owner
-    
     user = get_current_user()
     if not user:
         return jsonify({'error': '로그인이 필요합니다.'}), 401
     
     # User의 Owner 찾기
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         return jsonify({'error': '가게 소유권이 없습니다.'}), 403
     
@@ -123,6 +229,8 @@ def add_store_menu(store_id):
     try:
         db.session.add(menu)
         db.session.commit()
+        reference_cache.invalidate(store_menus_key(store_id))
+        index_menu(menu)
         return jsonify({
             'message': '메뉴가 추가되었습니다.',
             'id': menu.id,
@@ -137,14 +245,12 @@ def add_store_menu(store_id):
 @login_required
 def delete_store_menu(store_id, menu_id):
     """가게 메뉴 삭제 (User 로그인 필요 - User가 Owner 역할)"""
-    from models import Owner
-    
     user = get_current_user()
     if not user:
         return jsonify({'error': '로그인이 필요합니다.'}), 401
     
     # User의 Owner 찾기
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         return jsonify({'error': '가게 소유권이 없습니다.'}), 403
     
@@ -156,8 +262,11 @@ def delete_store_menu(store_id, menu_id):
     menu = Menu.query.filter_by(id=menu_id, store_id=store_id).first_or_404()
     
     try:
+        CartItem.query.filter_by(menu_id=menu_id).delete()
         db.session.delete(menu)
         db.session.commit()
+        reference_cache.invalidate(store_menus_key(store_id))
+        search_index.remove_menu(menu_id)
         return jsonify({'message': '메뉴가 삭제되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
@@ -171,22 +280,11 @@ def get_store_payments(store_id):
     if not store:
         return jsonify({'error': '가게를 찾을 수 없습니다.'}), 404
     
-    # StorePayment 테이블에서 가게의 모든 지불방식 조회
-    store_payments = StorePayment.query.filter_by(store_id=store_id).all()
-    
-    if not store_payments:
-        # 하위 호환: 기존 payment_id가 있으면 반환
-        if store.payment:
-            return jsonify([{
-                'id': store.payment.id,
-                'payment': store.payment.payment
-            }]), 200
-        return jsonify([]), 200
-    
+    # StorePayment 테이블에서 가게의 모든 지불방식 조회 (없으면 기존 payment_id - 하위 호환)
     return jsonify([{
-        'id': sp.payment.id,
-        'payment': sp.payment.payment
-    } for sp in store_payments]), 200
+        'id': payment.id,
+        'payment': payment.payment
+    } for payment in _store_payments(store)]), 200
 
 @bp.route('/stores/<int:store_id>/coupons', methods=['GET'])
 def get_store_coupons(store_id):
@@ -201,23 +299,51 @@ def get_store_coupons(store_id):
 @bp.route('/orders', methods=['GET'])
 @login_required
 def get_orders():
-    """주문 목록 조회 (사용자 인증 필요)"""
+    """주문 목록 조회 (사용자 인증 필요, (order_time, id) 기준 keyset 페이지네이션)"""
+    from datetime import datetime
+    from sqlalchemy import and_, or_
+    from sqlalchemy.orm import joinedload
     from models import Review
     
     user = get_current_user()
     if not user:
         return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
     
-    orders = Order.query.filter_by(user_id=user.id).order_by(Order.order_time.desc()).all()
+    # limit이 없으면 전체 반환 (기존 프론트 호환), before에는 이전 페이지 마지막 주문의 cursor를 전달
+    limit = request.args.get('limit', type=int)
+    before = request.args.get('before')
+    
+    orders_query = Order.query.options(
+        joinedload(Order.store)  # 가게 정보를 같은 쿼리에서 함께 로드
+    ).filter(Order.user_id == user.id)
+    
+    if before:
+        try:
+            before_time, before_id = before.rsplit('_', 1)
+            before_time = datetime.fromisoformat(before_time)
+            before_id = int(before_id)
+        except ValueError:
+            return jsonify({'error': '잘못된 cursor 값입니다.'}), 400
+        orders_query = orders_query.filter(or_(
+            Order.order_time < before_time,
+            and_(Order.order_time == before_time, Order.id < before_id)
+        ))
+    
+    orders_query = orders_query.order_by(Order.order_time.desc(), Order.id.desc())
+    if limit:
+        orders_query = orders_query.limit(limit)
+    orders = orders_query.all()
+    
+    # 이 페이지의 주문들에 대한 리뷰 작성 여부를 한 번의 IN 쿼리로 확인
+    reviewed_order_ids = set()
+    if orders:
+        reviewed_order_ids = {order_id for (order_id,) in db.session.query(Review.order_id).filter(
+            Review.user_id == user.id,
+            Review.order_id.in_([order.id for order in orders])
+        ).all()}
     
     result = []
     for order in orders:
-        # 해당 주문에 대해 사용자가 이미 리뷰를 작성했는지 확인 (order_id 기준)
-        existing_review = Review.query.filter_by(
-            user_id=user.id,
-            order_id=order.id
-        ).first()
-        
         result.append({
             'id': order.id,
             'store_id': order.store_id,
@@ -227,28 +353,109 @@ def get_orders():
             'total_price': order.total_price,
             'order_time': order.order_time.isoformat() if order.order_time else None,
             'created_at': order.order_time.isoformat() if order.order_time else None,
-            'has_review': existing_review is not None  # 리뷰 작성 여부 (주문별)
+            'has_review': order.id in reviewed_order_ids,  # 리뷰 작성 여부 (주문별)
+            'cursor': f"{order.order_time.isoformat()}_{order.id}"  # 다음 페이지 요청 시 before 값
         })
     
     return jsonify(result), 200
 
-@bp.route('/orders/waiting', methods=['GET'])
-def get_waiting_orders():
-    """대기 중인 주문 목록 조회 (라이더가 수락할 수 있는 주문)"""
-    # rider_id가 None인 주문만 조회 (라이더가 수락하지 않은 주문)
-    orders = Order.query.filter(Order.rider_id == None).order_by(Order.order_time.desc()).all()
-    
-    return jsonify([{
+def _waiting_order_payload(order, store, user):
+    """라이더 대기 주문 응답 형식"""
+    return {
         'id': order.id,
         'store_id': order.store_id,
-        'store_name': order.store.store_name if order.store else None,
+        'store_name': store.store_name if store else None,
         'user_id': order.user_id,
-        'user_name': order.user.name if order.user else None,
-        'user_address': order.user.address if order.user else None,
+        'user_name': user.name if user else None,
+        'user_address': user.address if user else None,
         'order': order.order,
         'total_price': order.total_price,
         'order_time': order.order_time.isoformat() if order.order_time else None
-    } for order in orders]), 200
+    }
+
+def _waiting_orders_snapshot(limit=None):
+    """대기 중인 주문 목록 (가게/주문자 정보를 한 번의 쿼리로 로드)"""
+    from sqlalchemy.orm import joinedload
+    
+    orders_query = Order.query.options(
+        joinedload(Order.store),
+        joinedload(Order.user)
+    ).filter(Order.rider_id == None).order_by(Order.order_time.desc(), Order.id.desc())
+    if limit:
+        orders_query = orders_query.limit(limit)
+    return [_waiting_order_payload(order, order.store, order.user) for order in orders_query.all()]
+
+@bp.route('/orders/waiting', methods=['GET'])
+def get_waiting_orders():
+    """대기 중인 주문 목록 조회 (라이더가 수락할 수 있는 주문)"""
+    # rider_id가 None인 주문만 조회 (라이더가 수락하지 않은 주문)
+    limit = request.args.get('limit', type=int)
+    return jsonify(_waiting_orders_snapshot(limit)), 200
+
+@bp.route('/orders/waiting/feed', methods=['GET'])
+def get_waiting_orders_feed():
+    """대기 주문 변경 롱폴링 (cursor 이후의 생성/수락 이벤트만 반환)"""
+    cursor = request.args.get('cursor')
+    timeout = min(request.args.get('timeout', 25, type=float), 60)
+    
+    events = None
+    if cursor is not None:
+        # 기다리는 동안 DB 연결을 풀에 돌려줌 (인증 확인 등에서 쓴 연결)
+        db.session.close()
+        events = dispatch_feed.wait(cursor, timeout)
+    
+    if events is None:
+        # cursor가 없거나 너무 오래되었거나 다른 워커의 cursor인 경우 스냅샷부터 다시 전달
+        cursor = dispatch_feed.cursor
+        return jsonify({
+            'cursor': cursor,
+            'reset': True,
+            'orders': _waiting_orders_snapshot(request.args.get('limit', type=int))
+        }), 200
+    
+    return jsonify({
+        'cursor': events[-1]['seq'] if events else cursor,
+        'reset': False,
+        'events': events
+    }), 200
+
+@bp.route('/orders/waiting/stream', methods=['GET'])
+def stream_waiting_orders():
+    """대기 주문 변경 Server-Sent Events 스트림 (Last-Event-ID로 이어받기 지원)"""
+    import json
+    from flask import Response
+    
+    last_event_id = request.headers.get('Last-Event-ID')
+    events = dispatch_feed.events_since(last_event_id) if last_event_id is not None else None
+    
+    if events is None:
+        # 처음 접속했거나 이어받을 수 없으면(다른 워커로 재접속한 경우 포함) 스냅샷 전송 (DB 조회는 스트림 시작 전에 끝낸다)
+        cursor = dispatch_feed.cursor
+        snapshot = _waiting_orders_snapshot(request.args.get('limit', type=int))
+        first_chunk = f"id: {cursor}\nevent: snapshot\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+    else:
+        cursor = last_event_id
+        first_chunk = ''
+    
+    def generate(cursor):
+        if first_chunk:
+            yield first_chunk
+        while True:
+            events = dispatch_feed.wait(cursor, 15)
+            if events is None:
+                # 버퍼에서 밀려났거나 피드가 닫혔으면(워커 종료) 연결을 끊고 클라이언트 재접속 시 스냅샷부터 다시 전송
+                return
+            if not events:
+                yield ': keepalive\n\n'
+                continue
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+            cursor = events[-1]['seq']
+    
+    return Response(generate(cursor), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @bp.route('/orders/<int:order_id>/accept', methods=['POST'])
 @login_required
@@ -258,16 +465,10 @@ def accept_order(order_id):
     if not user:
         return jsonify({'error': '로그인이 필요합니다.'}), 401
     
-    order = Order.query.get_or_404(order_id)
-    
-    # 이미 다른 라이더가 수락한 주문인지 확인
-    if order.rider_id:
-        return jsonify({'error': '이미 수락된 주문입니다.'}), 400
-    
     # User ID를 rider_id로 사용 (User가 라이더 역할)
     # Rider 테이블에 레코드가 없으면 생성
     from models import Rider
-    rider = Rider.query.filter_by(rider_id=user.user_id).first()
+    rider = get_user_rider()
     if not rider:
         # Rider 레코드 생성
         rider = Rider(
@@ -278,74 +479,340 @@ def accept_order(order_id):
         db.session.add(rider)
         db.session.flush()
     
-    # 주문의 rider_id 업데이트
-    order.rider_id = rider.id
-    
     try:
+        # 아직 수락되지 않은 주문일 때만 rider_id를 설정하는 조건부 UPDATE
+        # (읽고-확인하고-쓰기 사이에 다른 라이더가 끼어들 수 없고, 행 잠금도 이 한 문장 동안만 유지됨)
+        accepted = Order.query.filter(
+            Order.id == order_id,
+            Order.rider_id == None
+        ).update({Order.rider_id: rider.id}, synchronize_session=False)
+        
+        if accepted != 1:
+            db.session.rollback()
+            if not db.session.get(Order, order_id):
+                return jsonify({'error': '존재하지 않는 주문입니다.'}), 404
+            # 이미 다른 라이더가 수락한 주문
+            return jsonify({'error': '이미 수락된 주문입니다.'}), 400
+        
+        # 라이더 배차 피드에서 수락된 주문 제거 (커밋되면 모든 워커의 구독자에게 전달)
+        dispatch_feed.record('accepted', {'id': order_id})
         db.session.commit()
-        return jsonify({'message': '주문을 수락했습니다.', 'order_id': order.id}), 200
+        metrics.inc('orders_accepted_total')
+        return jsonify({'message': '주문을 수락했습니다.', 'order_id': order_id}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/orders', methods=['POST'])
 @login_required
+@idempotent
 def create_order():
-    """주문 생성 (사용자 인증 필요)"""
+    """주문 생성 (사용자 인증 필요, 금액은 서버에서 메뉴/쿠폰 기준으로 계산)"""
     user = get_current_user()
     if not user:
         return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
     
     data = request.get_json()
     
-    if not all(k in data for k in ['store_id', 'order', 'total_price']):
+    # items: [{'menu_id': 1, 'qty': 2}, ...] (클라이언트가 보낸 total_price/order는 사용하지 않음)
+    if not data or not all(k in data for k in ['store_id', 'items']):
         return jsonify({'error': '필수 필드가 누락되었습니다.'}), 400
     
     # 가게 존재 확인
-    store = Store.query.get(data['store_id'])
+    store = db.session.get(Store, data['store_id'])
     if not store:
         return jsonify({'error': '존재하지 않는 가게입니다.'}), 404
     
+    try:
+        quote = price_cart(store.id, data['items'], data.get('coupon_id'))
+    except PricingError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    try:
+        payload = _place_order(user, store, quote)
+        # 라이더 배차 피드에 새 대기 주문 기록 (커밋되면 모든 워커의 구독자에게 전달)
+        dispatch_feed.record('created', payload)
+        metrics.inc_on_commit('orders_created_total', source='orders')
+        idempotent_commit()
+        return jsonify({
+            'message': '주문이 생성되었습니다.',
+            'order_id': payload['id'],
+            'items': quote['lines'],
+            'subtotal': quote['subtotal'],
+            'discount': quote['discount'],
+            'total_price': quote['total_price']
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _place_order(user, store, quote, payment_id=None):
+    """계산된 장바구니로 주문/주문 항목 생성 + 가게 통계 갱신 (커밋은 호출한 쪽에서), 반환값: 배차 피드 payload"""
     # 주문 생성 시 rider_id는 None으로 설정 (라이더가 수락할 때 업데이트)
     # 라이더는 주문 생성 시 선택하지 않음
     order = Order(
         user_id=user.id,
-        store_id=data['store_id'],
+        store_id=store.id,
         rider_id=None,  # 라이더가 수락할 때까지 None으로 설정
-        order=data['order'],
-        total_price=data['total_price']
+        payment_id=payment_id,
+        order=quote['summary'],
+        total_price=quote['total_price']
     )
+    db.session.add(order)
+    db.session.flush()  # order.id / order.order_time을 얻기 위해
+    # 주문 항목 일괄 삽입 + 가게 통계(주문 수, 시간/일 단위 매출) 갱신 - 같은 트랜잭션
+    save_order_items(order.id, quote['lines'])
+    record_order(order.store_id, order.order_time, order.total_price)
+    return _waiting_order_payload(order, store, user)
+
+def _store_payments(store):
+    """가게에서 쓸 수 있는 지불방식 목록 (StorePayment 조인 한 번, 없으면 기존 단일 payment_id)"""
+    payments = Payment.query.join(
+        StorePayment, StorePayment.payment_id == Payment.id
+    ).filter(StorePayment.store_id == store.id).order_by(Payment.id).all()
+    if not payments and store.payment:
+        payments = [store.payment]
+    return payments
+
+def _cart_payload(user):
+    """장바구니 + 주문 화면에 필요한 정보 (가게, 최소주문금액, 지불방식, 쿠폰, 배송지)를 한 번에 반환
+    
+    메뉴가 삭제되어 더 이상 주문할 수 없는 항목은 보여주지 않는다 (주문 시 다시 검증).
+    """
+    rows = db.session.query(CartItem, Menu).join(
+        Menu, CartItem.menu_id == Menu.id
+    ).filter(CartItem.user_id == user.id).order_by(CartItem.id).all()
+    payload = {'store': None, 'items': [], 'subtotal': 0, 'min_order_price': 0, 'meets_minimum': False,
+               'payments': [], 'coupons': [], 'address': user.address}
+    if not rows:
+        return payload
+    
+    store = db.session.get(Store, rows[0][0].store_id)
+    items = [{
+        'menu_id': menu.id,
+        'menu': menu.menu,
+        'qty': item.qty,
+        'unit_price': menu.price,
+        'amount': menu.price * item.qty
+    } for item, menu in rows]
+    subtotal = sum(item['amount'] for item in items)
+    minimum = min_order_price(store.minprice)
+    payload.update({
+        'store': {'id': store.id, 'store_name': store.store_name, 'minprice': store.minprice},
+        'items': items,
+        'subtotal': subtotal,
+        'min_order_price': minimum,
+        'meets_minimum': subtotal >= minimum,
+        'payments': [{'id': payment.id, 'payment': payment.payment} for payment in _store_payments(store)],
+        'coupons': [{
+            'id': coupon.id,
+            'period': coupon.period,
+            'discount': coupon.discount
+        } for coupon in Coupon.query.filter_by(store_id=store.id, is_deleted=False).all()]
+    })
+    return payload
+
+def _read_qty(data, default=None):
+    """요청의 qty를 정수로 (없으면 default, 잘못된 값이면 None)"""
+    try:
+        return int(data.get('qty', default))
+    except (TypeError, ValueError):
+        return None
+
+@bp.route('/cart/items', methods=['GET'])
+@login_required
+def get_cart():
+    """장바구니 조회 (주문 화면에 필요한 가게/지불방식/쿠폰/배송지 포함)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
+    return jsonify(_cart_payload(user)), 200
+
+@bp.route('/cart/items', methods=['POST'])
+@login_required
+def add_cart_item():
+    """장바구니에 메뉴 담기 ({menu_id, qty=1, replace=false}, 다른 가게 메뉴가 있으면 replace=true일 때만 비우고 담음)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    qty = _read_qty(data, 1)
+    if qty is None or qty < 1:
+        return jsonify({'error': '수량은 1 이상이어야 합니다.'}), 400
+    menu = db.session.get(Menu, data.get('menu_id')) if data.get('menu_id') is not None else None
+    if not menu:
+        return jsonify({'error': '존재하지 않는 메뉴입니다.'}), 404
+    
+    try:
+        current = CartItem.query.filter_by(user_id=user.id).first()
+        if current and current.store_id != menu.store_id:
+            if not data.get('replace'):
+                return jsonify({'error': '다른 가게의 메뉴가 장바구니에 있습니다.', 'store_id': current.store_id}), 409
+            CartItem.query.filter_by(user_id=user.id).delete()
+        
+        # 같은 메뉴를 동시에 담아도 유니크 키(user_id, menu_id) 충돌 없이 수량만 더해지도록 한 문장으로 upsert
+        now = datetime.utcnow()
+        upsert(
+            CartItem,
+            {'user_id': user.id, 'store_id': menu.store_id, 'menu_id': menu.id, 'qty': qty, 'created_at': now, 'update_at': now},
+            {CartItem.qty: CartItem.qty + qty, CartItem.update_at: now},
+            keys=(CartItem.user_id, CartItem.menu_id)
+        )
+        db.session.commit()
+        return jsonify(_cart_payload(user)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/cart/items/<int:menu_id>', methods=['PUT'])
+@login_required
+def update_cart_item(menu_id):
+    """장바구니 항목 수량 변경 ({qty}, 0 이하면 삭제)"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
+    
+    qty = _read_qty(request.get_json(silent=True) or {})
+    if qty is None:
+        return jsonify({'error': '수량을 입력해주세요.'}), 400
+    item = CartItem.query.filter_by(user_id=user.id, menu_id=menu_id).first_or_404()
+    
+    try:
+        if qty <= 0:
+            db.session.delete(item)
+        else:
+            item.qty = qty
+        db.session.commit()
+        return jsonify(_cart_payload(user)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/cart/items/<int:menu_id>', methods=['DELETE'])
+@login_required
+def delete_cart_item(menu_id):
+    """장바구니 항목 삭제"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
     
     try:
-        db.session.add(order)
+        CartItem.query.filter_by(user_id=user.id, menu_id=menu_id).delete()
         db.session.commit()
-        return jsonify({'message': '주문이 생성되었습니다.', 'order_id': order.id}), 201
+        return jsonify(_cart_payload(user)), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/cart/items', methods=['DELETE'])
+@login_required
+def clear_cart():
+    """장바구니 비우기"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
+    
+    try:
+        CartItem.query.filter_by(user_id=user.id).delete()
+        db.session.commit()
+        return jsonify(_cart_payload(user)), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/checkout', methods=['POST'])
+@login_required
+@idempotent
+def checkout():
+    """장바구니 주문 ({payment_id, coupon_id})
+    
+    가게, 메뉴/가격, 최소주문금액, 지불방식, 쿠폰, 배송지를 한 트랜잭션 안에서 검증하고 주문을 만든 뒤 장바구니를 비운다.
+    장바구니 행은 FOR UPDATE로 잠가서 같은 장바구니로 동시에 두 번 주문되지 않게 한다.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
+    if not user.address:
+        return jsonify({'error': '배송지를 등록해주세요.'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        payment_id = int(data['payment_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': '결제 방식을 선택해주세요.'}), 400
+    
+    try:
+        cart = CartItem.query.filter_by(user_id=user.id).order_by(CartItem.id).with_for_update().all()
+        if not cart:
+            db.session.rollback()
+            return jsonify({'error': '장바구니가 비어 있습니다.'}), 400
+        store = db.session.get(Store, cart[0].store_id)
+        if not store:
+            db.session.rollback()
+            return jsonify({'error': '존재하지 않는 가게입니다.'}), 404
+        
+        # 메뉴/가격/쿠폰은 IN 조회 한 번 + 쿠폰 조회 한 번으로 검증
+        quote = price_cart(store.id, [{'menu_id': item.menu_id, 'qty': item.qty} for item in cart], data.get('coupon_id'))
+        minimum = min_order_price(store.minprice)
+        if quote['subtotal'] < minimum:
+            raise PricingError(f'최소주문금액은 {minimum:,}원입니다. (현재 {quote["subtotal"]:,}원)')
+        if payment_id not in {payment.id for payment in _store_payments(store)}:
+            raise PricingError('이 가게에서 사용할 수 없는 결제 방식입니다.')
+        
+        payload = _place_order(user, store, quote, payment_id)
+        CartItem.query.filter_by(user_id=user.id).delete()
+        # 라이더 배차 피드에 새 대기 주문 기록 (커밋되면 모든 워커의 구독자에게 전달)
+        dispatch_feed.record('created', payload)
+        metrics.inc_on_commit('orders_created_total', source='checkout')
+        idempotent_commit()
+    except PricingError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'message': '주문이 생성되었습니다.',
+        'order_id': payload['id'],
+        'store_id': store.id,
+        'store_name': store.store_name,
+        'items': quote['lines'],
+        'subtotal': quote['subtotal'],
+        'discount': quote['discount'],
+        'total_price': quote['total_price'],
+        'payment_id': payment_id,
+        'order_time': payload['order_time']
+    }), 201
+
 # 템플릿 라우트
 @bp.route('/main')
+@public_endpoint
 def main():
     """메인 페이지"""
     return render_template('main.html')
 
 @bp.route('/storelist')
+@public_endpoint
 def storelist():
     """가게 목록 페이지"""
     return render_template('storelist2.html')
 
 @bp.route('/cart')
+@public_endpoint
 def cart():
     """장바구니 페이지"""
     return render_template('cart.html')
 
 @bp.route('/orderlist')
+@public_endpoint
 def orderlist():
     """주문 목록 페이지"""
     return render_template('orderlist2.html')
 
 @bp.route('/order')
+@public_endpoint
 def order():
     """주문/결제 페이지"""
     return render_template('payment.html')
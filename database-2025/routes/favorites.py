@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, render_template
 from models import db, FavoriteStore, Store
-from utils.auth import login_required, get_current_user
+from utils.auth import login_required, get_current_user, public_endpoint
 
 bp = Blueprint('favorites', __name__)
 
@@ -77,37 +77,38 @@ def remove_favorite(store_id):
 @login_required
 def get_favorites():
     """찜한 가게 목록 (사용자 인증 필요)"""
-    from models import Review
+    from sqlalchemy import func
+    from models import StoreStats
     
     user = get_current_user()
     if not user:
         return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
     
-    favorites = FavoriteStore.query.filter_by(
-        user_id=user.id,
-        is_deleted=False
-    ).all()
-    
-    stores = []
-    for fav in favorites:
-        store = Store.query.get(fav.store_id)
-        if store:
-            # 실제 Review 테이블에서 리뷰 개수 계산
-            review_count = Review.query.filter_by(store_id=store.id).count()
-            
-            stores.append({
-                'id': store.id,
-                'store_name': store.store_name,
-                'category': store.category,
-                'phone': store.phone,
-                'minprice': store.minprice,
-                'reviewCount': review_count  # 실제 리뷰 개수 사용
-            })
+    # 찜 목록 + 가게 + 리뷰 수(store_stats)를 한 번에 조회
+    rows = db.session.query(
+        Store,
+        func.coalesce(StoreStats.review_count, 0)
+    ).join(
+        FavoriteStore, FavoriteStore.store_id == Store.id
+    ).outerjoin(
+        StoreStats, StoreStats.store_id == Store.id
+    ).filter(
+        FavoriteStore.user_id == user.id,
+        FavoriteStore.is_deleted == False
+    ).order_by(FavoriteStore.id.asc()).all()
     
-    return jsonify(stores), 200
+    return jsonify([{
+        'id': store.id,
+        'store_name': store.store_name,
+        'category': store.category,
+        'phone': store.phone,
+        'minprice': store.minprice,
+        'reviewCount': int(review_count)  # 실제 리뷰 개수 사용
+    } for store, review_count in rows]), 200
 
 # 템플릿 라우트
 @bp.route('/page')
+@public_endpoint
 def favorites_page():
     """찜한 가게 목록 페이지"""
     return render_template('like.html')
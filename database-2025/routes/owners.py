@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify, session, render_template
 from models import db, Owner
-from utils.auth import owner_required, get_current_owner
+from utils.auth import owner_required, get_current_owner, public_endpoint
 
 bp = Blueprint('owners', __name__)
 
 @bp.route('/register', methods=['POST'])
+@public_endpoint
 def register():
     """사장 회원가입"""
     data = request.get_json()
@@ -31,6 +32,7 @@ def register():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/login', methods=['POST'])
+@public_endpoint
 def login():
     """사장 로그인"""
     data = request.get_json()
@@ -77,6 +79,7 @@ def get_owner(owner_id):
 
 # 템플릿 라우트
 @bp.route('/page')
+@public_endpoint
 def owner_page():
     """사장 페이지"""
     return render_template('owner.html')
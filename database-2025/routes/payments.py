@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, render_template
 from models import db, Payment, Store
-from utils.auth import owner_required, get_current_owner, verify_store_ownership
+from utils.auth import owner_required, get_current_owner, verify_store_ownership, public_endpoint
+from utils.cache import reference_cache, payment_methods_key
 
 bp = Blueprint('payments', __name__)
 
@@ -28,6 +29,7 @@ def add_payment(store_id):
     try:
         db.session.add(payment)
         db.session.commit()
+        reference_cache.invalidate(payment_methods_key())
         return jsonify({'message': '결제 수단이 추가되었습니다.', 'payment_id': payment.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -52,6 +54,7 @@ def remove_payment(store_id, payment_id):
     try:
         db.session.delete(payment)
         db.session.commit()
+        reference_cache.invalidate(payment_methods_key())
         return jsonify({'message': '결제 수단이 제거되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
@@ -68,6 +71,7 @@ def get_store_payments(store_id):
 
 # 템플릿 라우트
 @bp.route('/page')
+@public_endpoint
 def payment_page():
     """결제 페이지"""
     return render_template('payment.html')
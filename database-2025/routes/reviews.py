@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify
 from models import db, Review, Store
-from utils.auth import login_required, get_current_user, owner_required, get_current_owner, verify_store_ownership
+from utils.auth import login_required, get_current_user, get_user_owner, owner_required, get_current_owner, verify_store_ownership
+from utils.stats import record_review, remove_review
+from utils.idempotency import idempotent, idempotent_commit
+from utils.metrics import metrics
 
 bp = Blueprint('reviews', __name__)
 
 @bp.route('', methods=['POST'])
 @login_required
+@idempotent
 def create_review():
     """리뷰 작성 (사용자 인증 필요)"""
     user = get_current_user()
@@ -56,9 +60,12 @@ def create_review():
     
     try:
         db.session.add(review)
-        # 가게의 리뷰 개수 업데이트
-        store.reviewCount = Review.query.filter_by(store_id=store_id).count() + 1
-        db.session.commit()
+        db.session.flush()  # review.created_at을 얻기 위해
+        # 가게의 리뷰 개수 / 통계 증분 업데이트 (같은 트랜잭션)
+        store.reviewCount = Store.reviewCount + 1
+        record_review(store.id, rating, review.created_at)
+        metrics.inc_on_commit('reviews_created_total')
+        idempotent_commit()
         return jsonify({'message': '리뷰가 작성되었습니다.', 'review_id': review.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -96,8 +103,7 @@ def delete_review(review_id):
         return jsonify({'error': '가게를 찾을 수 없습니다.'}), 404
     
     # Owner 찾기
-    from models import Owner
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         return jsonify({'error': '사장님 정보를 찾을 수 없습니다.'}), 404
     
@@ -108,10 +114,10 @@ def delete_review(review_id):
     try:
         # 리뷰 삭제
         db.session.delete(review)
-        db.session.flush()  # 삭제를 먼저 반영
         
-        # 가게의 리뷰 개수 업데이트 (삭제 후 개수 재계산)
-        store.reviewCount = Review.query.filter_by(store_id=store.id).count()
+        # 가게의 리뷰 개수 / 통계 증분 업데이트 (같은 트랜잭션)
+        store.reviewCount = Store.reviewCount - 1
+        remove_review(store.id, review.rating, review.created_at)
         db.session.commit()
         return jsonify({'message': '리뷰가 삭제되었습니다.'}), 200
     except Exception as e:
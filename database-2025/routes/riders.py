@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, render_template
 from models import db, Rider
+from utils.auth import public_endpoint
 
 bp = Blueprint('riders', __name__)
 
@@ -56,6 +57,7 @@ def get_rider_by_user_id(user_id):
 
 # 템플릿 라우트
 @bp.route('/page')
+@public_endpoint
 def rider_page():
     """라이더 페이지"""
     return render_template('rider.html')
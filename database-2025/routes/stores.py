@@ -1,9 +1,29 @@
 from flask import Blueprint, request, jsonify, render_template
-from models import db, Store, Category, Owner, Payment, StorePayment, Review, Order
-from utils.auth import login_required, get_current_user, owner_required, get_current_owner, verify_store_ownership
+from models import db, Store, Category, Owner, Payment, StorePayment, StoreStats
+from utils.auth import login_required, get_current_user, get_user_owner, owner_required, get_current_owner, verify_store_ownership, public_endpoint
+from utils.search import index_store
+from utils.geo import geocode, store_location
 
 bp = Blueprint('stores', __name__)
 
+# 매출 분석 조회 기간 상한 (일), 구간 수가 너무 많아지지 않도록 제한
+ANALYTICS_MAX_DAYS = {'day': 366, 'hour': 31}
+
+def _location_from_request(data):
+    """요청의 latitude/longitude/delivery_radius (또는 address)로 가게 위치 컬럼 값 계산
+    
+    반환값: (위치 dict, 오류 메시지) - 위치 정보가 없으면 빈 dict
+    """
+    if data.get('address') and data.get('latitude') is None and data.get('longitude') is None:
+        latitude, longitude = geocode(data['address'])
+        if latitude is None:
+            return None, '주소의 좌표를 찾을 수 없습니다.'
+        data = dict(data, latitude=latitude, longitude=longitude)
+    try:
+        return store_location(data), None
+    except ValueError as e:
+        return None, str(e)
+
 @bp.route('/register', methods=['POST'])
 @login_required
 def register():
@@ -50,10 +70,15 @@ def register():
     if not category:
         return jsonify({'error': '존재하지 않는 카테고리입니다.'}), 404
     
+    # 가게 좌표/배달 반경 (선택, 주소만 주면 로컬 지오코딩 테이블로 변환)
+    location, error = _location_from_request(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
     # User ID를 owner_id로 사용 (User가 Owner 역할)
     # 먼저 Owner 레코드가 있는지 확인하고, 없으면 생성
     from models import Owner
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         # Owner 레코드 생성 (User 정보 기반)
         owner = Owner(
@@ -76,7 +101,8 @@ def register():
         reviewCount=0,
         operationTime=data['operationTime'],
         closedDay=data['closedDay'],
-        information=data.get('information', '')  # 가게 정보 추가
+        information=data.get('information', ''),  # 가게 정보 추가
+        **location
     )
     
     try:
@@ -92,6 +118,7 @@ def register():
             db.session.add(store_payment)
         
         db.session.commit()
+        index_store(store)
         return jsonify({'message': '가게 등록이 완료되었습니다.', 'store_id': store.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -100,34 +127,38 @@ def register():
 @bp.route('/category/<int:category_id>', methods=['GET'])
 def get_stores_by_category(category_id):
     """카테고리별 가게 목록"""
-    stores = Store.query.filter_by(category_id=category_id).all()
+    from sqlalchemy import func
+    
+    # 리뷰 수 / 주문 수는 다른 조회 API와 같이 store_stats에서 가져옴 (통계가 없는 가게는 0)
+    rows = db.session.query(
+        Store,
+        func.coalesce(StoreStats.review_count, 0),
+        func.coalesce(StoreStats.order_count, 0)
+    ).outerjoin(
+        StoreStats, StoreStats.store_id == Store.id
+    ).filter(Store.category_id == category_id).all()
     return jsonify([{
         'id': store.id,
         'store_name': store.store_name,
         'category': store.category,
         'phone': store.phone,
         'minprice': store.minprice,
-        'reviewCount': store.reviewCount,
+        'reviewCount': int(review_count),
+        'orderCount': int(order_count),
         'operationTime': store.operationTime,
         'closedDay': store.closedDay
-    } for store in stores]), 200
+    } for store, review_count, order_count in rows]), 200
 
 @bp.route('/<int:store_id>', methods=['GET'])
 def get_store(store_id):
     """가게 상세 정보"""
-    from sqlalchemy import func
-    
     store = Store.query.get_or_404(store_id)
     
-    # 평균 별점 계산
-    avg_rating_result = db.session.query(func.avg(Review.rating)).filter_by(store_id=store_id).scalar()
-    avg_rating = round(avg_rating_result, 1) if avg_rating_result else 0.0
-    
-    # 주문 수 계산
-    order_count = Order.query.filter_by(store_id=store_id).count()
-    
-    # 리뷰 수 계산 (실제 Review 테이블에서)
-    review_count = Review.query.filter_by(store_id=store_id).count()
+    # 주문 수 / 리뷰 수 / 평균 별점은 store_stats에서 조회 (order/review 테이블 스캔 없음)
+    stats = db.session.get(StoreStats, store_id)
+    avg_rating = stats.avg_rating if stats else 0.0
+    order_count = stats.order_count if stats else 0
+    review_count = stats.review_count if stats else 0
     
     return jsonify({
         'id': store.id,
@@ -143,6 +174,9 @@ def get_store(store_id):
         'operationTime': store.operationTime,
         'closedDay': store.closedDay,
         'information': store.information or '',  # 가게 정보 추가
+        'latitude': store.latitude,
+        'longitude': store.longitude,
+        'deliveryRadius': store.delivery_radius,
         'created_at': store.created_at.isoformat()
     }), 200
 
@@ -155,7 +189,7 @@ def update_store(store_id):
         return jsonify({'error': '로그인이 필요합니다.'}), 401
     
     # Owner 찾기
-    owner = Owner.query.filter_by(owner_id=user.user_id).first()
+    owner = get_user_owner()
     if not owner:
         return jsonify({'error': '사장님 정보를 찾을 수 없습니다.'}), 404
     
@@ -200,6 +234,11 @@ def update_store(store_id):
     if not category:
         return jsonify({'error': '존재하지 않는 카테고리입니다.'}), 404
     
+    # 가게 좌표/배달 반경 검증
+    location, error = _location_from_request(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
     # 가게 정보 업데이트
     store.category_id = data['category_id']
     store.category = category.category  # Category 테이블에서 가져온 카테고리 이름
@@ -210,6 +249,9 @@ def update_store(store_id):
     store.operationTime = data['operationTime']
     store.closedDay = data['closedDay']
     store.information = data.get('information', '')  # 가게 정보 업데이트
+    # 좌표/배달 반경은 요청에 있을 때만 변경
+    for column, value in location.items():
+        setattr(store, column, value)
     
     try:
         # 기존 StorePayment 레코드 삭제
@@ -224,11 +266,53 @@ def update_store(store_id):
             db.session.add(store_payment)
         
         db.session.commit()
+        index_store(store)
         return jsonify({'message': '가게 정보가 수정되었습니다.', 'store_id': store.id}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/<int:store_id>/analytics', methods=['GET'])
+@login_required
+def get_store_analytics(store_id):
+    """가게 매출 분석 (User 로그인 필요 - 가게 소유자만, 시간/일 단위 집계 테이블에서 조회)
+    
+    쿼리 파라미터: from, to (YYYY-MM-DD, UTC 기준, to 포함), granularity (day | hour)
+    """
+    from datetime import date, datetime, time, timedelta
+    from utils.stats import sales_analytics
+    
+    owner = get_user_owner()
+    if not owner:
+        return jsonify({'error': '사장님 정보를 찾을 수 없습니다.'}), 404
+    
+    store = db.session.get(Store, store_id)
+    if not store:
+        return jsonify({'error': '가게를 찾을 수 없습니다.'}), 404
+    if store.owner_id != owner.id:
+        return jsonify({'error': '가게 조회 권한이 없습니다.'}), 403
+    
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ANALYTICS_MAX_DAYS:
+        return jsonify({'error': 'granularity는 day 또는 hour만 가능합니다.'}), 400
+    
+    # 기본 기간: 오늘 포함 최근 7일
+    try:
+        to_date = date.fromisoformat(request.args['to']) if request.args.get('to') else datetime.utcnow().date()
+        from_date = date.fromisoformat(request.args['from']) if request.args.get('from') else to_date - timedelta(days=6)
+    except ValueError:
+        return jsonify({'error': '날짜는 YYYY-MM-DD 형식이어야 합니다.'}), 400
+    if from_date > to_date:
+        return jsonify({'error': '시작일이 종료일보다 늦습니다.'}), 400
+    if (to_date - from_date).days + 1 > ANALYTICS_MAX_DAYS[granularity]:
+        return jsonify({'error': f'{granularity} 단위 조회는 최대 {ANALYTICS_MAX_DAYS[granularity]}일까지 가능합니다.'}), 400
+    
+    start = datetime.combine(from_date, time.min)
+    end = datetime.combine(to_date + timedelta(days=1), time.min)
+    result = sales_analytics(store.id, start, end, granularity)
+    return jsonify(dict(result, store_id=store.id, granularity=granularity,
+                        **{'from': from_date.isoformat(), 'to': to_date.isoformat()})), 200
+
 @bp.route('/owner/<int:user_id>', methods=['GET'])
 def get_stores_by_owner(user_id):
     """사장별 가게 목록 (User ID로 조회)"""
@@ -262,6 +346,7 @@ def get_stores_by_owner(user_id):
 
 # 템플릿 라우트
 @bp.route('/<int:store_id>/detail')
+@public_endpoint
 def store_detail(store_id):
     """가게 상세 페이지"""
     return render_template('storedetail.html', store_id=store_id)
@@ -1,10 +1,12 @@
 from flask import Blueprint, request, jsonify, session, render_template
 from models import db, User
-from utils.auth import login_required, get_current_user
+from utils.auth import login_required, get_current_user, public_endpoint
+from utils.geo import geocode
 
 bp = Blueprint('users', __name__)
 
 @bp.route('/check-id', methods=['POST'])
+@public_endpoint
 def check_user_id():
     """아이디 중복 확인"""
     data = request.get_json()
@@ -24,6 +26,7 @@ def check_user_id():
         return jsonify({'available': True, 'message': '사용 가능한 아이디입니다.'}), 200
 
 @bp.route('/register', methods=['POST'])
+@public_endpoint
 def register():
     """회원가입"""
     data = request.get_json()
@@ -35,11 +38,15 @@ def register():
     if User.query.filter_by(user_id=data['user_id']).first():
         return jsonify({'error': '이미 존재하는 아이디입니다.'}), 400
     
+    # 주소를 로컬 지오코딩 테이블로 좌표 변환 (배달 가능 가게 필터용, 못 찾으면 NULL)
+    latitude, longitude = geocode(data['address'])
     user = User(
         user_id=data['user_id'],
         email=data['email'],
         name=data['name'],
-        address=data['address']
+        address=data['address'],
+        latitude=latitude,
+        longitude=longitude
     )
     user.set_password(data['passwd'])
     
@@ -52,6 +59,7 @@ def register():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/login', methods=['POST'])
+@public_endpoint
 def login():
     """로그인"""
     data = request.get_json()
@@ -115,6 +123,7 @@ def modify_address():
         return jsonify({'error': '주소를 입력해주세요.'}), 400
     
     user.address = data['address']
+    user.latitude, user.longitude = geocode(data['address'])
     
     try:
         db.session.commit()
@@ -125,16 +134,19 @@ def modify_address():
 
 # 템플릿 라우트
 @bp.route('/firstpage')
+@public_endpoint
 def firstpage():
     """로그인/회원가입 첫 페이지"""
     return render_template('firstpage.html')
 
 @bp.route('/signup')
+@public_endpoint
 def signup():
     """회원가입 페이지"""
     return render_template('signup.html')
 
 @bp.route('/setting')
+@public_endpoint
 def setting():
     """설정 페이지"""
     return render_template('setting.html')
@@ -1,6 +1,18 @@
 from functools import wraps
-from flask import session, jsonify, request
-from models import db, User, Owner
+from flask import session, jsonify, request, g
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from models import db, User, Owner, Rider
+from utils.cache import LRUCache
+
+# 로그인한 User/Owner/Rider 행 캐시 (프로세스 단위, 쓰기 시 무효화 + TTL로 워커 간 불일치 제한)
+identity_cache = LRUCache(maxsize=10000, ttl=30)
+
+_NOT_CACHED = object()
+
+# 엔드포인트별 인증 정책
+AUTH_POLICY_PUBLIC = 'public'    # 세션 유효성 검사 생략
+AUTH_POLICY_SESSION = 'session'  # 세션의 User/Owner가 실제로 존재하는지 검사 (기본값)
 
 def login_required(f):
     """사용자 인증 데코레이터"""
@@ -22,19 +34,81 @@ def owner_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def public_endpoint(f):
+    """세션 유효성 검사가 필요 없는 엔드포인트 표시 (@bp.route 바로 아래에 사용)"""
+    f.auth_policy = AUTH_POLICY_PUBLIC
+    return f
+
+def build_auth_policies(app):
+    """엔드포인트 이름 -> 인증 정책 테이블 생성 (요청마다 request.endpoint로 바로 조회)"""
+    policies = {
+        endpoint: getattr(view, 'auth_policy', AUTH_POLICY_SESSION)
+        for endpoint, view in app.view_functions.items()
+    }
+    policies['static'] = AUTH_POLICY_PUBLIC
+    app.extensions['auth_policies'] = policies
+    return policies
+
+def _detached_copy(obj):
+    """세션과 무관한 컬럼 값 복사본 (캐시 보관용)"""
+    mapper = inspect(obj).mapper
+    copy = mapper.class_(**{attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+def _cached_get(model, pk):
+    """기본키로 조회하되, 캐시에 있으면 쿼리 없이 현재 세션에 붙여서 반환"""
+    if not pk:
+        return None
+    key = (model.__tablename__, pk)
+    cached = identity_cache.get(key, _NOT_CACHED)
+    if cached is _NOT_CACHED:
+        obj = db.session.get(model, pk)
+        identity_cache.set(key, _detached_copy(obj) if obj else None)
+        return obj
+    if cached is None:
+        return None
+    return db.session.merge(cached, load=False)
+
+def _cached_get_by_login_id(model, column, login_id):
+    """User.user_id와 같은 로그인 아이디로 Owner/Rider 행 조회 (없음도 캐시)"""
+    if not login_id:
+        return None
+    key = (model.__tablename__ + '_of', login_id)
+    pk = identity_cache.get(key, _NOT_CACHED)
+    if pk is _NOT_CACHED:
+        obj = model.query.filter(column == login_id).first()
+        identity_cache.set(key, obj.id if obj else None)
+        if obj:
+            identity_cache.set((model.__tablename__, obj.id), _detached_copy(obj))
+        return obj
+    return _cached_get(model, pk)
+
 def get_current_user():
-    """현재 로그인한 사용자 반환"""
-    user_id = session.get('user_id')
-    if user_id:
-        return User.query.get(user_id)
-    return None
+    """현재 로그인한 사용자 반환 (요청당 한 번만 조회)"""
+    if '_current_user' not in g:
+        g._current_user = _cached_get(User, session.get('user_id'))
+    return g._current_user
 
 def get_current_owner():
-    """현재 로그인한 사장 반환"""
-    owner_id = session.get('owner_id')
-    if owner_id:
-        return Owner.query.get(owner_id)
-    return None
+    """현재 로그인한 사장 반환 (요청당 한 번만 조회)"""
+    if '_current_owner' not in g:
+        g._current_owner = _cached_get(Owner, session.get('owner_id'))
+    return g._current_owner
+
+def get_user_owner():
+    """현재 로그인한 사용자의 Owner 행 반환 (User가 Owner 역할, 없으면 None)"""
+    if '_user_owner' not in g:
+        user = get_current_user()
+        g._user_owner = _cached_get_by_login_id(Owner, Owner.owner_id, user.user_id) if user else None
+    return g._user_owner
+
+def get_user_rider():
+    """현재 로그인한 사용자의 Rider 행 반환 (User가 라이더 역할, 없으면 None)"""
+    if '_user_rider' not in g:
+        user = get_current_user()
+        g._user_rider = _cached_get_by_login_id(Rider, Rider.rider_id, user.user_id) if user else None
+    return g._user_rider
 
 def verify_store_ownership(store_id, owner_id):
     """가게 소유권 확인"""
@@ -44,3 +118,39 @@ def verify_store_ownership(store_id, owner_id):
         return False
     return True
 
+# 캐시 무효화: User/Owner/Rider 행이 추가/수정/삭제되면 관련 키를 커밋 후에 지운다
+# (flush 시점에 지우면 커밋 전에 다른 요청이 이전 값을 다시 읽어서 TTL 동안 캐시에 남을 수 있음, 롤백되면 지우지 않음)
+def _invalidate_identity(mapper, connection, target):
+    keys = [(target.__tablename__, target.id)]
+    if isinstance(target, Owner):
+        keys.append(('owner_of', target.owner_id))
+    elif isinstance(target, Rider):
+        keys.append(('rider_of', target.rider_id))
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('identity_cache_keys', set()).update(keys)
+
+for _model in (User, Owner, Rider):
+    for _event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event_name, _invalidate_identity)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_identity_on_bulk_write(orm_execute_state):
+    """Query.update()/delete() 같은 일괄 쓰기는 행 단위 이벤트가 없으므로 커밋 후 캐시 전체를 비운다"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ in (User, Owner, Rider) for mapper in orm_execute_state.all_mappers):
+        orm_execute_state.session.info['identity_cache_clear'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _apply_identity_invalidation(session):
+    keys = session.info.pop('identity_cache_keys', None)
+    if session.info.pop('identity_cache_clear', False):
+        identity_cache.clear()
+    elif keys:
+        identity_cache.delete(*keys)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_identity_invalidation(session):
+    session.info.pop('identity_cache_keys', None)
+    session.info.pop('identity_cache_clear', None)
@@ -0,0 +1,84 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from sqlalchemy import and_, insert, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+from models import db
+
+# 한 번의 IN 조회 / INSERT에 담는 행 수
+CHUNK_SIZE = 1000
+# 이보다 적으면 프로세스 풀을 띄우는 비용이 더 크므로 그냥 순차 해싱
+PARALLEL_HASH_THRESHOLD = 32
+
+def chunked(iterable, size=CHUNK_SIZE):
+    """iterable을 size개씩 리스트로 잘라서 반환"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def existing_values(columns, values, *criteria, chunk_size=CHUNK_SIZE):
+    """values 중 DB에 이미 있는 값의 집합 (IN 조회를 chunk 단위로 실행)
+    
+    columns에 (A, B) 튜플을 주면 (A, B) 쌍 단위로 확인한다.
+    """
+    if isinstance(columns, tuple):
+        target = tuple_(*columns)
+    else:
+        target, columns = columns, (columns,)
+    found = set()
+    for chunk in chunked(dict.fromkeys(values), chunk_size):
+        for row in db.session.query(*columns).filter(target.in_(chunk), *criteria).all():
+            found.add(tuple(row) if len(columns) > 1 else row[0])
+    return found
+
+def bulk_insert(model, rows, chunk_size=CHUNK_SIZE):
+    """insert().values([...])를 chunk 단위로 실행 (커밋은 호출한 쪽에서), 반환값: 삽입 행 수"""
+    count = 0
+    for chunk in chunked(rows, chunk_size):
+        db.session.execute(insert(model).values(chunk))
+        count += len(chunk)
+    return count
+
+def upsert(model, row, values, keys=None):
+    """row를 삽입하고, 기본키(또는 keys 컬럼의 유니크 키)가 이미 있으면 values({컬럼: 식})로 갱신 (커밋은 호출한 쪽에서)
+    
+    MySQL은 INSERT ... ON DUPLICATE KEY UPDATE, SQLite는 INSERT ... ON CONFLICT DO UPDATE 한 문장으로 실행하므로
+    같은 행을 처음 만드는 요청 두 개가 동시에 와도 중복 키 오류나 데드락이 나지 않는다.
+    values의 식에서 컬럼은 이미 있는 행의 값이다 (예: {Model.count: Model.count + 1}).
+    """
+    values = {column.key: value for column, value in values.items()}
+    keys = [column.name for column in (keys or model.__table__.primary_key.columns)]
+    dialect = db.engine.dialect.name
+    if dialect == 'mysql':
+        db.session.execute(mysql_insert(model).values(row).on_duplicate_key_update(values))
+    elif dialect == 'sqlite':
+        db.session.execute(sqlite_insert(model).values(row).on_conflict_do_update(
+            index_elements=keys, set_=values
+        ))
+    else:
+        # upsert 문법이 없는 DB: 세이브포인트 안에서 삽입하고, 이미 있으면 갱신
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(model).values(row))
+        except IntegrityError:
+            db.session.execute(update(model).where(
+                and_(*[model.__table__.columns[key] == row[key] for key in keys])
+            ).values(values))
+
+def hash_passwords(passwords, workers=None):
+    """비밀번호 목록을 해싱 (개수가 많으면 프로세스 풀에서 병렬 처리)"""
+    passwords = list(passwords)
+    workers = workers or multiprocessing.cpu_count()
+    if len(passwords) < PARALLEL_HASH_THRESHOLD or workers <= 1:
+        return [generate_password_hash(password) for password in passwords]
+    # 스레드가 있는 서버 프로세스를 fork하지 않도록 spawn 사용
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(generate_password_hash, passwords, chunksize=chunksize))
@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+
+_MISSING = object()
+
+class CacheBackend(ABC):
+    """캐시 백엔드 인터페이스
+    
+    공유 캐시(예: Redis)를 붙일 때는 이 메서드들만 구현하면 된다 (빠뜨리면 생성 시 TypeError).
+    공유 백엔드에는 JSON으로 직렬화 가능한 값만 저장한다.
+    """
+    
+    @abstractmethod
+    def get(self, key, default=None):
+        """key의 값 (없거나 만료되었으면 default)"""
+    
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """key에 값 저장 (ttl이 없으면 백엔드 기본값)"""
+    
+    @abstractmethod
+    def delete(self, *keys):
+        """key들 삭제 (없는 key는 무시)"""
+    
+    @abstractmethod
+    def clear(self):
+        """모든 항목 삭제"""
+
+class LRUCache(CacheBackend):
+    """TTL이 있는 프로세스 내 LRU 캐시 (스레드 안전)
+    
+    maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 버리고,
+    ttl초가 지난 항목은 조회 시점에 만료 처리한다.
+    """
+    
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+class LocalSharedCache(CacheBackend):
+    """공유 캐시 자리에 쓰는 로컬 대체 구현 (개발/테스트용)
+    
+    실제 공유 캐시처럼 값을 JSON 문자열로 직렬화해서 보관하므로,
+    직렬화할 수 없는 값을 넣으면 여기서도 바로 실패한다.
+    """
+    
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+        if item is None:
+            return default
+        payload, expires_at = item
+        if expires_at < time.time():
+            self.delete(key)
+            return default
+        return json.loads(payload)
+    
+    def set(self, key, value, ttl=None):
+        payload = json.dumps(value)
+        with self._lock:
+            self._data[key] = (payload, time.time() + (self.ttl if ttl is None else ttl))
+    
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class ReadThroughCache:
+    """로컬 LRU -> (선택) 공유 백엔드 -> loader 순서로 조회하는 읽기 캐시"""
+    
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+    
+    def get_or_load(self, key, loader):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(key, value)
+                return value
+        value = loader()
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+        return value
+    
+    def invalidate(self, *keys):
+        self.local.delete(*keys)
+        if self.shared is not None:
+            self.shared.delete(*keys)
+    
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+# 카테고리/지불방식/메뉴 같이 자주 읽고 드물게 바뀌는 기준 데이터 캐시
+# (공유 백엔드는 create_app에서 CACHE_SHARED_BACKEND 설정으로 연결)
+reference_cache = ReadThroughCache(LRUCache(maxsize=2048, ttl=30))
+
+def categories_key():
+    return 'categories'
+
+def payment_methods_key():
+    return 'payment_methods'
+
+def store_menus_key(store_id):
+    return f'menus:{store_id}'
+
+def cached_json_response(key, loader):
+    """기준 데이터를 캐시에서 JSON 응답으로 반환 (ETag 일치 시 304)"""
+    def build():
+        body = current_app.json.dumps(loader())
+        return {'body': body, 'etag': hashlib.sha1(body.encode('utf-8')).hexdigest()}
+    
+    entry = reference_cache.get_or_load(key, build)
+    response = current_app.response_class(entry['body'], mimetype='application/json')
+    response.set_etag(entry['etag'])
+    # 브라우저가 캐시하되 매번 ETag로 재검증하도록
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
@@ -0,0 +1,195 @@
+import csv
+import json
+import os
+from itertools import islice
+from sqlalchemy import select
+from models import db, User, Owner, Category, Payment, Store, Menu, Coupon
+from routes.admin import (
+    get_or_create_owner, bulk_create_users, bulk_create_stores,
+    bulk_create_menus, bulk_create_coupons
+)
+from utils.bulk import CHUNK_SIZE, chunked
+
+# 카탈로그 import/export (CSV/JSONL 스트리밍, chunk 단위 트랜잭션, 체크포인트로 재개)
+FORMATS = ('csv', 'jsonl')
+
+# 내보내는 컬럼 (store_name/category/payment/owner는 다른 DB로 옮길 때 id 대신 이름으로 연결하기 위함)
+EXPORT_FIELDS = {
+    'users': ['id', 'user_id', 'passwd', 'email', 'name', 'address'],
+    'stores': ['id', 'owner', 'store_name', 'category_id', 'category', 'phone', 'minprice',
+               'operationTime', 'closedDay', 'payment_id', 'payment', 'information', 'latitude', 'longitude', 'delivery_radius'],
+    'menus': ['id', 'store_id', 'store_name', 'menu', 'price'],
+    'coupons': ['id', 'store_id', 'store_name', 'discount', 'period'],
+}
+
+def export_query(kind):
+    """kind별 내보내기 쿼리 (id 순, 컬럼 단위로 조회해서 세션에 객체를 쌓지 않음)"""
+    if kind == 'users':
+        return select(User.id, User.user_id, User.passwd, User.email, User.name, User.address), User.id
+    if kind == 'stores':
+        return select(
+            Store.id, Owner.owner_id.label('owner'), Store.store_name, Store.category_id, Store.category,
+            Store.phone, Store.minprice, Store.operationTime, Store.closedDay, Store.payment_id,
+            Payment.payment.label('payment'), Store.information, Store.latitude, Store.longitude, Store.delivery_radius
+        ).join(Owner, Store.owner_id == Owner.id).outerjoin(Payment, Store.payment_id == Payment.id), Store.id
+    if kind == 'menus':
+        return select(
+            Menu.id, Menu.store_id, Store.store_name, Menu.menu, Menu.price
+        ).join(Store, Menu.store_id == Store.id), Menu.id
+    if kind == 'coupons':
+        # 삭제된 쿠폰은 내보내지 않음
+        return select(
+            Coupon.id, Coupon.store_id, Store.store_name, Coupon.discount, Coupon.period
+        ).join(Store, Coupon.store_id == Store.id).where(Coupon.is_deleted == False), Coupon.id
+    raise ValueError(f'알 수 없는 종류입니다: {kind}')
+
+def iter_export_chunks(kind, after_id=0, chunk_size=CHUNK_SIZE):
+    """id 기준 keyset 페이지네이션으로 chunk_size개씩 dict 목록 반환"""
+    query, id_column = export_query(kind)
+    while True:
+        rows = db.session.execute(
+            query.where(id_column > after_id).order_by(id_column).limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            return
+        yield [dict(row) for row in rows]
+        after_id = rows[-1]['id']
+
+def detect_format(path, fmt=None):
+    """--format이 없으면 확장자로 판단 (기본값 jsonl)"""
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+def read_rows(stream, fmt):
+    """파일에서 한 행씩 dict로 읽기 (CSV의 빈 칸은 값이 없는 것으로 취급)"""
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value for key, value in row.items() if key and value not in ('', None)}
+        return
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValueError(f'{line_no}번째 줄을 JSON으로 읽을 수 없습니다.')
+        if isinstance(row, dict):
+            yield row
+
+class RowWriter:
+    """CSV/JSONL 행 단위 쓰기"""
+
+    def __init__(self, stream, fmt, fields, write_header=True):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+            if write_header:
+                self.writer.writeheader()
+
+    def write_rows(self, rows):
+        if self.fmt == 'csv':
+            self.writer.writerows(rows)
+            return
+        for row in rows:
+            self.stream.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+
+# 체크포인트: 커밋(또는 파일 flush)이 끝난 위치를 <파일>.checkpoint에 JSON으로 기록
+def checkpoint_path(path):
+    return path + '.checkpoint'
+
+def load_checkpoint(path, kind, mode):
+    """같은 작업(kind, mode)의 체크포인트가 있으면 반환"""
+    try:
+        with open(checkpoint_path(path), encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get('kind') != kind or checkpoint.get('mode') != mode:
+        return None
+    return checkpoint
+
+def save_checkpoint(path, checkpoint):
+    """임시 파일에 쓰고 rename해서 중간에 죽어도 체크포인트가 깨지지 않게 함"""
+    target = checkpoint_path(path)
+    tmp = target + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, target)
+
+def clear_checkpoint(path):
+    try:
+        os.remove(checkpoint_path(path))
+    except FileNotFoundError:
+        pass
+
+def _resolve_ids(rows, name_field, name_column, id_field):
+    """행에 이름(name_field)이 있으면 현재 DB의 id로 바꿔 넣기 (없는 이름이면 id를 비워서 검증에서 스킵)"""
+    names = {row[name_field] for row in rows if row.get(name_field)}
+    if not names:
+        return
+    model = name_column.class_
+    ids = dict(db.session.query(name_column, model.id).filter(name_column.in_(names)).all())
+    for row in rows:
+        if row.get(name_field):
+            row[id_field] = ids.get(row[name_field])
+
+def import_users(rows, hashed=False, **kwargs):
+    return bulk_create_users(rows, hashed=hashed)
+
+def import_stores(rows, owner_login=None, **kwargs):
+    """가게 가져오기 (owner 컬럼의 Owner에 연결, 없으면 기본 Owner)"""
+    _resolve_ids(rows, 'category', Category.category, 'category_id')
+    _resolve_ids(rows, 'payment', Payment.payment, 'payment_id')
+    if owner_login:
+        default_owner = Owner.query.filter_by(owner_id=owner_login).first()
+        if not default_owner:
+            raise ValueError(f'Owner를 찾을 수 없습니다: {owner_login}')
+    else:
+        default_owner = get_or_create_owner('admin_owner', 'admin@admin.com', 'admin123')
+
+    logins = {row['owner'] for row in rows if row.get('owner')}
+    owners = {
+        owner.owner_id: owner
+        for owner in Owner.query.filter(Owner.owner_id.in_(logins)).all()
+    } if logins else {}
+    groups = {}
+    for row in rows:
+        owner = owners.get(row.get('owner'), default_owner)
+        groups.setdefault(owner.id, (owner, []))[1].append(row)
+    return sum(bulk_create_stores(group, owner) for owner, group in groups.values())
+
+def import_menus(rows, **kwargs):
+    _resolve_ids(rows, 'store_name', Store.store_name, 'store_id')
+    return bulk_create_menus(rows)
+
+def import_coupons(rows, **kwargs):
+    _resolve_ids(rows, 'store_name', Store.store_name, 'store_id')
+    return bulk_create_coupons(rows)
+
+IMPORTERS = {
+    'users': import_users,
+    'stores': import_stores,
+    'menus': import_menus,
+    'coupons': import_coupons,
+}
+
+def import_chunks(kind, rows, skip=0, chunk_size=CHUNK_SIZE, **options):
+    """skip행을 건너뛴 뒤 chunk_size개씩 가져오고 chunk마다 커밋
+
+    chunk마다 (지금까지 읽은 행 수, 이번 chunk에서 추가된 개수)를 반환한다.
+    """
+    importer = IMPORTERS[kind]
+    rows = iter(rows)
+    consumed = sum(1 for _ in islice(rows, skip))
+    for chunk in chunked(rows, chunk_size):
+        try:
+            added = importer(chunk, **options)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        consumed += len(chunk)
+        yield consumed, added
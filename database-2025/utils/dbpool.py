@@ -0,0 +1,202 @@
+import bisect
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# 커넥션 풀 설정 + 계측
+# 연결 수/체크아웃/무효화는 SQLAlchemy 풀 이벤트로 세고, 체크아웃 대기 시간은 풀 이벤트에 "대기 시작" 시점이
+# 없으므로 QueuePool의 연결 꺼내기를 감싼 InstrumentedQueuePool에서 잰다. 값은 프로세스(워커) 단위.
+
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+class PoolMetrics:
+    """엔진 하나의 풀 지표 (스레드 안전)"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.connects = 0             # 새로 연 DB 연결
+            self.closes = 0               # 닫은 DB 연결 (recycle, 무효화, overflow 반납 등)
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0        # 끊어진 연결 (pre_ping 실패, 연결 오류)
+            self.soft_invalidations = 0   # 반납 시 다시 연결하도록 표시된 연결
+            self.timeouts = 0             # pool_timeout 안에 연결을 얻지 못한 횟수
+            self.max_checked_out = 0      # 동시에 사용 중이던 연결 수 최댓값
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+    
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def record_checkout(self, checked_out):
+        with self._lock:
+            self.checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+    
+    def record_wait(self, elapsed_ms, timed_out=False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+            if timed_out:
+                self.timeouts += 1
+    
+    def snapshot(self):
+        """현재 지표 (누적 카운터 + 풀 상태)"""
+        with self._lock:
+            result = {
+                'connects': self.connects,
+                'closes': self.closes,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+                'timeouts': self.timeouts,
+                'max_checked_out': self.max_checked_out,
+                'wait': {
+                    'count': self.wait_count,
+                    'avg_ms': round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    'max_ms': round(self.wait_max_ms, 3),
+                    'total_ms': round(self.wait_total_ms, 3),
+                    # 누적 분포: [{'le_ms': 1, 'count': 대기 1ms 이하 횟수}, ..., {'le_ms': 'inf', 'count': 전체}]
+                    'buckets': _cumulative_buckets(self.wait_buckets)
+                }
+            }
+        pool = self.pool
+        if isinstance(pool, QueuePool):
+            result.update({
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout()
+            })
+        elif pool is not None:
+            result['status'] = pool.status()
+        return result
+
+def _cumulative_buckets(counts):
+    buckets, total = [], 0
+    for bound, count in zip(WAIT_BUCKETS_MS + ['inf'], counts):
+        total += count
+        buckets.append({'le_ms': bound, 'count': total})
+    return buckets
+
+class InstrumentedQueuePool(QueuePool):
+    """연결을 꺼낼 때까지 기다린 시간을 PoolMetrics에 기록하는 QueuePool"""
+    
+    metrics = None
+    
+    def recreate(self):
+        # engine.dispose() 등으로 풀을 새로 만들어도 같은 지표에 계속 기록
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics:
+            self.metrics.pool = pool
+        return pool
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.record_wait((time.perf_counter() - started) * 1000, timed_out)
+
+# 엔진 이름 -> PoolMetrics (primary, 이후 replica 등)
+pool_metrics = {}
+
+def engine_options(pool_config):
+    """config.POOL_CONFIG로 MySQL 엔진 옵션(SQLALCHEMY_ENGINE_OPTIONS) 생성"""
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_config['pool_size'],
+        'max_overflow': pool_config['max_overflow'],
+        'pool_timeout': pool_config['pool_timeout'],
+        'pool_recycle': pool_config['pool_recycle'],
+        'pool_pre_ping': pool_config['pool_pre_ping'],
+        'connect_args': {
+            'connect_timeout': pool_config['connect_timeout'],
+            'read_timeout': pool_config['read_timeout'],
+            'write_timeout': pool_config['write_timeout']
+        }
+    }
+
+def instrument_engine(engine, name='primary'):
+    """엔진의 풀 이벤트에 지표 수집 리스너 등록 (같은 이름으로 다시 호출하면 기존 지표 재사용)"""
+    metrics = pool_metrics.get(name)
+    if metrics is None:
+        metrics = pool_metrics[name] = PoolMetrics(name)
+    if metrics.pool is engine.pool:
+        return metrics
+    metrics.pool = engine.pool
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        metrics._count('connects')
+    
+    @event.listens_for(engine, 'close')
+    def on_close(dbapi_connection, connection_record):
+        metrics._count('closes')
+    
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = metrics.pool
+        metrics.record_checkout(pool.checkedout() if isinstance(pool, QueuePool) else 0)
+    
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        metrics._count('checkins')
+    
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics._count('invalidations')
+    
+    @event.listens_for(engine, 'soft_invalidate')
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics._count('soft_invalidations')
+    
+    return metrics
+
+def pool_snapshot():
+    """모든 엔진의 풀 지표 (프로세스 단위라 pid 포함)"""
+    return {
+        'pid': os.getpid(),
+        'pools': {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    }
+
+def dispose_engines(app, close=True):
+    """앱의 모든 엔진(primary, 복제본)의 풀 비우기
+
+    close=False: fork된 워커에서 부모 프로세스가 연 연결을 닫지 않고 버린다 (같은 소켓을 부모/다른 워커와 공유하지 않도록).
+    """
+    from models import db
+    from utils.replicas import replica_router
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines + replica_router.engines:
+        engine.dispose(close=close)
+
+def reset_pool_metrics():
+    """모든 풀 지표 초기화 (fork된 워커가 부모의 누적값을 물려받지 않도록)"""
+    for metrics in pool_metrics.values():
+        metrics.reset()
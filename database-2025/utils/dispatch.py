@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import islice
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+from models import db, DispatchEvent
+
+DEFAULT_POLL_SECONDS = 1.0
+# 다른 워커의 이벤트를 다시 확인하는 시간 범위 (id 순서와 커밋 순서가 달라도 늦게 커밋된 이벤트를 놓치지 않도록)
+LOOKBACK_SECONDS = 30
+# dispatch_event 테이블 보관 기간 (구독자는 cursor가 버퍼에서 밀려나면 스냅샷부터 다시 받으므로 오래 둘 필요가 없음)
+RETENTION_SECONDS = 3600
+PRUNE_EVERY_SECONDS = 600
+
+class DispatchFeed:
+    """대기 주문 변경 이벤트를 발행/구독하는 피드 (라이더 배차용)
+    
+    이벤트는 주문 생성/수락과 같은 트랜잭션에서 dispatch_event 테이블에 기록하고(record),
+    커밋되면 같은 프로세스의 구독자에게 바로 전달한다. 다른 워커가 기록한 이벤트는
+    프로세스마다 하나인 폴링 스레드가 poll_seconds마다 읽어서 전달한다.
+    
+    최근 max_events개의 이벤트만 보관하며, cursor는 '<피드 id>-<번호>' 형식이다.
+    번호는 이 프로세스 안에서만 의미가 있으므로 다른 워커나 재시작 전 프로세스의 cursor,
+    버퍼에서 밀려난 cursor를 주면 스냅샷부터 다시 받아야 한다.
+    """
+    
+    def __init__(self, max_events=1000):
+        self._events = deque(maxlen=max_events)  # (번호, 이벤트)
+        self._seen = {}  # 전달한 dispatch_event id -> created_at (LOOKBACK_SECONDS 동안만 보관)
+        self._seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._app = None
+        self._poller = None
+        self._started = threading.Lock()
+        self.poll_seconds = DEFAULT_POLL_SECONDS
+        self.id = uuid.uuid4().hex[:8]
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+    
+    def init_app(self, app):
+        self._app = app
+        self.poll_seconds = app.config.get('DISPATCH_POLL_SECONDS', self.poll_seconds)
+    
+    def _after_fork(self):
+        # fork된 워커는 부모의 버퍼/cursor/폴링 스레드를 물려받지 않는다
+        self._events.clear()
+        self._seen = {}
+        self._seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._poller = None
+        self._started = threading.Lock()
+        self.id = uuid.uuid4().hex[:8]
+    
+    @property
+    def cursor(self):
+        """현재 마지막 이벤트의 cursor (스냅샷을 만들기 전에 가져온다)"""
+        self._ensure_polling()
+        with self._cond:
+            return self._format(self._seq)
+    
+    def record(self, event_type, payload):
+        """현재 트랜잭션에 이벤트 기록 (커밋되면 구독자에게 전달, 롤백되면 버림)"""
+        row = DispatchEvent(event_type=event_type, payload=json.dumps(payload, ensure_ascii=False), created_at=datetime.utcnow())
+        db.session.add(row)
+        db.session.flush()
+        db.session.info.setdefault('dispatch_events', []).append((row.id, row.created_at, event_type, payload))
+    
+    def events_since(self, cursor):
+        """cursor 이후의 이벤트 목록 (버퍼에서 밀려났거나 모르는 cursor면 None)"""
+        self._ensure_polling()
+        seq = self._parse(cursor)
+        with self._cond:
+            return self._events_since(seq)
+    
+    def wait(self, cursor, timeout):
+        """cursor 이후 이벤트가 생길 때까지 최대 timeout초 대기 (모르는 cursor거나 피드가 닫혔으면 None)"""
+        self._ensure_polling()
+        seq = self._parse(cursor)
+        with self._cond:
+            if seq is not None:
+                self._cond.wait_for(lambda: self._seq != seq or self._closed, timeout)
+            if self._closed:
+                return None
+            return self._events_since(seq)
+    
+    def close(self):
+        """대기 중인 구독자를 모두 깨워서 스트림을 끝냄 (워커 종료 시 SSE 연결이 graceful shutdown을 막지 않도록)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+    
+    def _format(self, seq):
+        return f'{self.id}-{seq}'
+    
+    def _parse(self, cursor):
+        """이 프로세스의 cursor면 번호, 아니면 None"""
+        feed_id, _, seq = (cursor or '').partition('-')
+        if feed_id != self.id or not seq.isdigit():
+            return None
+        return int(seq)
+    
+    def _events_since(self, seq):
+        if seq is None or seq > self._seq:
+            return None
+        if seq == self._seq:
+            return []
+        if not self._events or self._events[0][0] > seq + 1:
+            return None
+        # 번호는 연속이므로 시작 위치를 바로 계산
+        start = seq + 1 - self._events[0][0]
+        return [event for _, event in islice(self._events, start, None)]
+    
+    def _deliver(self, rows):
+        """dispatch_event 행 [(id, created_at, 종류, payload)]을 구독자에게 전달 (이미 전달한 id는 건너뜀)"""
+        with self._cond:
+            delivered = False
+            for event_id, created_at, event_type, payload in rows:
+                if event_id in self._seen:
+                    continue
+                self._seen[event_id] = created_at
+                self._seq += 1
+                self._events.append((self._seq, {'seq': self._format(self._seq), 'type': event_type, 'data': payload}))
+                delivered = True
+            if delivered:
+                self._cond.notify_all()
+    
+    # 다른 워커의 이벤트 폴링
+    
+    def _ensure_polling(self):
+        """첫 구독 때 폴링 스레드 시작 (create_app/preload 중에는 스레드를 만들지 않음)"""
+        if self._poller is not None or self._app is None:
+            return
+        with self._started:
+            if self._poller is not None:
+                return
+            # 이미 있던 이벤트는 구독자가 스냅샷으로 받으므로 전달하지 않고 기준점으로만 사용
+            with self._app.app_context():
+                for event_id, created_at, _, _ in self._fetch_recent():
+                    self._seen[event_id] = created_at
+            self._poller = threading.Thread(target=self._poll_loop, name='dispatch-feed-poller', daemon=True)
+            self._poller.start()
+    
+    def _fetch_recent(self):
+        since = datetime.utcnow() - timedelta(seconds=LOOKBACK_SECONDS)
+        # 복제 지연이 없도록 primary 엔진에서 직접 읽는다
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(DispatchEvent.id, DispatchEvent.created_at, DispatchEvent.event_type, DispatchEvent.payload)
+                .where(DispatchEvent.created_at >= since)
+                .order_by(DispatchEvent.id)
+            ).all()
+        return [(event_id, created_at, event_type, json.loads(payload)) for event_id, created_at, event_type, payload in rows]
+    
+    def _prune(self):
+        with db.engine.begin() as connection:
+            connection.execute(delete(DispatchEvent).where(
+                DispatchEvent.created_at < datetime.utcnow() - timedelta(seconds=RETENTION_SECONDS)
+            ))
+    
+    def _poll_loop(self):
+        poller = self._poller
+        pruned_at = 0
+        while self._poller is poller and not self._closed:
+            time.sleep(self.poll_seconds)
+            try:
+                with self._app.app_context():
+                    self._deliver(self._fetch_recent())
+                    if time.monotonic() - pruned_at > PRUNE_EVERY_SECONDS:
+                        self._prune()
+                        pruned_at = time.monotonic()
+            except Exception as e:
+                # DB 장애 중에도 스레드는 유지 (같은 워커의 이벤트는 계속 전달됨)
+                self._app.logger.warning(f'배차 피드 폴링 실패: {e}')
+            with self._cond:
+                since = datetime.utcnow() - timedelta(seconds=LOOKBACK_SECONDS * 2)
+                self._seen = {event_id: at for event_id, at in self._seen.items() if at >= since}
+
+# 앱 전체에서 공유하는 배차 피드
+dispatch_feed = DispatchFeed()
+
+@event.listens_for(Session, 'after_commit')
+def _deliver_committed_events(session):
+    """커밋된 트랜잭션에서 기록한 이벤트를 같은 프로세스의 구독자에게 바로 전달"""
+    rows = session.info.pop('dispatch_events', None)
+    if rows:
+        dispatch_feed._deliver(rows)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_events(session):
+    session.info.pop('dispatch_events', None)
@@ -0,0 +1,137 @@
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from werkzeug.routing import IntegerConverter
+from models import db, User, Owner, Rider, Category, Store, Review
+from utils.replicas import PRIMARY_UNTIL_KEY
+
+# 라우트가 실행하는 SELECT 쿼리에 EXPLAIN을 돌려서 풀 스캔을 찾는 검사 (flask db explain)
+
+# 행 수가 몇 개 안 되는 기준 테이블은 풀 스캔이어도 괜찮음
+ALLOWED_FULL_SCANS = {'category', 'payment', 'schema_migration'}
+
+# 전체 목록을 반환하는 것이 목적인 엔드포인트 (관리자 선택 목록 등)
+ALLOWED_FULL_SCAN_ENDPOINTS = {'admin.get_stores_list', 'admin.get_categories'}
+
+# 응답을 끝내지 않는 스트림/롱폴링 엔드포인트는 호출하지 않음
+SKIP_ENDPOINTS = {'customer.get_waiting_orders_feed', 'customer.stream_waiting_orders'}
+
+# URL 인자 이름 -> 샘플 값을 가져올 컬럼 (int 인자는 id, string 인자는 로그인 아이디)
+ARGUMENT_SOURCES = {
+    'user_id': (User.id, User.user_id),
+    'owner_id': (Owner.id, Owner.owner_id),
+    'rider_id': (Rider.id, Rider.rider_id),
+    'store_id': (Store.id, Store.store_name),
+    'category_id': (Category.id, Category.category),
+    'review_id': (Review.id, Review.id),
+}
+
+@contextmanager
+def capture_queries(engine=Engine):
+    """블록 안에서 실행된 SELECT 문을 [(실행한 엔진, SQL, 파라미터)]로 수집
+
+    기본값은 Engine 클래스 전체라서 읽기 복제본(DB_REPLICA_HOSTS)으로 라우팅된 쿼리도 함께 수집한다 (현재 스레드만).
+    """
+    queries = []
+    thread_id = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # 다른 스레드(백그라운드 작업)의 쿼리는 이 블록의 요청과 관계없으므로 제외
+        if threading.get_ident() == thread_id and statement.lstrip().upper().startswith('SELECT'):
+            queries.append((conn.engine, statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def full_scans(connection, statement, parameters):
+    """EXPLAIN 결과에서 인덱스 없이 테이블 전체를 읽는 항목 목록 [(table, detail)]"""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        scans = []
+        for row in rows:
+            detail = row[-1]
+            # 'SCAN store' 는 풀 스캔, 'SCAN store USING INDEX ...' 는 인덱스 순회
+            if detail.startswith('SCAN ') and 'USING' not in detail:
+                scans.append((detail.split()[1], detail))
+        return scans
+    if dialect == 'mysql':
+        result = connection.exec_driver_sql('EXPLAIN ' + statement, parameters)
+        keys = list(result.keys())
+        scans = []
+        for row in result.fetchall():
+            row = dict(zip(keys, row))
+            if row.get('type') == 'ALL':
+                scans.append((row.get('table'), f"type=ALL rows={row.get('rows')} key={row.get('key')}"))
+        return scans
+    raise ValueError(f'EXPLAIN 검사를 지원하지 않는 DB입니다: {dialect}')
+
+def _sample_values():
+    """URL 인자에 넣을 샘플 값 (각 테이블의 첫 행, 없으면 1)"""
+    values = {}
+    for name, (id_column, login_column) in ARGUMENT_SOURCES.items():
+        row = db.session.execute(
+            select(id_column, login_column).order_by(id_column).limit(1)
+        ).first()
+        values[name] = (row[0], row[1]) if row else (1, '1')
+    return values
+
+def _build_path(rule, samples):
+    """rule의 인자를 샘플 값으로 채운 URL (모르는 인자가 있으면 None)"""
+    kwargs = {}
+    for argument in rule.arguments:
+        if argument not in samples:
+            return None
+        int_value, string_value = samples[argument]
+        is_int = isinstance(rule._converters[argument], IntegerConverter)
+        kwargs[argument] = int_value if is_int else string_value
+    return rule.build(kwargs, append_unknown=False)[1]
+
+def check_routes(app):
+    """GET 라우트를 샘플 데이터로 호출하며 실행된 쿼리마다 EXPLAIN
+
+    반환값: [{'endpoint', 'path', 'table', 'detail', 'sql'}] (허용 테이블 제외 풀 스캔 목록)
+    """
+    samples = _sample_values()
+    user_id = samples['user_id'][0]
+    owner_id = samples['owner_id'][0]
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['owner_id'] = owner_id
+
+    findings = []
+    checked = set()
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if 'GET' not in rule.methods or rule.endpoint == 'static' or rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        path = _build_path(rule, samples)
+        if path is None:
+            continue
+        # 앞의 요청이 쓰기를 해서 primary로 고정(sticky)되지 않도록, 운영의 일반 읽기 요청처럼 복제본 라우팅 상태에서 호출
+        with client.session_transaction() as sess:
+            sess.pop(PRIMARY_UNTIL_KEY, None)
+        with capture_queries() as queries:
+            client.get(path)
+        for engine, statement, parameters in queries:
+            if statement in checked:
+                continue
+            checked.add(statement)
+            # 쿼리를 실제로 실행한 엔진(primary 또는 복제본)에서 EXPLAIN
+            with engine.connect() as connection:
+                scans = full_scans(connection, statement, parameters)
+            for table, detail in scans:
+                if table in ALLOWED_FULL_SCANS or rule.endpoint in ALLOWED_FULL_SCAN_ENDPOINTS:
+                    continue
+                findings.append({
+                    'endpoint': rule.endpoint,
+                    'path': path,
+                    'table': table,
+                    'detail': detail,
+                    'sql': ' '.join(statement.split())
+                })
+    return findings
@@ -0,0 +1,200 @@
+import math
+from sqlalchemy import and_, bindparam, func, insert, or_, select, update
+from models import db, User, Store, AddressGeocode
+
+# 배달 가능 지역 계산
+# 가게 좌표는 geohash(정밀도 5, 약 4.9km x 3.9km 격자)로 버킷을 나눠 (category_id, geohash) 인덱스로 찾고,
+# 고객 좌표에서 MAX_DELIVERY_RADIUS 안에 걸치는 격자만 IN 조회한 뒤 가게별 배달 반경으로 거리를 비교한다.
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 5
+DEFAULT_DELIVERY_RADIUS = 3000  # m
+MIN_DELIVERY_RADIUS = 100
+MAX_DELIVERY_RADIUS = 5000      # 검색할 격자 범위를 정하므로 이보다 큰 반경은 저장 시 잘라냄
+METERS_PER_DEGREE = 111320      # 위도 1도의 거리 (경도는 cos(위도)를 곱함)
+
+# 주소 앞부분의 시/도 표기 통일
+CITY_ALIASES = {'서울': '서울시', '서울특별시': '서울시'}
+
+# 로컬 지오코딩 테이블(address_geocode) 기본 데이터: 서울시 구청 좌표
+SEOUL_DISTRICTS = [
+    ('종로구', 37.5735, 126.9790), ('중구', 37.5641, 126.9979), ('용산구', 37.5324, 126.9900),
+    ('성동구', 37.5633, 127.0371), ('광진구', 37.5385, 127.0823), ('동대문구', 37.5744, 127.0400),
+    ('중랑구', 37.6066, 127.0927), ('성북구', 37.5894, 127.0167), ('강북구', 37.6397, 127.0256),
+    ('도봉구', 37.6688, 127.0471), ('노원구', 37.6542, 127.0568), ('은평구', 37.6027, 126.9291),
+    ('서대문구', 37.5791, 126.9368), ('마포구', 37.5663, 126.9019), ('양천구', 37.5170, 126.8665),
+    ('강서구', 37.5509, 126.8495), ('구로구', 37.4954, 126.8874), ('금천구', 37.4569, 126.8955),
+    ('영등포구', 37.5264, 126.8962), ('동작구', 37.5124, 126.9393), ('관악구', 37.4784, 126.9516),
+    ('서초구', 37.4837, 127.0324), ('강남구', 37.5172, 127.0473), ('송파구', 37.5145, 127.1059),
+    ('강동구', 37.5301, 127.1238),
+]
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """좌표를 geohash 문자열로 변환"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            bounds[0] = middle
+        else:
+            bits = bits * 2
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+def geohash_cell_size(precision=GEOHASH_PRECISION):
+    """geohash 격자 한 칸의 (위도 폭, 경도 폭) (도)"""
+    bits = precision * 5
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+def _steps(start, end, step):
+    """start~end를 step 간격으로 나눈 값 (양 끝 포함) - 한 칸씩 이동하면 범위에 걸친 격자를 모두 지난다"""
+    count = int((end - start) // step) + 1
+    return [start + i * step for i in range(count)] + [end]
+
+def covering_geohashes(latitude, longitude, radius=MAX_DELIVERY_RADIUS, precision=GEOHASH_PRECISION):
+    """(latitude, longitude)에서 radius(m) 안에 걸치는 geohash 격자 집합"""
+    lat_delta = radius / METERS_PER_DEGREE
+    lng_delta = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    cell_lat, cell_lng = geohash_cell_size(precision)
+    south, north = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    return {
+        encode_geohash(lat, lng, precision)
+        for lat in _steps(south, north, cell_lat)
+        for lng in _steps(longitude - lng_delta, longitude + lng_delta, cell_lng)
+    }
+
+def distance_m(lat1, lng1, lat2, lng2):
+    """두 좌표 사이 거리 (m, 배달 반경 수준에서 충분히 정확한 등장방형 근사 - SQL 조건과 같은 식)"""
+    dy = (lat2 - lat1) * METERS_PER_DEGREE
+    dx = (lng2 - lng1) * METERS_PER_DEGREE * math.cos(math.radians(lat1))
+    return math.hypot(dx, dy)
+
+def store_distance_sq(latitude, longitude):
+    """가게까지 거리의 제곱 SQL 표현식 (삼각함수 없이 사칙연산만 써서 SQLite/MySQL 모두 동작)"""
+    dy = (Store.latitude - latitude) * METERS_PER_DEGREE
+    dx = (Store.longitude - longitude) * (METERS_PER_DEGREE * math.cos(math.radians(latitude)))
+    return dx * dx + dy * dy
+
+def delivers_to(latitude, longitude):
+    """(latitude, longitude)로 배달 가능한 가게 조건
+
+    좌표가 없는 가게(geohash NULL)는 배달 지역을 알 수 없으므로 걸러내지 않고 포함한다.
+    """
+    radius = func.coalesce(Store.delivery_radius, DEFAULT_DELIVERY_RADIUS)
+    return or_(
+        Store.geohash.is_(None),
+        and_(
+            Store.geohash.in_(sorted(covering_geohashes(latitude, longitude))),
+            store_distance_sq(latitude, longitude) <= radius * radius
+        )
+    )
+
+def parse_coordinates(latitude, longitude):
+    """위도/경도 값 검증 (반환값: (위도, 경도), 잘못된 값이면 ValueError)"""
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError('잘못된 좌표입니다.')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('잘못된 좌표입니다.')
+    return latitude, longitude
+
+def store_location(data):
+    """요청/가져오기 행의 latitude, longitude, delivery_radius로 Store 위치 컬럼 값 계산
+
+    좌표가 없으면 빈 dict, 잘못된 값이면 ValueError.
+    """
+    if data.get('latitude') in (None, '') and data.get('longitude') in (None, ''):
+        return {}
+    latitude, longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
+    radius = data.get('delivery_radius')
+    try:
+        radius = DEFAULT_DELIVERY_RADIUS if radius in (None, '') else int(float(radius))
+    except (TypeError, ValueError):
+        raise ValueError('잘못된 배달 반경입니다.')
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'delivery_radius': min(max(radius, MIN_DELIVERY_RADIUS), MAX_DELIVERY_RADIUS),
+        'geohash': encode_geohash(latitude, longitude)
+    }
+
+def normalize_address(address):
+    """공백 정리 + 시/도 표기 통일 ("서울특별시  강남구" -> "서울시 강남구")"""
+    tokens = (address or '').split()
+    if tokens:
+        tokens[0] = CITY_ALIASES.get(tokens[0], tokens[0])
+    return ' '.join(tokens)
+
+def address_prefixes(address):
+    """주소의 앞부분 목록, 긴 것부터 ("서울시 강남구 역삼동" -> 전체, "서울시 강남구", "서울시")"""
+    tokens = normalize_address(address).split()
+    return [' '.join(tokens[:end]) for end in range(len(tokens), 0, -1)]
+
+def geocode_many(addresses, connection=None):
+    """주소 목록을 로컬 지오코딩 테이블에서 좌표로 변환 (한 번의 IN 조회, 가장 길게 일치하는 앞부분 사용)
+
+    반환값: {주소: (위도, 경도)} - 찾지 못한 주소는 빠짐
+    """
+    prefixes = {address: address_prefixes(address) for address in set(addresses) if address}
+    keys = {prefix for candidates in prefixes.values() for prefix in candidates}
+    if not keys:
+        return {}
+    executor = connection if connection is not None else db.session
+    known = {
+        address: (latitude, longitude)
+        for address, latitude, longitude in executor.execute(
+            select(AddressGeocode.address, AddressGeocode.latitude, AddressGeocode.longitude)
+            .where(AddressGeocode.address.in_(keys))
+        )
+    }
+    result = {}
+    for address, candidates in prefixes.items():
+        match = next((prefix for prefix in candidates if prefix in known), None)
+        if match:
+            result[address] = known[match]
+    return result
+
+def geocode(address):
+    """주소 하나를 좌표로 변환 (찾지 못하면 (None, None))"""
+    return geocode_many([address]).get(address, (None, None))
+
+def seed_geocodes(connection=None):
+    """address_geocode가 비어 있으면 기본 데이터(서울시 구 단위) 삽입, 반환값: 삽입 행 수"""
+    connection = connection or db.session.connection()
+    if connection.execute(func.count(AddressGeocode.id).select()).scalar():
+        return 0
+    rows = [
+        {'address': f'서울시 {district}', 'latitude': latitude, 'longitude': longitude}
+        for district, latitude, longitude in SEOUL_DISTRICTS
+    ]
+    connection.execute(insert(AddressGeocode), rows)
+    return len(rows)
+
+def backfill_user_coordinates(connection=None):
+    """좌표가 없는 사용자의 주소를 지오코딩해서 latitude/longitude 채우기, 반환값: 채운 사용자 수"""
+    executor = connection if connection is not None else db.session
+    users = executor.execute(
+        select(User.id, User.address).where(User.latitude.is_(None), User.address.isnot(None))
+    ).all()
+    coordinates = geocode_many([address for _, address in users], connection)
+    rows = [
+        {'b_id': user_id, 'b_latitude': coordinates[address][0], 'b_longitude': coordinates[address][1]}
+        for user_id, address in users if address in coordinates
+    ]
+    if rows:
+        user = User.__table__
+        executor.execute(
+            update(user).where(user.c.id == bindparam('b_id'))
+            .values(latitude=bindparam('b_latitude'), longitude=bindparam('b_longitude')),
+            rows
+        )
+    return len(rows)
@@ -0,0 +1,171 @@
+import hashlib
+import itertools
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, request, session, jsonify, make_response
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+
+# Idempotency-Key 헤더 처리
+# 클라이언트가 같은 키로 다시 보낸 요청은 뷰를 실행하지 않고 처음 응답을 그대로 돌려준다.
+# 키는 DB(idempotency_key)에 (사용자, 엔드포인트, 키)로 저장하므로 여러 워커/프로세스가 같은 키를 공유하고,
+# 동시에 들어온 같은 키의 요청은 unique 제약으로 하나만 실행된다.
+# 처리 중인 키는 lease(locked_until)까지만 잠기므로, 워커가 요청 도중 죽으면 lease가 지난 뒤 같은 키로 다시 실행할 수 있다.
+# 뷰의 변경과 저장할 응답은 한 트랜잭션으로 커밋한다 (뷰는 db.session.commit() 대신 idempotent_commit() 사용).
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+DEFAULT_TTL = 24 * 60 * 60  # IDEMPOTENCY_TTL 설정 기본값 (초)
+DEFAULT_LEASE = 60          # IDEMPOTENCY_LEASE 설정 기본값 (초, gunicorn 요청 timeout보다 길게)
+MAX_KEY_LENGTH = 255
+PURGE_EVERY = 100           # 키 예약 N번마다 만료된 키 일괄 삭제
+PURGE_BATCH = 1000
+
+_reservations = itertools.count(1)
+
+def request_fingerprint():
+    """메서드 + 경로 + 본문의 SHA-256 (같은 키로 다른 요청을 보냈는지 확인용)"""
+    digest = hashlib.sha256()
+    digest.update(f'{request.method} {request.path}\n'.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+def purge_expired_keys(limit=PURGE_BATCH):
+    """만료된 키를 최대 limit개 삭제 (커밋은 호출한 쪽에서), 반환값: 삭제 행 수"""
+    ids = db.session.execute(
+        select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= datetime.utcnow()).limit(limit)
+    ).scalars().all()
+    if ids:
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+    return len(ids)
+
+def _find(user_id, scope, key):
+    return IdempotencyKey.query.filter_by(user_id=user_id, scope=scope, key=key).first()
+
+def _replay(record):
+    """저장된 응답 재전송"""
+    response = current_app.response_class(record.response_body, status=record.status_code, mimetype='application/json')
+    response.headers[REPLAYED_HEADER] = 'true'
+    return response
+
+def _in_progress():
+    """같은 키의 첫 요청이 아직 처리 중일 때 응답 (클라이언트는 잠시 후 같은 키로 재시도)"""
+    response = jsonify({'error': '같은 Idempotency-Key의 요청을 처리하는 중입니다.'})
+    response.status_code = 409
+    response.headers['Retry-After'] = '1'
+    return response
+
+def _existing_response(record, fingerprint):
+    """이미 예약된 키에 대한 응답 (처리 완료면 재전송, 처리 중이면 409, 다른 요청이면 422)"""
+    if record.request_hash != fingerprint:
+        return jsonify({'error': '같은 Idempotency-Key로 다른 요청을 보낼 수 없습니다.'}), 422
+    if record.status_code is None:
+        return _in_progress()
+    return _replay(record)
+
+def _reserve(user_id, scope, key, fingerprint):
+    """키 예약 (별도 트랜잭션으로 커밋), 반환값: (예약한 행 id, None) 또는 (None, 돌려줄 응답)"""
+    now = datetime.utcnow()
+    locked_until = now + timedelta(seconds=current_app.config.get('IDEMPOTENCY_LEASE', DEFAULT_LEASE))
+    record = _find(user_id, scope, key)
+    if record and record.expires_at <= now:
+        db.session.delete(record)
+        db.session.flush()
+        record = None
+    if record:
+        if record.request_hash == fingerprint and record.status_code is None:
+            # lease가 지난 처리 중 키는 첫 요청이 끝나지 못한 것(워커 종료 등)이므로 다시 예약 (한 요청만 성공)
+            reclaimed = db.session.execute(update(IdempotencyKey).where(
+                IdempotencyKey.id == record.id,
+                IdempotencyKey.status_code == None,
+                or_(IdempotencyKey.locked_until == None, IdempotencyKey.locked_until <= now)
+            ).values(locked_until=locked_until)).rowcount
+            if reclaimed:
+                db.session.commit()
+                return record.id, None
+        response = _existing_response(record, fingerprint)
+        db.session.rollback()
+        return None, response
+    
+    ttl = current_app.config.get('IDEMPOTENCY_TTL', DEFAULT_TTL)
+    record = IdempotencyKey(user_id=user_id, scope=scope, key=key, request_hash=fingerprint,
+                            created_at=now, locked_until=locked_until, expires_at=now + timedelta(seconds=ttl))
+    db.session.add(record)
+    if next(_reservations) % PURGE_EVERY == 0:
+        purge_expired_keys()
+    try:
+        db.session.flush()
+        record_id = record.id
+        db.session.commit()
+        return record_id, None
+    except IntegrityError:
+        # 같은 키의 요청이 동시에 들어와서 다른 요청이 먼저 예약함
+        db.session.rollback()
+        record = _find(user_id, scope, key)
+        response = _existing_response(record, fingerprint) if record else _in_progress()
+        db.session.rollback()
+        return None, response
+
+def _release(record_id):
+    """실패한 요청의 키 예약 해제 (같은 키로 다시 시도할 수 있게)"""
+    try:
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record_id))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+def idempotent_commit():
+    """@idempotent 뷰의 커밋: 키가 예약된 요청이면 flush만 하고, 데코레이터가 응답 저장과 함께 커밋한다"""
+    if g.get('_idempotency_record_id') is None:
+        db.session.commit()
+    else:
+        db.session.flush()
+
+def idempotent(f):
+    """Idempotency-Key 헤더가 있으면 같은 사용자/엔드포인트/키의 요청을 한 번만 실행하는 데코레이터
+    
+    @login_required 아래에 사용한다. 헤더가 없으면 그대로 실행한다.
+    뷰는 db.session.commit() 대신 idempotent_commit()을 호출해야 응답 저장과 같은 트랜잭션으로 커밋된다.
+    2xx 응답만 저장해서 재전송하고, 실패한 요청(4xx/5xx, 예외)은 변경 없이 롤백되므로 키 예약을 해제한다.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return f(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'Idempotency-Key는 1~{MAX_KEY_LENGTH}자여야 합니다.'}), 400
+        
+        record_id, response = _reserve(session.get('user_id'), request.endpoint, key, request_fingerprint())
+        if response is not None:
+            return response
+        
+        g._idempotency_record_id = record_id
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            _release(record_id)
+            raise
+        finally:
+            g._idempotency_record_id = None
+        if not 200 <= response.status_code < 300:
+            db.session.rollback()
+            _release(record_id)
+            return response
+        
+        # 뷰의 변경(idempotent_commit에서 flush만 한 상태)과 응답을 한 트랜잭션으로 커밋
+        try:
+            db.session.execute(update(IdempotencyKey).where(IdempotencyKey.id == record_id).values(
+                status_code=response.status_code, response_body=response.get_data(as_text=True), locked_until=None
+            ))
+            db.session.commit()
+        except Exception as e:
+            # 뷰의 변경도 함께 롤백되었으므로 키를 해제하고 실패로 응답 (같은 키로 다시 시도하면 새로 실행)
+            db.session.rollback()
+            _release(record_id)
+            return jsonify({'error': str(e)}), 500
+        return response
+    return decorated_function
@@ -0,0 +1,296 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+import weakref
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db
+from utils.auth import public_endpoint
+
+# Prometheus 텍스트 형식 지표 (/metrics)
+# 값은 스레드마다 따로 가진 샤드(dict)에만 쓰고 읽을 때 합치므로 요청 처리 경로에서 잠금을 잡지 않는다.
+# (샤드에 쓰는 스레드는 하나뿐이고, 읽는 쪽은 dict/list 복사본을 사용)
+# 스레드가 끝나면 그 샤드는 프로세스 단위 누적값(_retired)에 합쳐서 없애므로, 요청마다 스레드를 만드는 서버에서도 샤드 수가 늘지 않는다.
+# 여러 프로세스(gunicorn 워커)로 실행할 때는 METRICS_MULTIPROC_DIR을 지정하면 각 프로세스가 자기 값을
+# metrics-<pid>.json으로 주기적으로 저장하고, /metrics는 모든 프로세스의 값을 합쳐서 응답한다.
+# 카운터/히스토그램은 종료된 프로세스 값도 계속 더하고, 게이지는 살아있는 프로세스 값만 더한다.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_SECONDS = 1.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    """{'a': 1, 'b': 'x'} -> 'a="1",b="x"' (이름순, 샤드/파일의 키로 사용)"""
+    return ','.join(f'{name}="{_escape(labels[name])}"' for name in sorted(labels))
+
+class _Shard:
+    """한 스레드가 기록하는 값 {지표 이름: {라벨 문자열: 값}}"""
+    
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}  # 값: [버킷별 횟수..., +Inf 횟수, 합계, 개수]
+
+class _ShardHolder:
+    """스레드 로컬에 두는 샤드 보관 객체 (스레드가 끝나면 해제되어 샤드를 누적값에 합치는 계기가 됨)"""
+    
+    def __init__(self, shard):
+        self.shard = shard
+
+class MetricsRegistry:
+    """프로세스 단위 지표 저장소"""
+    
+    def __init__(self):
+        self._descriptions = {}  # 이름 -> (종류, 설명, 라벨 없는 지표인지)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()  # 끝난 스레드들의 값
+        self._shards_lock = threading.RLock()  # 스레드가 처음 기록할 때, 스레드가 끝날 때, 수집할 때만 사용
+        self._pid = os.getpid()
+        self.multiproc_dir = None
+        self.flush_seconds = DEFAULT_FLUSH_SECONDS
+        self._flusher = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+    
+    def describe(self, name, kind, help_text, labelled=True):
+        self._descriptions[name] = (kind, help_text, labelled)
+    
+    def _after_fork(self):
+        # fork된 워커는 부모의 값을 물려받지 않고 0부터 시작 (부모 값은 부모 파일에 있음)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()
+        self._shards_lock = threading.RLock()
+        self._pid = os.getpid()
+        self._flusher = None
+    
+    def _shard(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = self._local.holder = _ShardHolder(_Shard())
+            with self._shards_lock:
+                self._shards.append(holder.shard)
+            # 스레드가 끝나서 스레드 로컬 값이 해제되면 샤드를 누적값에 합친다
+            weakref.finalize(holder, self._retire, holder.shard, self._pid)
+            self._start_flusher()
+        return holder.shard
+    
+    def _retire(self, shard, pid):
+        if pid != self._pid:
+            return  # fork 전 부모 스레드의 샤드 (자식은 부모 값을 물려받지 않음)
+        with self._shards_lock:
+            try:
+                self._shards.remove(shard)
+            except ValueError:
+                return
+            _merge_values(self._retired.counters, shard.counters)
+            _merge_values(self._retired.gauges, shard.gauges)
+            _merge_histograms(self._retired.histograms, shard.histograms)
+    
+    def init_app(self, app):
+        """요청 지표 수집 + /metrics 엔드포인트 등록
+        
+        METRICS_MULTIPROC_DIR: 프로세스별 값을 저장할 디렉토리 (여러 워커 프로세스로 실행할 때)
+        METRICS_FLUSH_SECONDS: 프로세스별 값을 저장하는 주기 (초)
+        """
+        self.multiproc_dir = app.config.get('METRICS_MULTIPROC_DIR') or None
+        self.flush_seconds = app.config.get('METRICS_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS)
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            atexit.register(self.flush)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        
+        @public_endpoint
+        def prometheus_metrics():
+            """Prometheus 수집용 지표 (텍스트 형식)"""
+            return Response(self.render(), content_type=CONTENT_TYPE)
+        
+        app.add_url_rule('/metrics', 'metrics', prometheus_metrics)
+    
+    def _start_request(self):
+        labels = {'blueprint': request.blueprint or '', 'endpoint': request.endpoint or 'unmatched'}
+        g._metrics_request = (time.perf_counter(), labels)
+        self.gauge_add('http_requests_in_flight', 1, **labels)
+    
+    def _finish_request(self, response):
+        started = g.pop('_metrics_request', None)
+        if started is None:
+            return response
+        started, labels = started
+        self.gauge_add('http_requests_in_flight', -1, **labels)
+        self.inc('http_requests_total', status=response.status_code, method=request.method, **labels)
+        self.observe('http_request_duration_seconds', time.perf_counter() - started, method=request.method, **labels)
+        return response
+    
+    def _teardown_request(self, exc):
+        # after_request가 실행되지 않은 경우(처리되지 않은 예외 등)에도 처리 중 요청 수는 되돌림
+        started = g.pop('_metrics_request', None)
+        if started is not None:
+            self.gauge_add('http_requests_in_flight', -1, **started[1])
+    
+    # 기록 (잠금 없음)
+    
+    def inc(self, name, value=1, **labels):
+        series = self._shard().counters.setdefault(name, {})
+        key = format_labels(labels)
+        series[key] = series.get(key, 0) + value
+    
+    def inc_on_commit(self, name, value=1, **labels):
+        """현재 트랜잭션이 커밋되면 inc (롤백되면 버림) - 커밋을 나중에 하는 @idempotent 뷰용"""
+        db.session.info.setdefault('metrics_pending', []).append((name, value, labels))
+    
+    def gauge_add(self, name, value, **labels):
+        series = self._shard().gauges.setdefault(name, {})
+        key = format_labels(labels)
+        series[key] = series.get(key, 0) + value
+    
+    def observe(self, name, value, **labels):
+        series = self._shard().histograms.setdefault(name, {})
+        key = format_labels(labels)
+        counts = series.get(key)
+        if counts is None:
+            counts = series[key] = [0] * (len(LATENCY_BUCKETS) + 3)
+        counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+    
+    # 수집
+    
+    def collect(self):
+        """이 프로세스의 모든 스레드 값을 합친 결과 {'counters': ..., 'gauges': ..., 'histograms': ...}"""
+        merged = {'counters': {}, 'gauges': {}, 'histograms': {}}
+        # 스레드가 끝나면서 샤드가 누적값으로 옮겨지는 중에 두 번 세거나 빠뜨리지 않도록 잠금 안에서 합친다
+        with self._shards_lock:
+            for shard in [self._retired, *self._shards]:
+                _merge_values(merged['counters'], shard.counters.copy())
+                _merge_values(merged['gauges'], shard.gauges.copy())
+                _merge_histograms(merged['histograms'], shard.histograms.copy())
+        return merged
+    
+    def collect_all(self):
+        """모든 프로세스의 값 (METRICS_MULTIPROC_DIR이 없으면 이 프로세스만)"""
+        merged = self.collect()
+        if not self.multiproc_dir:
+            return merged
+        for path in glob.glob(os.path.join(self.multiproc_dir, 'metrics-*.json')):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # 다른 프로세스가 쓰는 중이거나 지워진 파일
+            if data.get('pid') == self._pid:
+                continue
+            _merge_values(merged['counters'], data.get('counters', {}))
+            _merge_histograms(merged['histograms'], data.get('histograms', {}))
+            if _alive(data.get('pid')):
+                _merge_values(merged['gauges'], data.get('gauges', {}))
+        return merged
+    
+    def render(self):
+        """Prometheus 텍스트 형식"""
+        merged = self.collect_all()
+        lines = []
+        for name, (kind, help_text, labelled) in self._descriptions.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'histogram':
+                for labels, counts in sorted(merged['histograms'].get(name, {}).items()):
+                    prefix = labels + ',' if labels else ''
+                    total = 0
+                    for bound, count in zip(LATENCY_BUCKETS, counts):
+                        total += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {counts[-1]}')
+                    lines.append(f'{name}_sum{{{labels}}} {_number(counts[-2])}')
+                    lines.append(f'{name}_count{{{labels}}} {counts[-1]}')
+                continue
+            series = merged['counters' if kind == 'counter' else 'gauges'].get(name, {})
+            if not series and not labelled:
+                series = {'': 0}
+            for labels, value in sorted(series.items()):
+                lines.append(f'{name}{{{labels}}} {_number(value)}' if labels else f'{name} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+    
+    # 프로세스별 파일 저장
+    
+    def _start_flusher(self):
+        if not self.multiproc_dir or self._flusher is not None:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        self._flusher.start()
+    
+    def _flush_loop(self):
+        pid = self._pid
+        while self._pid == pid:
+            time.sleep(self.flush_seconds)
+            self.flush()
+    
+    def flush(self):
+        """이 프로세스의 값을 metrics-<pid>.json으로 저장 (임시 파일에 쓰고 교체)"""
+        if not self.multiproc_dir or not (self._shards or self._retired.counters or self._retired.histograms):
+            return
+        path = os.path.join(self.multiproc_dir, f'metrics-{self._pid}.json')
+        data = dict(self.collect(), pid=self._pid)
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
+
+def _merge_values(target, source):
+    for name, series in source.items():
+        merged = target.setdefault(name, {})
+        for labels, value in dict(series).items():
+            merged[labels] = merged.get(labels, 0) + value
+
+def _merge_histograms(target, source):
+    for name, series in source.items():
+        merged = target.setdefault(name, {})
+        for labels, counts in dict(series).items():
+            counts = list(counts)
+            current = merged.get(labels)
+            merged[labels] = counts if current is None else [a + b for a, b in zip(current, counts)]
+
+def _alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+metrics = MetricsRegistry()
+metrics.describe('http_requests_total', 'counter', '처리한 HTTP 요청 수 (blueprint, endpoint, method, status)')
+metrics.describe('http_request_duration_seconds', 'histogram', 'HTTP 요청 처리 시간 (초)')
+metrics.describe('http_requests_in_flight', 'gauge', '처리 중인 HTTP 요청 수')
+metrics.describe('orders_created_total', 'counter', '생성된 주문 수 (source: orders = 주문 API, checkout = 장바구니 주문)')
+metrics.describe('orders_accepted_total', 'counter', '라이더가 수락한 주문 수', labelled=False)
+metrics.describe('reviews_created_total', 'counter', '작성된 리뷰 수', labelled=False)
+
+@event.listens_for(Session, 'after_commit')
+def _count_committed(session):
+    """커밋된 트랜잭션에서 예약한 카운터 증가"""
+    for name, value, labels in session.info.pop('metrics_pending', ()):
+        metrics.inc(name, value, **labels)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop('metrics_pending', None)
@@ -0,0 +1,161 @@
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+from models import db, Payment, Category, User, Store, StorePayment, Order, Review, FavoriteStore, Coupon, Menu, OrderItem, CartItem, StoreSalesHourly, StoreSalesDaily, StoreRanking, AddressGeocode, IdempotencyKey, DispatchEvent, SchemaMigration
+from utils.stats import rebuild_sales_rollups, rebuild_store_stats
+from utils.geo import seed_geocodes, backfill_user_coordinates
+from utils.bulk import bulk_insert, existing_values
+
+# 버전 순서대로 적용되는 스키마 마이그레이션 목록: (version, description, 함수)
+# db.create_all()은 이미 있는 테이블에 인덱스/컬럼을 추가하지 않으므로 기존 DB 변경은 여기에 추가한다.
+# MySQL의 DDL은 트랜잭션으로 묶이지 않으므로, 중간에 실패해도 다시 실행할 수 있게 작성한다 (checkfirst 등).
+MIGRATIONS = []
+
+def migration(version, description):
+    """마이그레이션 함수 등록 데코레이터 (함수는 connection을 받아 한 트랜잭션 안에서 실행)"""
+    def decorator(f):
+        MIGRATIONS.append((version, description, f))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return f
+    return decorator
+
+def _create_indexes(connection, *models):
+    """모델에 선언된 인덱스 중 DB에 없는 것만 생성 (아직 없는 컬럼의 인덱스는 그 컬럼을 추가하는 마이그레이션에서 생성)"""
+    for model in models:
+        existing = {column['name'] for column in inspect(connection).get_columns(model.__tablename__)}
+        for index in model.__table__.indexes:
+            if all(column.name in existing for column in index.columns):
+                index.create(connection, checkfirst=True)
+
+def _add_columns(connection, model, *names):
+    """모델에 선언된 컬럼 중 DB 테이블에 없는 것만 ALTER TABLE로 추가 (nullable 컬럼만)"""
+    existing = {column['name'] for column in inspect(connection).get_columns(model.__tablename__)}
+    preparer = connection.dialect.identifier_preparer
+    for name in names:
+        if name in existing:
+            continue
+        column = model.__table__.columns[name]
+        connection.execute(text(
+            f"ALTER TABLE {preparer.format_table(model.__table__)} "
+            f"ADD COLUMN {preparer.quote(name)} {column.type.compile(connection.dialect)}"
+        ))
+
+@migration(1, '조회용 인덱스 추가 (store, store_payment, order, review, favorite_store, coupon, menu)')
+def add_query_indexes(connection):
+    _create_indexes(connection, Store, StorePayment, Order, Review, FavoriteStore, Coupon, Menu)
+
+@migration(2, '주문 항목(order_item) 테이블 추가')
+def add_order_item(connection):
+    OrderItem.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, OrderItem)
+
+@migration(3, '가게 시간/일 단위 매출 집계 테이블 추가 + 기존 주문/리뷰로 채우기')
+def add_sales_rollups(connection):
+    StoreSalesHourly.__table__.create(connection, checkfirst=True)
+    StoreSalesDaily.__table__.create(connection, checkfirst=True)
+    rebuild_sales_rollups(connection)
+
+@migration(4, '가게 순위 지표(store_ranking) 테이블 추가')
+def add_store_ranking(connection):
+    StoreRanking.__table__.create(connection, checkfirst=True)
+
+@migration(5, '배달 가능 지역: user/store 좌표 컬럼, 가게 geohash 인덱스, 로컬 지오코딩(address_geocode) 테이블 추가')
+def add_delivery_zones(connection):
+    _add_columns(connection, User, 'latitude', 'longitude')
+    _add_columns(connection, Store, 'latitude', 'longitude', 'delivery_radius', 'geohash')
+    _create_indexes(connection, Store)
+    AddressGeocode.__table__.create(connection, checkfirst=True)
+    seed_geocodes(connection)
+
+@migration(6, '서버 측 장바구니(cart_item) 테이블, 주문 지불방식(order.payment_id) 컬럼 추가')
+def add_cart(connection):
+    CartItem.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, CartItem)
+    _add_columns(connection, Order, 'payment_id')
+
+@migration(7, '주문/리뷰 중복 요청 방지용 idempotency_key 테이블 추가')
+def add_idempotency_keys(connection):
+    IdempotencyKey.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, IdempotencyKey)
+
+@migration(8, '가게 통계(store_stats)를 기존 주문/리뷰로 채우기')
+def backfill_store_stats(connection):
+    # store_stats는 create_all로 빈 테이블만 생기므로, 기존 DB는 여기서 한 번 다시 집계한다
+    rebuild_store_stats(connection)
+
+@migration(9, '워커 간 라이더 배차 피드 공유용 dispatch_event 테이블 추가')
+def add_dispatch_events(connection):
+    DispatchEvent.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, DispatchEvent)
+
+@migration(10, 'idempotency_key에 처리 중 lease(locked_until) 컬럼 추가')
+def add_idempotency_lease(connection):
+    # 기존의 처리 중 키(locked_until이 NULL)는 lease가 지난 것으로 보고 다시 예약할 수 있다
+    _add_columns(connection, IdempotencyKey, 'locked_until')
+
+@migration(11, '좌표가 없는 기존 사용자의 주소를 지오코딩해서 user 좌표 채우기')
+def backfill_user_locations(connection):
+    # 좌표 컬럼(마이그레이션 5) 이전에 가입한 사용자도 주소 기준 배달 가능 지역 필터를 쓸 수 있도록
+    backfill_user_coordinates(connection)
+
+def applied_versions(connection):
+    return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+def pending_migrations():
+    """아직 적용되지 않은 마이그레이션 목록"""
+    with db.engine.connect() as connection:
+        SchemaMigration.__table__.create(connection, checkfirst=True)
+        connection.commit()
+        applied = applied_versions(connection)
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+def upgrade():
+    """대기 중인 마이그레이션을 버전 순서대로 적용 (버전마다 별도 트랜잭션), 반환값: 적용한 목록"""
+    done = []
+    for version, description, apply in pending_migrations():
+        with db.engine.begin() as connection:
+            apply(connection)
+            connection.execute(insert(SchemaMigration).values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        done.append((version, description))
+    return done
+
+# 배포/개발 환경 준비 (flask db init, flask db seed) - create_app()은 DB에 접속하지 않으므로 여기서 따로 실행한다.
+
+DEFAULT_PAYMENTS = ['만나서 카드결제', '만나서 현금 결제']
+DEFAULT_CATEGORIES = ['한식', '일식', '중식', '양식', '분식', '패스트푸드']
+
+def create_database(uri):
+    """MySQL URI의 데이터베이스가 없으면 생성 (MySQL이 아니면 아무것도 하지 않음), 반환값: 데이터베이스 이름 또는 None"""
+    url = make_url(uri)
+    if not url.drivername.startswith('mysql') or not url.database:
+        return None
+    # 아직 없는 데이터베이스에는 접속할 수 없으므로 데이터베이스 없이 연결
+    engine = create_engine(url.set(database=None), poolclass=NullPool)
+    try:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"CREATE DATABASE IF NOT EXISTS `{url.database}` DEFAULT CHARACTER SET utf8mb4 DEFAULT COLLATE utf8mb4_unicode_ci"
+            )
+    finally:
+        engine.dispose()
+    return url.database
+
+def init_schema():
+    """테이블 생성(db.create_all, 이미 있는 테이블은 그대로) + 대기 중인 마이그레이션 적용, 반환값: 적용한 마이그레이션 목록"""
+    db.create_all()
+    return upgrade()
+
+def seed_defaults():
+    """기본 데이터(지불방식, 카테고리, 주소 좌표) 중 없는 것만 삽입 후 커밋, 반환값: {종류: 삽입 행 수}"""
+    payments = existing_values(Payment.payment, DEFAULT_PAYMENTS)
+    categories = existing_values(Category.category, DEFAULT_CATEGORIES)
+    added = {
+        'payments': bulk_insert(Payment, [{'payment': name} for name in DEFAULT_PAYMENTS if name not in payments]),
+        'categories': bulk_insert(Category, [{'category': name} for name in DEFAULT_CATEGORIES if name not in categories]),
+        'geocodes': seed_geocodes()
+    }
+    db.session.commit()
+    return added
@@ -0,0 +1,106 @@
+import re
+from sqlalchemy import or_
+from models import Menu, Coupon, OrderItem
+from utils.bulk import bulk_insert
+
+# Order.order 컬럼 길이 (주문 요약 문자열)
+ORDER_SUMMARY_LENGTH = 100
+
+class PricingError(ValueError):
+    """장바구니 가격 계산 실패 (status는 응답 HTTP 상태 코드)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def _parse_items(items):
+    """요청의 items를 [(menu_id 또는 None, 메뉴 이름 또는 None, 수량)]으로 정리"""
+    if not isinstance(items, list) or not items:
+        raise PricingError('주문 항목(items)이 필요합니다.')
+    parsed = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise PricingError('잘못된 주문 항목입니다.')
+        try:
+            qty = int(item.get('qty', 1))
+            menu_id = int(item['menu_id']) if item.get('menu_id') is not None else None
+        except (TypeError, ValueError):
+            raise PricingError('잘못된 주문 항목입니다.')
+        name = item.get('menu')
+        if qty < 1 or (menu_id is None and not name):
+            raise PricingError('잘못된 주문 항목입니다.')
+        parsed.append((menu_id, name, qty))
+    return parsed
+
+def price_cart(store_id, items, coupon_id=None):
+    """장바구니 가격 계산 (메뉴는 한 번의 IN 쿼리로 조회, 가격은 항상 DB 기준)
+
+    items: [{'menu_id': 1, 'qty': 2}] 또는 메뉴 이름으로 [{'menu': '김치찌개', 'qty': 2}]
+    반환값: {'lines', 'subtotal', 'discount', 'total_price', 'coupon_id', 'summary'}
+    """
+    parsed = _parse_items(items)
+    menu_ids = {menu_id for menu_id, _, _ in parsed if menu_id is not None}
+    names = {name for menu_id, name, _ in parsed if menu_id is None}
+
+    conditions = []
+    if menu_ids:
+        conditions.append(Menu.id.in_(menu_ids))
+    if names:
+        conditions.append(Menu.menu.in_(names))
+    menus = Menu.query.filter(Menu.store_id == store_id, or_(*conditions)).all()
+    by_id = {menu.id: menu for menu in menus}
+    by_name = {menu.menu: menu for menu in menus}
+
+    # 같은 메뉴가 여러 번 담겨 있으면 수량을 합침
+    quantities = {}
+    for menu_id, name, qty in parsed:
+        menu = by_id.get(menu_id) if menu_id is not None else by_name.get(name)
+        if not menu:
+            raise PricingError(f'가게에 없는 메뉴입니다: {menu_id if menu_id is not None else name}')
+        quantities[menu.id] = quantities.get(menu.id, 0) + qty
+
+    lines = [{
+        'menu_id': menu_id,
+        'menu': by_id[menu_id].menu,
+        'qty': qty,
+        'unit_price': by_id[menu_id].price,
+        'amount': by_id[menu_id].price * qty
+    } for menu_id, qty in quantities.items()]
+    subtotal = sum(line['amount'] for line in lines)
+
+    discount = 0
+    applied_coupon_id = None
+    if coupon_id:
+        coupon = Coupon.query.filter_by(id=coupon_id, store_id=store_id, is_deleted=False).first()
+        if not coupon:
+            raise PricingError('사용할 수 없는 쿠폰입니다.')
+        # 쿠폰 할인은 금액 기준, 주문 금액보다 클 수 없음
+        discount = min(coupon.discount or 0, subtotal)
+        applied_coupon_id = coupon.id
+
+    summary = ', '.join(f"{line['menu']} x{line['qty']}" for line in lines)
+    if len(summary) > ORDER_SUMMARY_LENGTH:
+        summary = summary[:ORDER_SUMMARY_LENGTH - 3] + '...'
+
+    return {
+        'lines': lines,
+        'subtotal': subtotal,
+        'discount': discount,
+        'total_price': subtotal - discount,
+        'coupon_id': applied_coupon_id,
+        'summary': summary
+    }
+
+def min_order_price(minprice):
+    """Store.minprice 문자열("15,000원")을 정수로 변환 (숫자가 없으면 0)"""
+    digits = re.sub(r'[^0-9]', '', minprice or '')
+    return int(digits) if digits else 0
+
+def save_order_items(order_id, lines):
+    """계산된 주문 항목을 order_item에 한 번에 삽입 (커밋은 호출한 쪽에서)"""
+    return bulk_insert(OrderItem, [{
+        'order_id': order_id,
+        'menu_id': line['menu_id'],
+        'qty': line['qty'],
+        'unit_price': line['unit_price']
+    } for line in lines])
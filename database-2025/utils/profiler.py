@@ -0,0 +1,161 @@
+import re
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 요청별 SQL 쿼리 프로파일러
+# 모든 엔진(primary, 복제본)의 커서 이벤트로 요청마다 쿼리 수/시간을 재고, 같은 문장이 반복되면 N+1로 표시한다.
+# 응답에 Server-Timing 헤더(db, app)를 붙이고, 느린 요청/N+1은 로그로 남기며, 엔드포인트별 요약을 누적한다.
+
+DEFAULT_SLOW_REQUEST_MS = 500
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5  # 같은 문장이 이 횟수 이상 실행되면 N+1로 판단
+MAX_LOGGED_STATEMENT = 300
+
+# IN (?, ?, ?) 처럼 값 개수만 다른 문장을 같은 문장으로 묶기 위한 패턴 (sqlite: ?, pymysql: %s, %(name)s)
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s)'
+_PLACEHOLDER_LIST = re.compile(r'\(\s*' + _PLACEHOLDER + r'(?:\s*,\s*' + _PLACEHOLDER + r')+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_statement(statement):
+    """공백 정리 + 플레이스홀더 목록을 (?...)로 합친 문장 (반복 쿼리 그룹 키)"""
+    return _PLACEHOLDER_LIST.sub('(?...)', _WHITESPACE.sub(' ', statement).strip())
+
+class RequestProfile:
+    """한 요청 동안 실행된 쿼리 통계"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements = {}  # 정규화된 문장 -> [실행 횟수, 시간(ms)]
+    
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        entry = self.statements.setdefault(normalize_statement(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed_ms
+    
+    def repeated(self, threshold):
+        """threshold번 이상 반복된 문장 [(문장, 횟수, 시간)] - 많이 반복된 순"""
+        return sorted(
+            ((statement, count, total) for statement, (count, total) in self.statements.items() if count >= threshold),
+            key=lambda item: -item[1]
+        )
+
+class EndpointStats:
+    """엔드포인트별 누적 요약 (프로세스 단위)"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.slow_requests = 0
+        self.n_plus_one = {}  # 반복된 문장 -> 관측된 최대 반복 횟수
+    
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'avg_queries': round(self.queries / self.requests, 2) if self.requests else 0,
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.db_ms / self.requests, 3) if self.requests else 0,
+            'slow_requests': self.slow_requests,
+            'n_plus_one': [
+                {'statement': statement, 'max_repeats': repeats}
+                for statement, repeats in sorted(self.n_plus_one.items(), key=lambda item: -item[1])
+            ]
+        }
+
+class QueryProfiler:
+    """SQL 프로파일러 (SQL_PROFILER 설정이 False면 아무것도 하지 않음)
+    
+    SQL_SLOW_REQUEST_MS: 이보다 오래 걸린 요청은 쿼리 요약과 함께 경고 로그
+    SQL_N_PLUS_ONE_THRESHOLD: 한 요청에서 같은 문장이 이 횟수 이상 실행되면 N+1 경고 로그
+    """
+    
+    def __init__(self):
+        self.slow_request_ms = DEFAULT_SLOW_REQUEST_MS
+        self.n_plus_one_threshold = DEFAULT_N_PLUS_ONE_THRESHOLD
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self._listening = False
+    
+    def init_app(self, app):
+        if not app.config.get('SQL_PROFILER', True):
+            return
+        self.slow_request_ms = app.config.get('SQL_SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS)
+        self.n_plus_one_threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+        if not self._listening:
+            # Engine 클래스에 등록해서 나중에 만든 엔진(복제본 등)까지 모두 측정
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._listening = True
+        app.before_request(self._start)
+        app.after_request(self._finish)
+    
+    def _start(self):
+        g._sql_profile = RequestProfile()
+    
+    def _finish(self, response):
+        profile = g.pop('_sql_profile', None)
+        if profile is None:
+            return response
+        elapsed_ms = (time.perf_counter() - profile.started) * 1000
+        response.headers.add('Server-Timing', f'db;dur={profile.total_ms:.1f};desc="{profile.count} queries"')
+        response.headers.add('Server-Timing', f'app;dur={elapsed_ms:.1f}')
+        
+        # 라우트가 없는 경로는 하나로 묶는다 (임의의 URL마다 항목이 늘어나지 않도록, 로그에는 경로가 남음)
+        endpoint = request.endpoint or 'unmatched'
+        repeated = profile.repeated(self.n_plus_one_threshold)
+        slow = elapsed_ms >= self.slow_request_ms
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.queries += profile.count
+            stats.max_queries = max(stats.max_queries, profile.count)
+            stats.db_ms += profile.total_ms
+            stats.slow_requests += slow
+            for statement, count, _ in repeated:
+                stats.n_plus_one[statement] = max(stats.n_plus_one.get(statement, 0), count)
+        
+        logger = current_app.logger
+        if slow:
+            logger.warning(
+                f"⚠️ 느린 요청: {request.method} {request.path} ({endpoint}) {elapsed_ms:.1f}ms, "
+                f"쿼리 {profile.count}개 {profile.total_ms:.1f}ms"
+            )
+        for statement, count, total in repeated:
+            logger.warning(
+                f"⚠️ N+1 의심: {request.method} {request.path} ({endpoint}) 같은 쿼리 {count}번 {total:.1f}ms - "
+                f"{statement[:MAX_LOGGED_STATEMENT]}"
+            )
+        return response
+    
+    def report(self):
+        """엔드포인트별 요약 (쿼리 수가 많은 순)"""
+        with self._lock:
+            items = [dict(stats.to_dict(), endpoint=endpoint) for endpoint, stats in self._endpoints.items()]
+        return sorted(items, key=lambda item: -item['avg_queries'])
+    
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+query_profiler = QueryProfiler()
+
+def _current_profile():
+    return g.get('_sql_profile') if has_request_context() else None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_profile() is not None:
+        context._profiler_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_profiler_started', None)
+    profile = _current_profile()
+    if started is None or profile is None:
+        return
+    profile.record(statement, (time.perf_counter() - started) * 1000)
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import delete, insert, select
+from models import db, Store, Order, Review, StoreRanking
+from utils.bulk import CHUNK_SIZE, chunked
+
+# 가게 순위 일괄 계산 (review/order를 chunk 단위로 NumPy 배열에 읽어서 가게별로 누적)
+# 메모리는 가게 수 + chunk 크기에 비례하고 리뷰/주문 수와는 무관하다.
+
+READ_CHUNK_SIZE = 50000
+# 베이지안 평균의 사전 가중치 (리뷰가 이 정도 쌓이기 전까지는 전체 평균 쪽으로 당겨짐)
+PRIOR_REVIEWS = 10
+TRENDING_DAYS = 7
+BASELINE_WEEKS = 4
+RANKING_COLUMNS = ['review_count', 'order_count', 'bayes_rating', 'rating_percentile',
+                   'popularity_percentile', 'trending_score']
+
+def _store_index(store_ids, column_values):
+    """store_id 배열을 정렬된 store_ids 안의 위치로 변환 (없는 가게는 -1)"""
+    positions = np.searchsorted(store_ids, column_values)
+    positions[positions >= len(store_ids)] = 0
+    return np.where(store_ids[positions] == column_values, positions, -1)
+
+def _stream(statement, chunk_size):
+    """SELECT 결과를 chunk_size행씩 나눠서 반환 (서버 측 커서로 스트리밍)"""
+    result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield rows
+
+def _column(rows, position, dtype):
+    """Row 목록의 한 컬럼을 NumPy 배열로 변환 (Row를 바로 np.array에 넘기면 속성 조회 때문에 느림)"""
+    return np.fromiter((row[position] for row in rows), dtype=dtype, count=len(rows))
+
+def percentile_rank(values):
+    """각 값 이하인 가게 비율 (0~100, 같은 값은 같은 순위)"""
+    if not len(values):
+        return values.astype(float)
+    return np.searchsorted(np.sort(values), values, side='right') * 100.0 / len(values)
+
+def compute_rankings(now=None, chunk_size=READ_CHUNK_SIZE):
+    """모든 가게의 베이지안 별점, 백분위, 트렌드 점수 계산
+
+    반환값: (store_ids, 지표 dict) - 배열은 모두 store_ids와 같은 순서
+    """
+    now = now or datetime.utcnow()
+    store_ids = np.array(db.session.execute(select(Store.id).order_by(Store.id)).scalars().all(), dtype=np.int64)
+    size = len(store_ids)
+    if not size:
+        return store_ids, {name: np.zeros(0) for name in RANKING_COLUMNS}
+    review_count = np.zeros(size, dtype=np.int64)
+    rating_sum = np.zeros(size, dtype=np.int64)
+    order_count = np.zeros(size, dtype=np.int64)
+    recent_orders = np.zeros(size, dtype=np.int64)
+    baseline_orders = np.zeros(size, dtype=np.int64)
+
+    for rows in _stream(select(Review.store_id, Review.rating), chunk_size):
+        index = _store_index(store_ids, _column(rows, 0, np.int64))
+        ratings = _column(rows, 1, np.int64)
+        valid = index >= 0
+        review_count += np.bincount(index[valid], minlength=size)
+        rating_sum += np.bincount(index[valid], weights=ratings[valid], minlength=size).astype(np.int64)
+
+    recent_start = np.datetime64(now - timedelta(days=TRENDING_DAYS), 's')
+    baseline_start = np.datetime64(now - timedelta(days=TRENDING_DAYS + BASELINE_WEEKS * 7), 's')
+    for rows in _stream(select(Order.store_id, Order.order_time), chunk_size):
+        index = _store_index(store_ids, _column(rows, 0, np.int64))
+        times = _column(rows, 1, 'datetime64[s]')
+        valid = index >= 0
+        order_count += np.bincount(index[valid], minlength=size)
+        recent = valid & (times >= recent_start)
+        baseline = valid & (times >= baseline_start) & (times < recent_start)
+        recent_orders += np.bincount(index[recent], minlength=size)
+        baseline_orders += np.bincount(index[baseline], minlength=size)
+
+    # 베이지안 평균: (C * 전체 평균 + 별점 합) / (C + 리뷰 수)
+    total_reviews = review_count.sum()
+    global_mean = rating_sum.sum() / total_reviews if total_reviews else 0.0
+    bayes_rating = (PRIOR_REVIEWS * global_mean + rating_sum) / (PRIOR_REVIEWS + review_count)
+
+    # 트렌드: 최근 7일 주문 수 / 이전 4주 주간 평균 (+1 스무딩으로 주문이 적은 가게의 튀는 값 완화)
+    trending_score = (recent_orders + 1) / (baseline_orders / BASELINE_WEEKS + 1)
+
+    return store_ids, {
+        'review_count': review_count,
+        'order_count': order_count,
+        'bayes_rating': np.round(bayes_rating, 3),
+        'rating_percentile': np.round(percentile_rank(bayes_rating), 2),
+        'popularity_percentile': np.round(percentile_rank(order_count), 2),
+        'trending_score': np.round(trending_score, 3),
+    }
+
+def write_rankings(store_ids, metrics, computed_at=None, chunk_size=CHUNK_SIZE):
+    """계산 결과로 store_ranking 전체를 교체 (한 트랜잭션), 반환값: 가게 수"""
+    computed_at = computed_at or datetime.utcnow()
+    columns = list(metrics)
+    rows = (
+        dict(zip(columns, values), store_id=store_id, computed_at=computed_at)
+        for store_id, *values in zip(store_ids.tolist(), *(metrics[name].tolist() for name in columns))
+    )
+    try:
+        db.session.execute(delete(StoreRanking))
+        for chunk in chunked(rows, chunk_size):
+            db.session.execute(insert(StoreRanking).values(chunk))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(store_ids)
+
+def rebuild_rankings(now=None, chunk_size=READ_CHUNK_SIZE):
+    """가게 순위 지표를 다시 계산해서 저장, 반환값: 가게 수"""
+    now = now or datetime.utcnow()
+    store_ids, metrics = compute_rankings(now, chunk_size)
+    return write_rankings(store_ids, metrics, now)
@@ -0,0 +1,112 @@
+import itertools
+import threading
+import time
+from functools import wraps
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+
+# 읽기 복제본(replica) 라우팅
+# SQLALCHEMY_REPLICA_URIS가 설정되면 요청 중 읽기 쿼리는 복제본(요청마다 라운드 로빈으로 하나 선택)으로,
+# 쓰기(flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE)와 그 밖의 모든 쿼리는 primary로 보낸다.
+# 한 번 쓰기를 한 요청은 이후 읽기도 primary에서 하고, 같은 클라이언트의 다음 요청도 REPLICA_STICKY_SECONDS초 동안
+# primary에서 읽어서 복제 지연 때문에 방금 쓴 데이터가 안 보이는 일을 막는다.
+# 복제본이 없거나 요청 밖(CLI, 백그라운드 스레드)에서는 기존처럼 primary만 사용한다.
+
+DEFAULT_STICKY_SECONDS = 5
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+PRIMARY_UNTIL_KEY = '_db_primary_until'  # Flask 세션 키: 이 시각까지 primary에서 읽기
+
+class ReplicaRouter:
+    """복제본 엔진 목록과 요청별 라우팅 상태 관리"""
+    
+    def __init__(self):
+        self.engines = []
+        self.read_only_blueprints = set()
+        self.sticky_seconds = DEFAULT_STICKY_SECONDS
+        self._cycle = None
+        self._lock = threading.Lock()
+    
+    def init_app(self, app, engine_options=None):
+        """SQLALCHEMY_REPLICA_URIS로 복제본 엔진 생성 (연결은 처음 쿼리할 때 맺음)
+        
+        REPLICA_READ_ONLY_BLUEPRINTS: GET이 아닌 요청도 읽기를 복제본으로 보낼 blueprint 이름 목록
+        REPLICA_STICKY_SECONDS: 쓰기 후 같은 클라이언트가 primary에서 읽는 시간 (초)
+        """
+        from utils.dbpool import instrument_engine
+        uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+        options = engine_options if engine_options is not None else app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        self.engines = [create_engine(uri, **options) for uri in uris]
+        for number, engine in enumerate(self.engines):
+            instrument_engine(engine, f'replica{number}')
+        self._cycle = itertools.cycle(range(len(self.engines))) if self.engines else None
+        self.read_only_blueprints = set(app.config.get('REPLICA_READ_ONLY_BLUEPRINTS', []))
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+        app.after_request(self._remember_write)
+    
+    def _next_engine(self):
+        with self._lock:
+            return self.engines[next(self._cycle)]
+    
+    def mark_write(self):
+        """이번 요청에서 쓰기가 있었음을 표시 (이후 읽기는 primary)"""
+        if has_request_context():
+            g._db_primary = True
+            g._db_wrote = True
+    
+    def _reads_from_replica(self):
+        """현재 요청의 읽기를 복제본으로 보낼지"""
+        if not self.engines or not has_request_context() or g.get('_db_primary'):
+            return False
+        if request.method not in READ_METHODS and request.blueprint not in self.read_only_blueprints:
+            return False
+        if session.get(PRIMARY_UNTIL_KEY, 0) > time.time():
+            return False
+        return True
+    
+    def replica_for_request(self):
+        """이 요청의 읽기에 쓸 복제본 엔진 (없으면 None) - 요청 안에서는 같은 복제본을 계속 사용"""
+        if not self._reads_from_replica():
+            return None
+        if '_db_replica' not in g:
+            g._db_replica = self._next_engine()
+        return g._db_replica
+    
+    def _remember_write(self, response):
+        """쓰기가 있었던 요청이면 같은 클라이언트의 다음 읽기를 잠시 primary로 보냄"""
+        if self.engines and g.get('_db_wrote') and self.sticky_seconds:
+            session[PRIMARY_UNTIL_KEY] = time.time() + self.sticky_seconds
+        return response
+
+replica_router = ReplicaRouter()
+
+def _is_read(clause):
+    """복제본에서 실행해도 되는 문장인지 (FOR UPDATE가 없는 SELECT만)"""
+    return clause is not None and getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+class RoutingSession(Session):
+    """읽기는 복제본, 쓰기는 primary로 보내는 세션 (models.db의 세션 클래스)"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and replica_router.engines:
+            if _is_read(clause) and not self._flushing:
+                replica = replica_router.replica_for_request()
+                if replica is not None:
+                    return replica
+            elif self._flushing or clause is not None:
+                # flush, DML, FOR UPDATE, text() 등 읽기로 확인할 수 없는 문장은 쓰기로 취급
+                replica_router.mark_write()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def stick_to_primary():
+    """현재 요청의 남은 읽기를 primary에서 실행 (복제 지연 없이 최신 데이터가 필요할 때)"""
+    if has_request_context():
+        g._db_primary = True
+
+def use_primary(f):
+    """항상 primary에서 읽어야 하는 GET 엔드포인트용 데코레이터"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        stick_to_primary()
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,322 @@
+import heapq
+import threading
+import time
+import unicodedata
+from sqlalchemy import select
+from models import db, Store, Menu
+
+# 가게/메뉴 검색용 프로세스 내 역색인
+# 한글은 자모 단위로 풀어서 색인하므로 입력 중인 글자("김치ㅉ", "닭" -> "달걀")와
+# 초성 검색("ㄱㅊㅉㄱ")도 같은 구조로 처리한다.
+
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 겹받침/겹모음은 타이핑 순서대로 나눠서 "달ㄱ"(입력 중 "닭")이 "달걀"에 걸리게 함
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+CHOSEONG_SET = frozenset(CHOSEONG)
+
+# n-gram 크기 (자모 문자열은 길어서 3, 초성 문자열은 짧아서 2)
+JAMO_GRAM = 3
+CHOSEONG_GRAM = 2
+# 필드별 가중치 (가게 이름 > 메뉴 > 가게 소개)
+FIELD_WEIGHTS = {'store_name': 10.0, 'menu': 4.0, 'information': 1.0}
+PREFIX_BONUS = 2.0
+EXACT_BONUS = 3.0
+MAX_QUERY_LENGTH = 50
+MATCHED_MENUS = 3
+
+def normalize(text):
+    """NFC 정규화 + 소문자 + 공백 제거 ("김치 찌개"와 "김치찌개"를 같게 취급)"""
+    return ''.join(unicodedata.normalize('NFC', text or '').lower().split())
+
+def to_jamo(text):
+    """정규화된 문자열을 자모 문자열로 분해 ("닭" -> "ㄷㅏㄹㄱ")"""
+    letters = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_START <= code <= HANGUL_END:
+            code -= HANGUL_START
+            letters.append(CHOSEONG[code // 588])
+            letters.append(COMPOUND_JAMO.get(JUNGSEONG[code % 588 // 28], JUNGSEONG[code % 588 // 28]))
+            jong = JONGSEONG[code % 28]
+            letters.append(COMPOUND_JAMO.get(jong, jong))
+        else:
+            letters.append(COMPOUND_JAMO.get(ch, ch))
+    return ''.join(letters)
+
+def to_choseong(text):
+    """정규화된 문자열의 초성 문자열 ("김치찌개" -> "ㄱㅊㅉㄱ", 한글이 아닌 글자는 그대로)"""
+    return ''.join(
+        CHOSEONG[(ord(ch) - HANGUL_START) // 588] if HANGUL_START <= ord(ch) <= HANGUL_END else ch
+        for ch in text
+    )
+
+def ngrams(text, size, prefix):
+    return {prefix + text[i:i + size] for i in range(len(text) - size + 1)}
+
+def parse_query(query):
+    """검색어를 (모드, 비교할 문자열, n-gram 집합)으로 변환 (자음만 입력하면 초성 검색)"""
+    text = normalize(query)[:MAX_QUERY_LENGTH]
+    if text and all(ch in CHOSEONG_SET for ch in text):
+        return 'choseong', text, ngrams(text, CHOSEONG_GRAM, 'c:')
+    key = to_jamo(text)
+    return 'jamo', key, ngrams(key, JAMO_GRAM, 'j:')
+
+class _IndexState:
+    """역색인 본체 (잠금은 SearchIndex에서 처리)
+    
+    문서 하나 = 가게 이름 / 가게 소개 / 메뉴 이름 중 하나의 필드.
+    postings는 n-gram -> 내부 문서 번호 집합이다.
+    """
+    
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}         # 문서 번호 -> (필드, 원본 id, store_id, 원본 문자열, 자모 문자열, 초성 문자열)
+        self.doc_numbers = {}  # (필드, 원본 id) -> 문서 번호
+        self.stores = {}       # store_id -> (가게 이름, 카테고리)
+        self.store_menus = {}  # store_id -> 메뉴 id 집합
+        self._next = 0
+    
+    def _add_doc(self, field, source_id, store_id, text):
+        self._remove_doc(field, source_id)
+        compact = normalize(text)
+        if not compact:
+            return
+        jamo, choseong = to_jamo(compact), to_choseong(compact)
+        number = self._next
+        self._next += 1
+        self.docs[number] = (field, source_id, store_id, text, jamo, choseong)
+        self.doc_numbers[(field, source_id)] = number
+        for gram in ngrams(jamo, JAMO_GRAM, 'j:') | ngrams(choseong, CHOSEONG_GRAM, 'c:'):
+            self.postings.setdefault(gram, set()).add(number)
+    
+    def _remove_doc(self, field, source_id):
+        number = self.doc_numbers.pop((field, source_id), None)
+        if number is None:
+            return
+        _, _, _, _, jamo, choseong = self.docs.pop(number)
+        for gram in ngrams(jamo, JAMO_GRAM, 'j:') | ngrams(choseong, CHOSEONG_GRAM, 'c:'):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(number)
+                if not posting:
+                    del self.postings[gram]
+    
+    def add_store(self, store_id, store_name, information, category):
+        self.stores[store_id] = (store_name, category)
+        self._add_doc('store_name', store_id, store_id, store_name)
+        self._add_doc('information', store_id, store_id, information)
+    
+    def remove_store(self, store_id):
+        self.stores.pop(store_id, None)
+        self._remove_doc('store_name', store_id)
+        self._remove_doc('information', store_id)
+        for menu_id in self.store_menus.pop(store_id, ()):
+            self._remove_doc('menu', menu_id)
+    
+    def add_menu(self, menu_id, store_id, name):
+        self.remove_menu(menu_id)
+        self.store_menus.setdefault(store_id, set()).add(menu_id)
+        self._add_doc('menu', menu_id, store_id, name)
+    
+    def remove_menu(self, menu_id):
+        number = self.doc_numbers.get(('menu', menu_id))
+        if number is not None:
+            store_id = self.docs[number][2]
+            self.store_menus.get(store_id, set()).discard(menu_id)
+        self._remove_doc('menu', menu_id)
+    
+    def candidates(self, grams):
+        """모든 n-gram을 가진 문서 번호 (검색어가 n-gram보다 짧으면 전체 문서)"""
+        if not grams:
+            return self.docs.keys()
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not postings[0]:
+            return ()
+        # 가장 짧은 posting부터 교집합
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+class SearchIndex:
+    """가게/메뉴 검색 인덱스 (프로세스 내, 스레드 안전)
+    
+    워커가 뜰 때 백그라운드로(warm) 또는 첫 검색 때 DB에서 한 번 만들고, 가게/메뉴를 쓰는 라우트가 커밋 후
+    add_*/remove_*로 증분 갱신한다. 첫 인덱스를 만드는 동안 들어온 검색은 빈 인덱스 대신 완성될 때까지 기다린다.
+    워커가 여러 개면 워커마다 인덱스를 따로 가지므로, 다른 프로세스(다른 워커, flask catalog import)의
+    변경은 max_age초가 지난 뒤 첫 검색에서 백그라운드로 다시 만들 때 반영된다.
+    """
+    
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self.built_at = None
+        self._state = _IndexState()
+        self._lock = threading.RLock()
+        self._rebuilt = threading.Condition(self._lock)  # 다시 만들기가 끝나면(성공/실패) 알림
+        self._pending = None  # 다시 만드는 중에 들어온 증분 갱신 (새 인덱스에 다시 적용)
+        self._app = None
+    
+    def init_app(self, app):
+        self._app = app
+        self.max_age = app.config.get('SEARCH_INDEX_MAX_AGE', self.max_age)
+    
+    @property
+    def ready(self):
+        return self.built_at is not None
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._state.docs)
+    
+    def _apply(self, operation, *args):
+        with self._lock:
+            getattr(self._state, operation)(*args)
+            if self._pending is not None:
+                self._pending.append((operation, args))
+    
+    def add_store(self, store_id, store_name, information=None, category=None):
+        self._apply('add_store', store_id, store_name, information, category)
+    
+    def remove_store(self, store_id):
+        self._apply('remove_store', store_id)
+    
+    def add_menu(self, menu_id, store_id, name):
+        self._apply('add_menu', menu_id, store_id, name)
+    
+    def remove_menu(self, menu_id):
+        self._apply('remove_menu', menu_id)
+    
+    def rebuild(self, chunk_size=5000):
+        """DB 전체를 읽어서 새 인덱스를 만든 뒤 교체 (app context 필요), 반환값: 문서 수
+        
+        읽는 동안에도 기존 인덱스로 검색할 수 있고, 그 사이의 증분 갱신은 새 인덱스에 다시 적용한다.
+        다른 스레드가 이미 만드는 중이면 바로 반환하되, 아직 첫 인덱스가 없으면 그 작업이 끝날 때까지 기다린다.
+        """
+        with self._lock:
+            if self._pending is not None and not self.ready:
+                self._rebuilt.wait_for(lambda: self._pending is None)
+                if self.ready:
+                    return len(self._state.docs)
+            if self._pending is not None:
+                return len(self._state.docs)
+            self._pending = []
+        try:
+            state = _IndexState()
+            stores = select(Store.id, Store.store_name, Store.information, Store.category)
+            for rows in db.session.execute(stores.execution_options(yield_per=chunk_size)).partitions():
+                for row in rows:
+                    state.add_store(*row)
+            menus = select(Menu.id, Menu.store_id, Menu.menu)
+            for rows in db.session.execute(menus.execution_options(yield_per=chunk_size)).partitions():
+                for row in rows:
+                    state.add_menu(*row)
+        except Exception:
+            with self._lock:
+                self._pending = None
+                self._rebuilt.notify_all()
+            raise
+        with self._lock:
+            for operation, args in self._pending:
+                getattr(state, operation)(*args)
+            self._state = state
+            self._pending = None
+            self.built_at = time.monotonic()
+            self._rebuilt.notify_all()
+            return len(state.docs)
+    
+    def refresh(self):
+        """데이터 일괄 변경을 커밋한 뒤 인덱스 재생성 (실패하면 예외 대신 로그만 남기고 다음 검색 때 다시 만든다)"""
+        try:
+            return self.rebuild()
+        except Exception as e:
+            db.session.rollback()
+            with self._lock:
+                self.built_at = None
+            print(f"⚠️ 검색 인덱스 갱신 실패 (다음 검색 때 다시 생성): {e}")
+            return None
+    
+    def warm(self):
+        """아직 인덱스가 없으면 백그라운드로 만들기 시작 (gunicorn post_worker_init에서 호출, 첫 검색 요청이 만들지 않도록)"""
+        if self._app is not None and not self.ready:
+            self._refresh_in_background()
+    
+    def _refresh_in_background(self):
+        def run():
+            with self._app.app_context():
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    print(f"⚠️ 검색 인덱스 갱신 실패: {e}")
+        threading.Thread(target=run, name='search-index-rebuild', daemon=True).start()
+    
+    def _is_stale(self):
+        return (self._app is not None and self.max_age and self._pending is None
+                and time.monotonic() - self.built_at > self.max_age)
+    
+    def search(self, query, limit=20, offset=0):
+        """검색어와 맞는 가게를 점수 순으로 반환
+        
+        반환값: (전체 가게 수, [{'store_id', 'store_name', 'category', 'score', 'menus'}])
+        점수는 필드별 최고 점수의 합 (필드 가중치, 필드가 검색어로 시작하면 x2, 같으면 x3).
+        """
+        if not self.ready:
+            self.rebuild()
+        elif self._is_stale():
+            self._refresh_in_background()
+        mode, key, grams = parse_query(query)
+        if not key:
+            return 0, []
+        
+        with self._lock:
+            state = self._state
+            best = {}  # store_id -> {필드: 최고 점수}
+            menus = {}
+            for number in state.candidates(grams):
+                field, _, store_id, text, jamo, choseong = state.docs[number]
+                target = choseong if mode == 'choseong' else jamo
+                # n-gram 교집합은 후보일 뿐이므로 실제로 연속해서 포함하는지 확인
+                position = target.find(key)
+                if position < 0 or store_id not in state.stores:
+                    continue
+                score = FIELD_WEIGHTS[field]
+                if target == key:
+                    score *= EXACT_BONUS
+                elif position == 0:
+                    score *= PREFIX_BONUS
+                fields = best.setdefault(store_id, {})
+                fields[field] = max(fields.get(field, 0.0), score)
+                if field == 'menu':
+                    menus.setdefault(store_id, []).append((-score, text))
+        
+            ranked = heapq.nsmallest(offset + limit, (
+                (-sum(fields.values()), state.stores[store_id][0], store_id)
+                for store_id, fields in best.items()
+            ))[offset:]
+            return len(best), [{
+                'store_id': store_id,
+                'store_name': store_name,
+                'category': state.stores[store_id][1],
+                'score': -negative_score,
+                'menus': [text for _, text in sorted(menus.get(store_id, []))[:MATCHED_MENUS]]
+            } for negative_score, store_name, store_id in ranked]
+
+# 앱 전체에서 공유하는 검색 인덱스
+search_index = SearchIndex()
+
+def index_store(store):
+    """가게 생성/수정 커밋 후 호출"""
+    search_index.add_store(store.id, store.store_name, store.information, store.category)
+
+def index_menu(menu):
+    """메뉴 추가 커밋 후 호출"""
+    search_index.add_menu(menu.id, menu.store_id, menu.menu)
@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from models import db, Store, Order, Review, StoreStats, StoreSalesHourly, StoreSalesDaily
+from utils.bulk import chunked, upsert
+
+# 매출 집계 구간: granularity -> (모델, 구간 시작 시각 계산 함수, 구간 길이)
+ROLLUPS = {
+    'hour': (StoreSalesHourly, lambda t: t.replace(minute=0, second=0, microsecond=0), timedelta(hours=1)),
+    'day': (StoreSalesDaily, lambda t: t.replace(hour=0, minute=0, second=0, microsecond=0), timedelta(days=1)),
+}
+RATINGS = range(1, 6)
+
+def avg_rating_expr():
+    """평균 별점 SQL 표현식 (store_stats 기준, 리뷰가 없으면 0)"""
+    return case(
+        (func.coalesce(StoreStats.review_count, 0) > 0,
+         StoreStats.rating_sum * 1.0 / StoreStats.review_count),
+        else_=0
+    )
+
+def _apply_rollups(store_id, at, columns, create=True):
+    """시간/일 단위 매출 집계에 columns({컬럼 이름: 증감값})를 더한다 (create=False면 행이 있을 때만, 커밋은 호출한 쪽에서)
+    
+    새 구간의 첫 주문/리뷰가 동시에 들어와도 중복 키 오류가 나지 않도록 upsert로 만든다.
+    """
+    for model, bucket_of, _ in ROLLUPS.values():
+        key = {'store_id': store_id, 'bucket': bucket_of(at)}
+        values = {getattr(model, name): getattr(model, name) + delta for name, delta in columns.items()}
+        if create:
+            upsert(model, dict(key, **columns), values)
+        else:
+            model.query.filter_by(**key).update(values, synchronize_session=False)
+
+def record_order(store_id, order_time=None, total_price=0):
+    """주문 생성 시 주문 수/마지막 주문 시각, 시간/일 단위 주문 수/매출 갱신"""
+    order_time = order_time or datetime.utcnow()
+    upsert(StoreStats, {'store_id': store_id, 'order_count': 1, 'last_order_at': order_time}, {
+        StoreStats.order_count: StoreStats.order_count + 1,
+        StoreStats.last_order_at: order_time
+    })
+    _apply_rollups(store_id, order_time, {'order_count': 1, 'revenue': total_price})
+
+def record_review(store_id, rating, created_at=None):
+    """리뷰 작성 시 리뷰 수/별점 합계, 시간/일 단위 별점 분포 갱신"""
+    upsert(StoreStats, {'store_id': store_id, 'review_count': 1, 'rating_sum': rating}, {
+        StoreStats.review_count: StoreStats.review_count + 1,
+        StoreStats.rating_sum: StoreStats.rating_sum + rating
+    })
+    _apply_rollups(store_id, created_at or datetime.utcnow(), {
+        'review_count': 1, 'rating_sum': rating, f'rating_{rating}': 1
+    })
+
+def remove_review(store_id, rating, created_at=None):
+    """리뷰 삭제 시 리뷰 수/별점 합계 차감 (집계 구간은 리뷰 작성 시각 기준)"""
+    upsert(StoreStats, {'store_id': store_id}, {
+        StoreStats.review_count: StoreStats.review_count - 1,
+        StoreStats.rating_sum: StoreStats.rating_sum - rating
+    })
+    if created_at:
+        _apply_rollups(store_id, created_at, {
+            'review_count': -1, 'rating_sum': -rating, f'rating_{rating}': -1
+        }, create=False)
+
+def clear_sales_rollups():
+    """시간/일 단위 매출 집계 전체 삭제 (가게 삭제 전 등)"""
+    for model, _, _ in ROLLUPS.values():
+        model.query.delete()
+
+def reset_store_stats():
+    """주문/리뷰가 전부 삭제되었을 때 모든 통계를 0으로 초기화"""
+    clear_sales_rollups()
+    StoreStats.query.update({
+        StoreStats.order_count: 0,
+        StoreStats.review_count: 0,
+        StoreStats.rating_sum: 0,
+        StoreStats.last_order_at: None
+    }, synchronize_session=False)
+
+def _empty_rollup():
+    return dict({'order_count': 0, 'revenue': 0, 'review_count': 0, 'rating_sum': 0},
+                **{f'rating_{rating}': 0 for rating in RATINGS})
+
+def rebuild_sales_rollups(connection=None, batch_size=5000):
+    """order/review를 스트리밍으로 읽어서 시간/일 단위 매출 집계를 재생성 (커밋은 호출한 쪽에서)
+    
+    connection을 주면 그 연결에서 실행한다 (마이그레이션용, 기본값은 db.session).
+    메모리는 주문 수가 아니라 (가게 수 x 구간 수)에 비례한다.
+    """
+    executor = connection if connection is not None else db.session
+    buckets = {granularity: {} for granularity in ROLLUPS}
+    
+    def add(store_id, at, columns):
+        for granularity, (_, bucket_of, _) in ROLLUPS.items():
+            row = buckets[granularity].setdefault((store_id, bucket_of(at)), _empty_rollup())
+            for name, delta in columns.items():
+                row[name] += delta
+    
+    orders = select(Order.store_id, Order.order_time, Order.total_price).execution_options(yield_per=batch_size)
+    for store_id, order_time, total_price in executor.execute(orders):
+        add(store_id, order_time, {'order_count': 1, 'revenue': total_price or 0})
+    reviews = select(Review.store_id, Review.created_at, Review.rating).execution_options(yield_per=batch_size)
+    for store_id, created_at, rating in executor.execute(reviews):
+        columns = {'review_count': 1, 'rating_sum': rating}
+        if rating in RATINGS:
+            columns[f'rating_{rating}'] = 1
+        add(store_id, created_at, columns)
+    
+    for granularity, (model, _, _) in ROLLUPS.items():
+        executor.execute(delete(model))
+        rows = (
+            dict(values, store_id=store_id, bucket=bucket)
+            for (store_id, bucket), values in buckets[granularity].items()
+        )
+        for chunk in chunked(rows):
+            executor.execute(insert(model).values(chunk))
+
+def _rollup_payload(values):
+    """집계 값 응답 형식 (평균 객단가/평균 별점 계산 포함)"""
+    return {
+        'orders': values['order_count'],
+        'revenue': int(values['revenue']),
+        'avg_ticket': round(values['revenue'] / values['order_count']) if values['order_count'] else 0,
+        'reviews': values['review_count'],
+        'avg_rating': round(values['rating_sum'] / values['review_count'], 1) if values['review_count'] else 0.0,
+        'rating_distribution': {str(rating): values[f'rating_{rating}'] for rating in RATINGS}
+    }
+
+def sales_analytics(store_id, start, end, granularity='day'):
+    """[start, end) 기간의 구간별 매출/리뷰 집계와 합계 (집계 테이블의 기본키 범위 조회, 빈 구간은 0)"""
+    model, bucket_of, step = ROLLUPS[granularity]
+    start = bucket_of(start)
+    rows = model.query.filter(
+        model.store_id == store_id,
+        model.bucket >= start,
+        model.bucket < end
+    ).all()
+    by_bucket = {row.bucket: row for row in rows}
+    
+    totals = _empty_rollup()
+    series = []
+    bucket = start
+    while bucket < end:
+        row = by_bucket.get(bucket)
+        values = {name: getattr(row, name) for name in totals} if row else _empty_rollup()
+        for name, value in values.items():
+            totals[name] += value
+        series.append(dict(_rollup_payload(values), bucket=bucket.isoformat()))
+        bucket += step
+    return {'totals': _rollup_payload(totals), 'buckets': series}
+
+def rebuild_store_stats(connection=None):
+    """order/review 테이블 전체를 다시 집계해서 store_stats를 재생성 (반환값: 가게 수)
+    
+    connection을 주면 그 연결에서 실행하고 커밋하지 않는다 (마이그레이션용, 기본값은 db.session에서 실행 후 커밋).
+    """
+    executor = connection if connection is not None else db.session
+    order_rows = executor.execute(
+        select(Order.store_id, func.count(Order.id), func.max(Order.order_time)).group_by(Order.store_id)
+    ).all()
+    review_rows = executor.execute(
+        select(Review.store_id, func.count(Review.id), func.coalesce(func.sum(Review.rating), 0)).group_by(Review.store_id)
+    ).all()
+    
+    orders = {store_id: (count, last_order_at) for store_id, count, last_order_at in order_rows}
+    reviews = {store_id: (count, int(rating_sum)) for store_id, count, rating_sum in review_rows}
+    
+    rows = []
+    for store_id in executor.execute(select(Store.id)).scalars().all():
+        order_count, last_order_at = orders.get(store_id, (0, None))
+        review_count, rating_sum = reviews.get(store_id, (0, 0))
+        rows.append({
+            'store_id': store_id,
+            'order_count': order_count,
+            'review_count': review_count,
+            'rating_sum': rating_sum,
+            'last_order_at': last_order_at
+        })
+    
+    executor.execute(delete(StoreStats))
+    rebuild_sales_rollups(connection)
+    store = Store.__table__
+    for chunk in chunked(rows):
+        executor.execute(insert(StoreStats).values(chunk))
+        # 하위 호환용 Store.reviewCount도 함께 맞춰준다
+        executor.execute(
+            update(store).where(store.c.id == bindparam('b_store_id')).values(reviewCount=bindparam('b_review_count')),
+            [{'b_store_id': row['store_id'], 'b_review_count': row['review_count']} for row in chunk]
+        )
+    if connection is None:
+        db.session.commit()
+    return len(rows)
@@ -0,0 +1,6 @@
+# 운영 서버용 WSGI 진입점
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# app.py를 직접 실행하면 디버거가 켜진 개발 서버(단일 프로세스)로 실행되므로 운영에서는 사용하지 않는다.
+from app import create_app
+
+app = create_app()